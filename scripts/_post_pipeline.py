@@ -6,9 +6,10 @@ Executar após o pipeline de busca (fetch_orcid.py --search) terminar.
 
 import json
 import os
-import sqlite3
 from datetime import datetime
 
+import anais_db
+
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
 RESULTS_PATH = os.path.join(BASE, 'orcid_results.json')
@@ -24,18 +25,9 @@ def main():
     with open(RESULTS_PATH, 'r') as f:
         results = json.load(f)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
-    # Garantir colunas existem
-    cur.execute("PRAGMA table_info(authors)")
-    cols = [r[1] for r in cur.fetchall()]
-    if 'orcid_checked_at' not in cols:
-        cur.execute('ALTER TABLE authors ADD COLUMN orcid_checked_at TEXT')
-    if 'orcid_pipeline_version' not in cols:
-        cur.execute('ALTER TABLE authors ADD COLUMN orcid_pipeline_version TEXT')
-    conn.commit()
-
     # === 1. Aplicar ORCIDs confirmados ===
     confirmed = results.get('confirmed', [])
     applied = 0
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Conexões e schema versionado do anais.db.
+
+Os scripts abrem o banco por aqui:
+- connect(): leitura e escrita (importação, dedup, ORCID...), em WAL com
+  synchronous=NORMAL, cache e mmap maiores e espera de até 30 s por lock;
+- connect_readonly(): só leitura (geradores: db2hugo, OJS XML,
+  verificações), com URI mode=ro e query_only.
+Em WAL os leitores não bloqueiam o escritor nem são bloqueados por ele, então
+os geradores rodam durante um dedup ou busca de ORCID longos.
+
+O schema evolui por migrações numeradas (MIGRATIONS), aplicadas em ordem;
+a versão do banco fica em PRAGMA user_version. connect() aplica as
+migrações pendentes numa transação só — com o banco em dia, a checagem
+custa uma leitura de pragma. connect_readonly() nunca grava: com o schema
+atrás, recusa a conexão (SchemaOutdated) em vez de migrar. Bancos anteriores às migrações (user_version
+0) são reconhecidos: as tabelas e colunas que já existem são mantidas.
+
+Para mudar o schema, acrescente uma migração no fim da lista (nunca edite
+uma já publicada).
+
+Uso:
+    python3 scripts/anais_db.py            # aplica as migrações pendentes
+    python3 scripts/anais_db.py --status   # só mostra a versão
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import urllib.parse
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DB_PATH = os.path.join(BASE, 'anais.db')
+
+BUSY_TIMEOUT = 30  # segundos esperando um lock antes de "database is locked"
+TUNING_PRAGMAS = (
+    'PRAGMA cache_size = -65536',     # 64 MB
+    'PRAGMA mmap_size = 268435456',   # 256 MB (o banco inteiro)
+    'PRAGMA temp_store = MEMORY',
+)
+READ_WRITE_PRAGMAS = TUNING_PRAGMAS + (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',    # seguro em WAL
+)
+READ_ONLY_PRAGMAS = TUNING_PRAGMAS + (
+    'PRAGMA query_only = ON',
+)
+
+SCHEMA_V1 = """
+CREATE TABLE IF NOT EXISTS seminars (
+    slug TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    subtitle TEXT,
+    year INTEGER NOT NULL,
+    volume INTEGER,
+    number INTEGER,
+    date_published TEXT,
+    isbn TEXT,
+    doi TEXT,
+    description TEXT,
+    location TEXT,
+    publisher TEXT,
+    source TEXT,
+    editors TEXT,
+    volume_pdf TEXT,
+    related_urls TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    seminar_slug TEXT NOT NULL REFERENCES seminars(slug),
+    title TEXT NOT NULL,
+    abbrev TEXT,
+    seq INTEGER DEFAULT 0,
+    hide_title INTEGER DEFAULT 0,
+    UNIQUE(seminar_slug, title)
+);
+
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    seminar_slug TEXT NOT NULL REFERENCES seminars(slug),
+    section_id INTEGER REFERENCES sections(id),
+    title TEXT NOT NULL,
+    subtitle TEXT,
+    title_en TEXT,
+    subtitle_en TEXT,
+    locale TEXT DEFAULT 'pt-BR',
+    pages TEXT,
+    pages_count INTEGER,
+    file TEXT,
+    abstract TEXT,
+    abstract_en TEXT,
+    abstract_es TEXT,
+    keywords TEXT,
+    keywords_en TEXT,
+    keywords_es TEXT,
+    references_ TEXT,
+    ojs_id TEXT,
+    doi TEXT,
+    document_type TEXT DEFAULT 'artigo'
+);
+
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    givenname TEXT NOT NULL,
+    familyname TEXT NOT NULL,
+    email TEXT,
+    orcid TEXT,
+    UNIQUE(givenname, familyname)
+);
+
+CREATE TABLE IF NOT EXISTS author_variants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    givenname TEXT NOT NULL,
+    familyname TEXT NOT NULL,
+    source TEXT,
+    UNIQUE(givenname, familyname)
+);
+
+CREATE TABLE IF NOT EXISTS article_author (
+    article_id TEXT NOT NULL REFERENCES articles(id),
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    seq INTEGER DEFAULT 0,
+    primary_contact INTEGER DEFAULT 0,
+    affiliation TEXT,
+    bio TEXT,
+    country TEXT DEFAULT 'BR',
+    PRIMARY KEY (article_id, author_id)
+);
+
+CREATE TABLE IF NOT EXISTS orcid_exclusions (
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    orcid TEXT NOT NULL,
+    reason TEXT,
+    PRIMARY KEY (author_id, orcid)
+);
+
+CREATE INDEX IF NOT EXISTS idx_articles_seminar ON articles(seminar_slug);
+CREATE INDEX IF NOT EXISTS idx_articles_section ON articles(section_id);
+CREATE INDEX IF NOT EXISTS idx_sections_seminar ON sections(seminar_slug);
+CREATE INDEX IF NOT EXISTS idx_article_author_author ON article_author(author_id);
+CREATE INDEX IF NOT EXISTS idx_article_author_article ON article_author(article_id);
+CREATE INDEX IF NOT EXISTS idx_author_variants_author ON author_variants(author_id);
+CREATE INDEX IF NOT EXISTS idx_authors_familyname ON authors(familyname);
+"""
+
+ZENODO_LEDGER = """
+CREATE TABLE IF NOT EXISTS zenodo_ledger (
+    base_url TEXT NOT NULL,
+    article_id TEXT NOT NULL REFERENCES articles(id),
+    stage TEXT NOT NULL,
+    deposition_id INTEGER,
+    bucket_url TEXT,
+    record_id INTEGER,
+    doi TEXT,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (base_url, article_id)
+);
+"""
+
+# Sem FK para articles: o ledger registra depósitos externos e precisa
+# sobreviver à reimportação, que apaga e recria os artigos
+ZENODO_LEDGER_NO_FK = """
+CREATE TABLE zenodo_ledger_new (
+    base_url TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    deposition_id INTEGER,
+    bucket_url TEXT,
+    record_id INTEGER,
+    doi TEXT,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (base_url, article_id)
+);
+INSERT INTO zenodo_ledger_new SELECT
+    base_url, article_id, stage, deposition_id, bucket_url, record_id, doi, error, updated_at
+FROM zenodo_ledger;
+DROP TABLE zenodo_ledger;
+ALTER TABLE zenodo_ledger_new RENAME TO zenodo_ledger;
+"""
+
+# Os novos índices compostos cobrem os antigos de uma coluna (prefixo)
+HOT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_articles_seminar_section ON articles(seminar_slug, section_id, id);
+CREATE INDEX IF NOT EXISTS idx_article_author_seq ON article_author(article_id, seq);
+CREATE INDEX IF NOT EXISTS idx_sections_seminar_seq ON sections(seminar_slug, seq);
+DROP INDEX IF EXISTS idx_articles_seminar;
+DROP INDEX IF EXISTS idx_article_author_article;
+DROP INDEX IF EXISTS idx_sections_seminar;
+"""
+
+# Busca textual (scripts/search_articles.py). Tabela FTS5 de conteúdo
+# externo: o texto fica só em articles, o índice é mantido pelos triggers.
+# É dado derivado: fica fora dos dumps SQL e é reconstruído pela migração
+# ('rebuild') quando um dump é restaurado.
+FTS_TABLE = 'articles_fts'
+FTS_COLUMNS = ('title', 'subtitle', 'abstract', 'abstract_en', 'abstract_es',
+               'keywords', 'keywords_en', 'keywords_es', 'references_')
+
+
+def _fts_schema():
+    cols = ', '.join(FTS_COLUMNS)
+    new = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+    old = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    {cols},
+    content='articles', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.rowid, {new});
+END;
+CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old});
+END;
+CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {cols} ON articles BEGIN
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.rowid, {old});
+    INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.rowid, {new});
+END;
+INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild');
+"""
+
+
+def is_derived(name):
+    """Tabela/trigger da busca textual (derivados de articles, fora dos dumps)."""
+    return name == FTS_TABLE or name.startswith(FTS_TABLE + '_')
+
+
+FTS_TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+
+
+def missing_fts(conn):
+    """Objetos da busca textual (tabela e triggers) ausentes no banco."""
+    present = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return [name for name in (FTS_TABLE,) + FTS_TRIGGERS if name not in present]
+
+
+def suspend_fts(conn):
+    """Desliga a manutenção da busca para uma carga em lote.
+
+    Remove os triggers e esvazia o índice; rebuild_fts() ao fim da carga
+    refaz os dois. Reindexar tudo de uma vez custa bem menos que os
+    triggers linha a linha numa reimportação completa. Chamar dentro da
+    transação da carga (BEGIN explícito: o módulo sqlite3 não abre
+    transação para DDL), para que uma falha desfaça também o DROP TRIGGER.
+    """
+    for trigger in FTS_TRIGGERS:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+
+
+def rebuild_fts(conn):
+    """Recria a tabela/triggers que faltarem e reindexa articles (sem commit).
+
+    Também serve de reparo: após um VACUUM (que pode renumerar os rowids
+    de articles) ou uma carga com suspend_fts() interrompida.
+    """
+    run_script(conn, _fts_schema())
+
+
+def _statements(sql):
+    """Divide um script SQL em comandos completos (respeita BEGIN...END de triggers)."""
+    stmt = ''
+    for line in sql.splitlines(keepends=True):
+        stmt += line
+        if sqlite3.complete_statement(stmt):
+            yield stmt.strip()
+            stmt = ''
+
+
+def run_script(conn, sql):
+    """Executa um script na transação corrente (executescript faria COMMIT)."""
+    for stmt in _statements(sql):
+        conn.execute(stmt)
+
+
+def add_column(conn, table, column, decl):
+    """ALTER TABLE ADD COLUMN, se a coluna ainda não existe.
+
+    Bancos anteriores às migrações podem já tê-la (era criada sob demanda).
+    """
+    columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+
+
+def _orcid_tracking(conn):
+    add_column(conn, 'authors', 'orcid_checked_at', 'TEXT')
+    add_column(conn, 'authors', 'orcid_pipeline_version', 'TEXT')
+
+
+def _yaml_hash(conn):
+    add_column(conn, 'articles', 'yaml_hash', 'TEXT')
+
+
+def _ledger_without_fk(conn):
+    if conn.execute('PRAGMA foreign_key_list(zenodo_ledger)').fetchall():
+        run_script(conn, ZENODO_LEDGER_NO_FK)
+
+
+# (versão, descrição, função(conn)) — em ordem; só acrescentar no fim
+MIGRATIONS = [
+    (1, 'schema base', lambda conn: run_script(conn, SCHEMA_V1)),
+    (2, 'authors: orcid_checked_at, orcid_pipeline_version (fetch_orcid.py)', _orcid_tracking),
+    (3, 'articles.yaml_hash (import_yaml_to_db.py --sync)', _yaml_hash),
+    (4, 'zenodo_ledger (upload_zenodo.py)', lambda conn: run_script(conn, ZENODO_LEDGER)),
+    (5, 'índices compostos: artigos por seminário/seção, autores por artigo/seq, seções por seq',
+     lambda conn: run_script(conn, HOT_INDEXES)),
+    (6, 'busca textual: articles_fts (FTS5, sem acentos) e triggers', rebuild_fts),
+    (7, 'zenodo_ledger sem FK para articles (reimportação com depósitos registrados)', _ledger_without_fk),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, verbose=False):
+    """Aplica as migrações pendentes. Retorna a lista das aplicadas [(versão, descrição)]."""
+    if schema_version(conn) >= LATEST:
+        return []
+    conn.commit()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Relê sob o lock: outro processo pode ter migrado nesse meio tempo
+        version = schema_version(conn)
+        applied = []
+        for number, description, apply in MIGRATIONS:
+            if number <= version:
+                continue
+            apply(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+            applied.append((number, description))
+            if verbose:
+                print(f'  migração {number}: {description}')
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return applied
+
+
+def connect(path=DB_PATH, **kwargs):
+    """Conexão de leitura e escrita, já migrada. kwargs vão para sqlite3.connect.
+
+    Também repõe a busca textual se faltar algum trigger (o user_version
+    não acusa uma carga em lote que os removeu e não terminou).
+    """
+    kwargs.setdefault('timeout', BUSY_TIMEOUT)
+    conn = sqlite3.connect(path, **kwargs)
+    for pragma in READ_WRITE_PRAGMAS:
+        conn.execute(pragma)
+    migrate(conn)
+    missing = missing_fts(conn)
+    if missing:
+        print(f"AVISO: busca textual incompleta ({', '.join(missing)}); reconstruindo o índice")
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rebuild_fts(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return conn
+
+
+class SchemaOutdated(sqlite3.DatabaseError):
+    """Banco com migrações pendentes aberto só para leitura."""
+
+
+def connect_readonly(path=DB_PATH, **kwargs):
+    """Conexão só leitura (URI mode=ro, query_only).
+
+    Não migra: um gerador rodando durante um dedup ou busca de ORCID
+    esperaria o lock de escrita. Com o schema atrás, levanta
+    SchemaOutdated pedindo para rodar anais_db.py antes.
+    """
+    kwargs.setdefault('timeout', BUSY_TIMEOUT)
+    uri = f'file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, **kwargs)
+    version = schema_version(conn)
+    if version < LATEST:
+        conn.close()
+        raise SchemaOutdated(
+            f'{path} está no schema v{version}, os scripts esperam v{LATEST}: '
+            f'rode python3 scripts/anais_db.py antes')
+    for pragma in READ_ONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrações do schema do anais.db')
+    parser.add_argument('--status', action='store_true', help='Só mostra a versão do schema')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f'Banco não encontrado: {DB_PATH}')
+        print('Execute init_anais_db.py primeiro.')
+        sys.exit(1)
+
+    conn = sqlite3.connect(DB_PATH)
+    version = schema_version(conn)
+    print(f'Schema: versão {version} (mais recente: {LATEST})')
+    if not args.status:
+        applied = migrate(conn, verbose=True)
+        print(f'{len(applied)} migração(ões) aplicada(s)' if applied else 'Nada a migrar')
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Gera uma API JSON estática, só leitura, a partir do anais.db.
+
+Árvore versionada em site/static/api/v1/ (servível de qualquer host estático):
+
+    index.json                          versão, totais, links, hash do snapshot
+    seminars.json                       seminários com contagens e links
+    seminars/{slug}/articles/{n}.json   artigos do seminário (paginado)
+    articles/{id}.json                  registro completo do artigo
+    authors/index/{n}.json              índice de autores (paginado)
+    authors/{id}.json                   autor (ORCID, artigos)
+    hashes.json                         {caminho: sha256} de todos os arquivos
+
+Cada listagem traz o hash dos registros que referencia, e hashes.json dá o
+sha256 de cada arquivo: clientes usam esses hashes como ETag (ou para
+baixar só o que mudou). Ao lado de cada .json vão .json.gz e, se o módulo
+brotli estiver instalado, .json.br (pré-comprimidos, para servidores com
+gzip_static/brotli_static).
+
+Os artigos são lidos num único cursor ordenado (seminário, id); os autores
+são acumulados durante a passada. Só arquivos que mudaram são regravados, e
+arquivos que saíram da API são apagados.
+
+Uso:
+    python3 scripts/build_json_api.py
+    python3 scripts/build_json_api.py --outdir /tmp/api --page-size 50
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from db2hugo import fetch_authors_grouped, get_ambito, get_db
+from export_citations import build_record, iter_articles
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_VERSION = 'v1'
+OUT_DIR = os.path.join(BASE_DIR, 'site', 'static', 'api', API_VERSION)
+PAGE_SIZE = 100
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class APIWriter:
+    """Acumula os arquivos da API: {caminho relativo: bytes}."""
+
+    def __init__(self):
+        self.files = {}
+
+    def put(self, relpath, obj):
+        data = _dumps(obj).encode('utf-8')
+        self.files[relpath] = data
+        return _hash(data)
+
+    def paginate(self, prefix, items, page_size, extra=None):
+        """Grava {prefix}/{n}.json (n a partir de 1) com links next/prev."""
+        pages = max(1, -(-len(items) // page_size))
+        for n in range(1, pages + 1):
+            page = {
+                'page': n,
+                'pages': pages,
+                'total': len(items),
+                'items': items[(n - 1) * page_size:n * page_size],
+                'next': f'{prefix}/{n + 1}.json' if n < pages else None,
+                'prev': f'{prefix}/{n - 1}.json' if n > 1 else None,
+            }
+            if extra:
+                page.update(extra)
+            self.put(f'{prefix}/{n}.json', page)
+        return pages
+
+
+def build_api(db, page_size=PAGE_SIZE):
+    """Monta a API em memória numa passada pelos artigos. Retorna APIWriter."""
+    api = APIWriter()
+    authors = fetch_authors_grouped(db)
+    seminars = {r['slug']: r for r in db.execute('SELECT * FROM seminars ORDER BY slug')}
+
+    by_seminar = {}        # slug -> [resumo de artigo]
+    author_articles = {}   # author_id -> [article_id]
+    for row in iter_articles(db):
+        article_authors = authors.get(row['id'], [])
+        rec = build_record(row, article_authors)
+        for au, row_au in zip(rec['authors'], article_authors):
+            au['id'] = row_au['author_id']
+            au['href'] = f"authors/{row_au['author_id']}.json"
+            author_articles.setdefault(row_au['author_id'], []).append(row['id'])
+        rec['seminar_href'] = f"seminars/{row['seminar_slug']}/articles/1.json"
+        digest = api.put(f"articles/{row['id']}.json", rec)
+        by_seminar.setdefault(row['seminar_slug'], []).append({
+            'id': rec['id'],
+            'title': rec['title'],
+            'subtitle': rec['subtitle'],
+            'authors': [f"{au['familyname']}, {au['givenname']}" for au in rec['authors']],
+            'doi': rec['doi'],
+            'href': f"articles/{row['id']}.json",
+            'hash': digest,
+        })
+
+    # Seminários
+    seminar_index = []
+    for slug, sem in seminars.items():
+        articles = by_seminar.get(slug, [])
+        ambito_slug, ambito_nome = get_ambito(slug)
+        summary = {
+            'slug': slug,
+            'title': sem['title'],
+            'subtitle': sem['subtitle'],
+            'year': sem['year'],
+            'date': sem['date_published'],
+            'location': sem['location'],
+            'isbn': sem['isbn'],
+            'doi': sem['doi'],
+            'ambito': ambito_slug,
+            'ambito_nome': ambito_nome,
+            'articles': len(articles),
+        }
+        prefix = f'seminars/{slug}/articles'
+        api.paginate(prefix, articles, page_size, extra={'seminar': summary})
+        summary['href'] = f'{prefix}/1.json'
+        seminar_index.append(summary)
+    api.put('seminars.json', {'total': len(seminar_index), 'items': seminar_index})
+
+    # Autores (só os que têm artigos)
+    author_index = []
+    rows = db.execute('SELECT id, givenname, familyname, orcid FROM authors ORDER BY familyname, givenname, id')
+    for au in rows:
+        article_ids = author_articles.get(au['id'])
+        if not article_ids:
+            continue
+        rec = {
+            'id': au['id'],
+            'givenname': au['givenname'],
+            'familyname': au['familyname'],
+            'orcid': au['orcid'],
+            'articles': [{'id': aid, 'href': f'articles/{aid}.json'} for aid in article_ids],
+        }
+        digest = api.put(f"authors/{au['id']}.json", rec)
+        author_index.append({
+            'id': au['id'],
+            'name': f"{au['familyname']}, {au['givenname']}",
+            'orcid': au['orcid'],
+            'articles': len(article_ids),
+            'href': f"authors/{au['id']}.json",
+            'hash': digest,
+        })
+    # Índice paginado em authors/index/{n}.json para não colidir com authors/{id}.json
+    author_pages = api.paginate('authors/index', author_index, page_size)
+
+    hashes = {path: _hash(data) for path, data in sorted(api.files.items())}
+    snapshot = _hash(_dumps(hashes).encode('utf-8'))
+    api.put('hashes.json', hashes)
+    api.put('index.json', {
+        'api': API_VERSION,
+        'snapshot': snapshot,
+        'counts': {
+            'seminars': len(seminar_index),
+            'articles': sum(len(v) for v in by_seminar.values()),
+            'authors': len(author_index),
+        },
+        'page_size': page_size,
+        'links': {
+            'seminars': 'seminars.json',
+            'authors': 'authors/index/1.json',
+            'authors_pages': author_pages,
+            'hashes': 'hashes.json',
+        },
+    })
+    return api
+
+
+# --- Gravação ---
+
+SUFFIXES = ('', '.gz', '.br') if brotli is not None else ('', '.gz')
+
+
+def _variants(data):
+    """[(sufixo, bytes)] do arquivo e das versões pré-comprimidas."""
+    out = [('', data), ('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        out.append(('.br', brotli.compress(data)))
+    return out
+
+
+def write_api(api, outdir):
+    """Grava só o que mudou e apaga arquivos que saíram da API.
+
+    Retorna (gravados, inalterados, removidos), contando só os .json.
+    """
+    written = unchanged = 0
+    expected = set()
+    for relpath, data in api.files.items():
+        path = os.path.join(outdir, relpath)
+        expected.update(path + suffix for suffix in SUFFIXES)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                same = f.read() == data
+            if same and all(os.path.exists(path + suffix) for suffix in SUFFIXES):
+                unchanged += 1
+                continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for suffix, payload in _variants(data):
+            tmp = path + suffix + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, path + suffix)
+        written += 1
+
+    removed = 0
+    for root, dirs, files in os.walk(outdir, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            if path not in expected:
+                os.remove(path)
+                removed += name.endswith('.json')
+        if root != outdir and not os.listdir(root):
+            os.rmdir(root)
+    return written, unchanged, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera a API JSON estática (site/static/api/v1)')
+    parser.add_argument('--outdir', default=OUT_DIR, help='Diretório de saída (default: site/static/api/v1)')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE,
+                        help=f'Itens por página nas listagens (default: {PAGE_SIZE})')
+    args = parser.parse_args()
+
+    t0 = time.monotonic()
+    db = get_db()
+    api = build_api(db, args.page_size)
+    db.close()
+    if len(api.files) <= 3:
+        print('Nenhum dado no banco')
+        sys.exit(1)
+    t_build = time.monotonic() - t0
+
+    written, unchanged, removed = write_api(api, args.outdir)
+    raw = sum(len(d) for d in api.files.values())
+    index = json.loads(api.files['index.json'])
+    print(f"{index['counts']['seminars']} seminários, {index['counts']['articles']} artigos, "
+          f"{index['counts']['authors']} autores → {len(api.files)} arquivos "
+          f"({raw / 1024 / 1024:.1f} MB sem compressão)")
+    print(f'Snapshot {index["snapshot"][:12]}: {written} gravados, {unchanged} inalterados, '
+          f'{removed} removidos (montagem {t_build:.1f}s, total {time.monotonic() - t0:.1f}s)')
+    if brotli is None:
+        print('Aviso: módulo brotli não instalado, sem variantes .br (pip install brotli)')
+
+
+if __name__ == '__main__':
+    main()
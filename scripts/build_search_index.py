@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Gera o índice de busca estático do site (índice invertido fragmentado).
+
+Lê o anais.db e grava em site/static/busca/:
+
+    manifest.json       versão, pesos, prefixos → fragmento, blocos de docs
+    t-{prefixo}.json    {termo: [doc, peso, Δdoc, peso, ...]} (docs em delta)
+    docs-{n}.json       [[artigo, título, url, seminário, ano], ...]
+
+Termos: título, subtítulo, resumo, palavras-chave e nomes dos autores, em
+minúsculas e sem acentos ("Niemeyer", "niemeyer", "NIÉMEYER" → niemeyer),
+sem stopwords. Os fragmentos são separados pelo prefixo do termo: começa com
+1 caractere e, se um fragmento passar do orçamento (--shard-kb, gzip), é
+dividido em prefixos de 2 caracteres, e assim por diante. O navegador busca
+o manifest, escolhe o prefixo mais longo que casa com cada termo e baixa só
+esses fragmentos (ver site/static/js/busca.js).
+
+Só regrava arquivos cujo conteúdo mudou e apaga fragmentos que sumiram.
+
+Uso:
+    python3 scripts/build_search_index.py
+    python3 scripts/build_search_index.py --shard-kb 24 --bench 500
+    python3 scripts/build_search_index.py --query "habitação social recife"
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from db2hugo import fetch_authors_grouped, get_ambito, get_db, parse_json_field
+from text_terms import STOPWORDS, tokenize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT_DIR = os.path.join(BASE_DIR, 'site', 'static', 'busca')
+
+INDEX_VERSION = 1
+DOCS_PER_BLOCK = 250
+SHARD_KB = 32          # orçamento por fragmento (gzip)
+TOTAL_KB = 2048        # orçamento do índice inteiro (gzip)
+
+# Peso de cada ocorrência por campo
+FIELD_WEIGHTS = {
+    'title': 4,
+    'keywords': 3,
+    'authors': 3,
+    'abstract': 1,
+}
+
+
+# --- Construção ---
+
+def load_documents(db):
+    """Artigos com os campos indexados, em ordem de id."""
+    authors = fetch_authors_grouped(db)
+    rows = db.execute("""
+        SELECT a.id, a.seminar_slug, a.title, a.subtitle, a.abstract, a.keywords,
+               s.date_published
+        FROM articles a
+        JOIN seminars s ON s.slug = a.seminar_slug
+        ORDER BY a.id
+    """).fetchall()
+    docs = []
+    for r in rows:
+        title = r['title'] + (f": {r['subtitle']}" if r['subtitle'] else '')
+        ambito_slug, _ = get_ambito(r['seminar_slug'])
+        docs.append({
+            'id': r['id'],
+            'title': title,
+            'url': f"/{ambito_slug}/{r['seminar_slug']}/{r['id']}/",
+            'seminar': r['seminar_slug'],
+            'year': (r['date_published'] or '')[:4],
+            'fields': {
+                'title': title,
+                'keywords': ' '.join(parse_json_field(r['keywords'])),
+                'authors': ' '.join(f"{au['givenname']} {au['familyname']}"
+                                    for au in authors.get(r['id'], [])),
+                'abstract': r['abstract'],
+            },
+        })
+    return docs
+
+
+def build_postings(docs):
+    """{termo: {doc: peso}}."""
+    postings = defaultdict(lambda: defaultdict(int))
+    for n, doc in enumerate(docs):
+        for field, text in doc['fields'].items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                postings[term][n] += weight
+    return postings
+
+
+def encode_postings(doc_weights):
+    """{doc: peso} → [doc, peso, Δdoc, peso, ...] (docs crescentes, em delta)."""
+    out = []
+    prev = 0
+    for doc in sorted(doc_weights):
+        out.extend((doc - prev, doc_weights[doc]))
+        prev = doc
+    return out
+
+
+def decode_postings(encoded):
+    docs = {}
+    doc = 0
+    for i in range(0, len(encoded), 2):
+        doc += encoded[i]
+        docs[doc] = encoded[i + 1]
+    return docs
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def _gz_size(data):
+    return len(gzip.compress(data, mtime=0))
+
+
+def split_shards(postings, budget_bytes):
+    """Agrupa termos por prefixo, alongando o prefixo dos grupos acima do orçamento.
+
+    Retorna {prefixo: {termo: postings codificados}}.
+    """
+    encoded = {term: encode_postings(dw) for term, dw in postings.items()}
+    pending = [('', sorted(encoded))]
+    shards = {}
+    while pending:
+        prefix, terms = pending.pop()
+        by_next = defaultdict(list)
+        for term in terms:
+            if len(term) > len(prefix):
+                by_next[term[:len(prefix) + 1]].append(term)
+            else:
+                # termo igual ao prefixo que está sendo dividido: fragmento próprio
+                by_next[prefix].append(term)
+        for sub, sub_terms in by_next.items():
+            shard = {t: encoded[t] for t in sub_terms}
+            too_big = _gz_size(_dumps(shard).encode()) > budget_bytes
+            if sub == prefix or not too_big or len(sub_terms) == 1:
+                shards.setdefault(sub, {}).update(shard)
+            else:
+                pending.append((sub, sub_terms))
+    return shards
+
+
+def build_index(docs, shard_kb=SHARD_KB):
+    """Retorna {nome_arquivo: bytes} do índice completo."""
+    postings = build_postings(docs)
+    shards = split_shards(postings, shard_kb * 1024)
+
+    files = {}
+    shard_map = {}
+    for prefix in sorted(shards):
+        name = f't-{prefix or "_"}.json'
+        shard_map[prefix] = name
+        files[name] = _dumps(shards[prefix]).encode()
+
+    doc_blocks = []
+    for start in range(0, len(docs), DOCS_PER_BLOCK):
+        name = f'docs-{start // DOCS_PER_BLOCK}.json'
+        block = [[d['id'], d['title'], d['url'], d['seminar'], d['year']]
+                 for d in docs[start:start + DOCS_PER_BLOCK]]
+        files[name] = _dumps(block).encode()
+        doc_blocks.append(name)
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'docs': len(docs),
+        'terms': len(postings),
+        'docs_per_block': DOCS_PER_BLOCK,
+        'doc_blocks': doc_blocks,
+        'field_weights': FIELD_WEIGHTS,
+        'stopwords': sorted(STOPWORDS),
+        'shards': shard_map,
+    }
+    files['manifest.json'] = _dumps(manifest).encode()
+    return files
+
+
+def write_index(files, outdir):
+    """Grava só o que mudou; apaga arquivos .json que não fazem mais parte do índice."""
+    os.makedirs(outdir, exist_ok=True)
+    written = 0
+    for name, data in files.items():
+        path = os.path.join(outdir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    continue
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        written += 1
+    removed = 0
+    for name in os.listdir(outdir):
+        if name.endswith('.json') and name not in files:
+            os.remove(os.path.join(outdir, name))
+            removed += 1
+    return written, removed
+
+
+def size_report(files, shard_kb=SHARD_KB, total_kb=TOTAL_KB):
+    """Imprime tamanhos (bruto/gzip) e confere o orçamento. Retorna True se dentro."""
+    shard_sizes = []
+    doc_sizes = []
+    for name, data in files.items():
+        entry = (name, len(data), _gz_size(data))
+        if name.startswith('t-'):
+            shard_sizes.append(entry)
+        elif name.startswith('docs-'):
+            doc_sizes.append(entry)
+    manifest = files['manifest.json']
+    total_raw = sum(len(d) for d in files.values())
+    total_gz = sum(_gz_size(d) for d in files.values())
+    gz = [s[2] for s in shard_sizes]
+
+    print(f'Fragmentos de termos: {len(shard_sizes)} '
+          f'(gzip: mediana {statistics.median(gz) / 1024:.1f} KB, '
+          f'máx {max(gz) / 1024:.1f} KB, orçamento {shard_kb} KB)')
+    for name, raw, gzs in sorted(shard_sizes, key=lambda s: -s[2])[:5]:
+        print(f'  {name:<16} {raw / 1024:8.1f} KB  gzip {gzs / 1024:6.1f} KB')
+    print(f'Blocos de docs: {len(doc_sizes)} '
+          f'(gzip máx {max(s[2] for s in doc_sizes) / 1024:.1f} KB)')
+    print(f'manifest.json: {len(manifest) / 1024:.1f} KB (gzip {_gz_size(manifest) / 1024:.1f} KB)')
+    print(f'Total: {total_raw / 1024:.0f} KB (gzip {total_gz / 1024:.0f} KB, orçamento {total_kb} KB)')
+
+    over = [s for s in shard_sizes if s[2] > shard_kb * 1024]
+    ok = True
+    if over:
+        ok = False
+        print(f'AVISO: {len(over)} fragmento(s) acima do orçamento '
+              f'(termo único grande demais): {", ".join(s[0] for s in over[:5])}')
+    if total_gz > total_kb * 1024:
+        ok = False
+        print('AVISO: índice acima do orçamento total')
+    return ok
+
+
+# --- Consulta (mesma lógica do busca.js) ---
+
+class SearchIndex:
+    """Leitor do índice em disco, com cache de fragmentos como no navegador."""
+
+    def __init__(self, outdir=OUT_DIR, cache=True):
+        self.outdir = outdir
+        self.cache = cache
+        self._files = {}
+        self.loaded = 0
+        self.manifest = self._load('manifest.json')
+        self.prefixes = sorted(self.manifest['shards'], key=len, reverse=True)
+
+    def _load(self, name):
+        if name in self._files:
+            return self._files[name]
+        with open(os.path.join(self.outdir, name), encoding='utf-8') as f:
+            data = json.load(f)
+        self.loaded += 1
+        if self.cache:
+            self._files[name] = data
+        return data
+
+    def shard_for(self, term):
+        for prefix in self.prefixes:
+            if term.startswith(prefix):
+                return self.manifest['shards'][prefix]
+        return None
+
+    def postings(self, term):
+        name = self.shard_for(term)
+        if not name:
+            return {}
+        return decode_postings(self._load(name).get(term, []))
+
+    def search(self, query, limit=10):
+        """Docs com todos os termos (AND), ordenados pela soma dos pesos."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in dict.fromkeys(terms):
+            docs = self.postings(term)
+            if scores is None:
+                scores = dict(docs)
+            else:
+                scores = {d: s + docs[d] for d, s in scores.items() if d in docs}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+        per_block = self.manifest['docs_per_block']
+        results = []
+        for doc, score in ranked:
+            block = self._load(self.manifest['doc_blocks'][doc // per_block])
+            results.append((score, *block[doc % per_block]))
+        return results
+
+
+def benchmark(docs, outdir, n_queries=200, seed=1):
+    """Latência de consulta sobre o corpus real (termos sorteados dos títulos)."""
+    rng = random.Random(seed)
+    title_terms = [tokenize(d['fields']['title']) for d in docs]
+    title_terms = [t for t in title_terms if t]
+    queries = []
+    for _ in range(n_queries):
+        terms = rng.choice(title_terms)
+        k = min(len(terms), rng.choice((1, 1, 2, 2, 3)))
+        queries.append(' '.join(rng.sample(terms, k)))
+
+    for label, cache in (('frio (fragmentos lidos a cada consulta)', False),
+                         ('quente (fragmentos em cache)', True)):
+        index = SearchIndex(outdir, cache=cache)
+        timings = []
+        hits = 0
+        for q in queries:
+            t0 = time.perf_counter()
+            res = index.search(q)
+            timings.append((time.perf_counter() - t0) * 1000)
+            hits += bool(res)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f'  {label}: mediana {statistics.median(timings):.2f} ms, '
+              f'p95 {p95:.2f} ms, máx {timings[-1]:.2f} ms '
+              f'({hits}/{len(queries)} com resultado, {index.loaded} arquivos lidos)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o índice de busca estático do site')
+    parser.add_argument('--outdir', default=OUT_DIR, help='Diretório de saída (default: site/static/busca)')
+    parser.add_argument('--shard-kb', type=int, default=SHARD_KB,
+                        help=f'Orçamento por fragmento, gzip (default: {SHARD_KB})')
+    parser.add_argument('--total-kb', type=int, default=TOTAL_KB,
+                        help=f'Orçamento do índice inteiro, gzip (default: {TOTAL_KB})')
+    parser.add_argument('--bench', type=int, metavar='N', help='Mede a latência de N consultas')
+    parser.add_argument('--query', help='Consulta de teste (não regrava o índice)')
+    args = parser.parse_args()
+
+    if args.query:
+        for score, article_id, title, url, seminar, year in SearchIndex(args.outdir).search(args.query):
+            print(f'{score:4d}  {article_id:<14} {title[:70]}  {url}')
+        return
+
+    db = get_db()
+    t0 = time.monotonic()
+    docs = load_documents(db)
+    db.close()
+    if not docs:
+        print('Nenhum artigo no banco')
+        sys.exit(1)
+    files = build_index(docs, args.shard_kb)
+    written, removed = write_index(files, args.outdir)
+    print(f'{len(docs)} artigos indexados em {time.monotonic() - t0:.1f}s → {args.outdir}')
+    print(f'Arquivos: {written} gravados, {len(files) - written} inalterados, {removed} removidos\n')
+    size_report(files, args.shard_kb, args.total_kb)
+
+    if args.bench:
+        print(f'\nBenchmark ({args.bench} consultas):')
+        benchmark(docs, args.outdir, args.bench)
+
+
+if __name__ == '__main__':
+    main()
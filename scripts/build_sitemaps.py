@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Gera sitemaps e signmaps fragmentados por seminário, com lastmod por hash.
+
+Substitui o sitemap.xml único do Hugo e o signmap.xml (index.signmap.xml),
+que cresciam com o acervo inteiro num só arquivo. Grava em site/static/:
+
+    sitemap.xml                 índice (sitemapindex) dos fragmentos abaixo
+    sitemaps/geral.xml          home e páginas de âmbito
+    sitemaps/{slug}.xml         página do seminário e dos seus artigos
+    sitemaps/autores.xml        páginas de autores (autores/{id}/)
+    sitemap-taxonomias.xml      (gerado pelo Hugo: palavras-chave)
+    signmap.xml                 índice dos fragmentos de signposting
+    signposting/{slug}.xml      rs:ln por artigo (DOI, PDF, CSL-JSON, licença, ORCID)
+
+O lastmod de cada página vem do hash do conteúdo que o db2hugo gera para
+ela: o estado (site/.sitemap_state.json) guarda {página: [hash, lastmod]}
+e o lastmod só avança quando o hash muda. O lastmod de um fragmento é o
+maior lastmod das suas páginas, e um fragmento só é regravado se mudou —
+os crawlers relêem apenas os fragmentos alterados.
+
+Uso:
+    python3 scripts/build_sitemaps.py
+    python3 scripts/build_sitemaps.py --outdir /tmp/static --date 2026-01-31
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+from xml.sax.saxutils import escape, quoteattr
+
+from db2hugo import (AUTHORS_SECTION, doi_to_record_id, fetch_authors_grouped, get_db,
+                     load_fichas, render_authors, render_homepage, render_seminar)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE_DIR = os.path.join(BASE_DIR, 'site')
+OUT_DIR = os.path.join(SITE_DIR, 'static')
+STATE_PATH = os.path.join(SITE_DIR, '.sitemap_state.json')
+
+GENERAL_SHARD = 'geral'
+HUGO_SITEMAP = 'sitemap-taxonomias.xml'  # [sitemap] filename em site/config.toml
+LICENSE_URL = 'https://creativecommons.org/licenses/by-nc-nd/4.0/'
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+RS_NS = 'http://www.openarchives.org/rs/terms/'
+
+
+def read_base_url():
+    """baseURL do site/config.toml (com barra final)."""
+    with open(os.path.join(SITE_DIR, 'config.toml'), encoding='utf-8') as f:
+        m = re.search(r'^baseURL\s*=\s*"([^"]+)"', f.read(), re.M)
+    return m.group(1).rstrip('/') + '/'
+
+
+def relpath_to_url(relpath):
+    """'nne/sdnne08/sdnne08-001/index.md' → 'nne/sdnne08/sdnne08-001/'."""
+    path = os.path.dirname(relpath)
+    return f'{path}/' if path else ''
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# --- Coleta ---
+
+def collect_pages(db):
+    """Páginas por fragmento: {fragmento: [(url_rel, hash, artigo|None)]}.
+
+    Os hashes vêm do mesmo render do db2hugo, então mudam exatamente quando
+    o index.md/_index.md da página muda.
+    """
+    fichas = load_fichas()
+    authors = fetch_authors_grouped(db)
+    slugs = [r['slug'] for r in db.execute('SELECT slug FROM seminars ORDER BY slug')]
+    articles = {r['id']: r for r in db.execute('SELECT id, doi, file FROM articles')}
+
+    relpath, content = render_homepage()
+    shards = {GENERAL_SHARD: {relpath_to_url(relpath): (_sha256(content), None)}}
+    for slug in slugs:
+        _, files = render_seminar(db, slug, fichas, authors_by_article=authors)
+        pages = {}
+        for kind, relpath, content in files:
+            if kind != 'page':
+                continue
+            url = relpath_to_url(relpath)
+            if relpath.count('/') == 1:  # {ambito}/_index.md
+                shards[GENERAL_SHARD][url] = (_sha256(content), None)
+                continue
+            article_id = url.rstrip('/').rsplit('/', 1)[-1] if relpath.endswith('/index.md') else None
+            pages[url] = (_sha256(content), article_id)
+        if pages:
+            shards[slug] = pages
+    shards[AUTHORS_SECTION] = {relpath_to_url(relpath): (_sha256(content), None)
+                               for _, relpath, content in render_authors(db)}
+
+    return {
+        shard: [(url, digest, articles.get(aid) if aid else None)
+                for url, (digest, aid) in sorted(pages.items())]
+        for shard, pages in shards.items()
+    }, authors
+
+
+def update_lastmod(shards, state, today):
+    """Atualiza {url: [hash, lastmod]}; retorna {url: lastmod}."""
+    lastmod = {}
+    seen = set()
+    for pages in shards.values():
+        for url, digest, _ in pages:
+            seen.add(url)
+            old = state.get(url)
+            if not old or old[0] != digest:
+                state[url] = [digest, today]
+            lastmod[url] = state[url][1]
+    for url in set(state) - seen:
+        del state[url]
+    return lastmod
+
+
+# --- XML ---
+
+def sitemap_xml(base_url, pages, lastmod):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<urlset xmlns="{SITEMAP_NS}">']
+    for url, _, _ in pages:
+        lines.append(f'  <url><loc>{escape(base_url + url)}</loc>'
+                     f'<lastmod>{lastmod[url]}</lastmod></url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def signposting_links(base_url, url, article, authors):
+    """Links tipados de um artigo, como no antigo index.signmap.xml."""
+    links = []
+    if article['doi']:
+        links.append(('cite-as', f"https://doi.org/{article['doi']}", None))
+    record_id = doi_to_record_id(article['doi'])
+    if record_id and article['file']:
+        links.append(('item', f"https://zenodo.org/records/{record_id}/files/{article['file']}",
+                      'application/pdf'))
+    links.append(('describedby', f'{base_url}{url}cite.json',
+                  'application/vnd.citationstyles.csl+json'))
+    links.append(('license', LICENSE_URL, None))
+    for au in authors:
+        if au['orcid']:
+            links.append(('author', f"https://orcid.org/{au['orcid']}", None))
+    return links
+
+
+def signmap_xml(base_url, pages, lastmod, authors_by_article):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<urlset xmlns="{SITEMAP_NS}"',
+             f'        xmlns:rs="{RS_NS}">']
+    for url, _, article in pages:
+        if article is None:
+            continue
+        lines.append('  <url>')
+        lines.append(f'    <loc>{escape(base_url + url)}</loc>')
+        lines.append(f'    <lastmod>{lastmod[url]}</lastmod>')
+        for rel, href, mtype in signposting_links(base_url, url, article,
+                                                  authors_by_article.get(article['id'], [])):
+            type_attr = f' type={quoteattr(mtype)}' if mtype else ''
+            lines.append(f'    <rs:ln rel="{rel}" href={quoteattr(href)}{type_attr}/>')
+        lines.append('  </url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def index_xml(entries):
+    """sitemapindex: entries = [(url absoluta, lastmod|None)]."""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<sitemapindex xmlns="{SITEMAP_NS}">']
+    for loc, mod in entries:
+        mod_tag = f'<lastmod>{mod}</lastmod>' if mod else ''
+        lines.append(f'  <sitemap><loc>{escape(loc)}</loc>{mod_tag}</sitemap>')
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines) + '\n'
+
+
+# --- Gravação ---
+
+def write_if_changed(path, text):
+    """Grava só se o conteúdo mudou. Retorna True se gravou."""
+    data = text.encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def remove_stale(directory, keep):
+    """Apaga .xml de fragmentos que não existem mais. Retorna quantos."""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        if name.endswith('.xml') and name not in keep:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera sitemaps/signmaps fragmentados por seminário')
+    parser.add_argument('--outdir', default=OUT_DIR, help='Diretório de saída (default: site/static)')
+    parser.add_argument('--state', default=STATE_PATH,
+                        help='Estado {página: [hash, lastmod]} (default: site/.sitemap_state.json)')
+    parser.add_argument('--date', help='Data usada como lastmod das páginas alteradas (default: hoje)')
+    args = parser.parse_args()
+
+    today = args.date or datetime.date.today().isoformat()
+    base_url = read_base_url()
+
+    db = get_db()
+    shards, authors = collect_pages(db)
+    db.close()
+    if len(shards) <= 1:
+        print('Nenhum seminário com artigos no banco')
+        sys.exit(1)
+
+    state = load_state(args.state)
+    lastmod = update_lastmod(shards, state, today)
+
+    sitemap_dir = os.path.join(args.outdir, 'sitemaps')
+    signpost_dir = os.path.join(args.outdir, 'signposting')
+    sitemap_index = []
+    signmap_index = []
+    changed = []
+    for shard, pages in shards.items():
+        shard_mod = max(lastmod[url] for url, _, _ in pages)
+        name = f'{shard}.xml'
+        if write_if_changed(os.path.join(sitemap_dir, name), sitemap_xml(base_url, pages, lastmod)):
+            changed.append(f'sitemaps/{name}')
+        sitemap_index.append((f'{base_url}sitemaps/{name}', shard_mod))
+
+        if shard in (GENERAL_SHARD, AUTHORS_SECTION):
+            continue
+        if write_if_changed(os.path.join(signpost_dir, name),
+                            signmap_xml(base_url, pages, lastmod, authors)):
+            changed.append(f'signposting/{name}')
+        signmap_index.append((f'{base_url}signposting/{name}', shard_mod))
+
+    sitemap_index.append((f'{base_url}{HUGO_SITEMAP}', None))
+    if write_if_changed(os.path.join(args.outdir, 'sitemap.xml'), index_xml(sitemap_index)):
+        changed.append('sitemap.xml')
+    if write_if_changed(os.path.join(args.outdir, 'signmap.xml'), index_xml(signmap_index)):
+        changed.append('signmap.xml')
+
+    keep = {f'{shard}.xml' for shard in shards}
+    removed = remove_stale(sitemap_dir, keep) + remove_stale(signpost_dir, keep)
+    save_state(args.state, state)
+
+    n_pages = sum(len(p) for p in shards.values())
+    print(f'{n_pages} páginas em {len(shards)} fragmentos '
+          f'({sum(1 for v in lastmod.values() if v == today)} com lastmod {today})')
+    print(f'Arquivos alterados: {len(changed)}, fragmentos removidos: {removed}')
+    if len(changed) <= 20:
+        for name in changed:
+            print(f'  {name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Detecta artigos quase duplicados no anais.db (MinHash + LSH).
+
+Casos que motivaram: o mesmo trabalho importado num regional e num nacional,
+ou duas vezes no mesmo seminário depois de um split errado do PDF.
+
+Cada artigo vira um conjunto de shingles (trigramas de palavras do título,
+subtítulo e resumo normalizados: minúsculas, sem acento, sem stopwords) e
+uma assinatura MinHash de NUM_PERM valores. A assinatura é cortada em
+faixas (LSH); só artigos que coincidem numa faixa inteira viram candidatos,
+e só os candidatos têm o Jaccard calculado — o custo cresce com o número de
+artigos e de pares parecidos, não com o quadrado do acervo.
+
+Para cada par é mostrado o Jaccard estimado pela assinatura e o exato dos
+shingles; entram no relatório os pares com Jaccard exato >= --threshold.
+
+Uso:
+    python3 scripts/check_duplicates.py                     # acervo inteiro
+    python3 scripts/check_duplicates.py --slug sdnne10      # pares com artigos do seminário
+    python3 scripts/check_duplicates.py --threshold 0.3     # mais sensível
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from itertools import combinations
+
+import anais_db
+from text_terms import tokenize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'anais.db')
+
+SHINGLE_SIZE = 3       # palavras por shingle
+NUM_PERM = 128         # valores por assinatura MinHash
+THRESHOLD = 0.5        # Jaccard mínimo para reportar
+SEED = 2024            # densificação fixa: mesmo resultado a cada execução
+
+
+def shingles(text):
+    """Conjunto de hashes (64 bits) dos trigramas de palavras do texto.
+
+    Textos com menos de SHINGLE_SIZE termos (títulos curtos sem resumo)
+    viram um shingle só.
+    """
+    terms = tokenize(text)
+    size = min(SHINGLE_SIZE, len(terms))
+    return {
+        int.from_bytes(hashlib.blake2b(' '.join(terms[i:i + size]).encode(), digest_size=8).digest(), 'little')
+        for i in range(len(terms) - size + 1)
+    } if terms else set()
+
+
+def probe_order(num_perm=NUM_PERM, seed=SEED):
+    """Para cada posição, a ordem fixa em que as outras são consultadas na densificação."""
+    rng = random.Random(seed)
+    order = []
+    for i in range(num_perm):
+        others = [j for j in range(num_perm) if j != i]
+        rng.shuffle(others)
+        order.append(others)
+    return order
+
+
+def minhash(hashes, probes):
+    """Assinatura MinHash de len(probes) posições com uma única permutação.
+
+    Em vez de num_perm permutações sobre todos os shingles (custo n × k),
+    cada hash cai numa posição (hash % k) e ela guarda o menor valor
+    (one permutation hashing). Posições vazias, comuns em textos curtos,
+    copiam a primeira posição preenchida na ordem de probes
+    (densificação), igual para todos os artigos.
+    """
+    k = len(probes)
+    bins = [None] * k
+    for h in hashes:
+        i = h % k
+        v = h // k
+        if bins[i] is None or v < bins[i]:
+            bins[i] = v
+    signature = list(bins)
+    for i, value in enumerate(bins):
+        if value is None:
+            signature[i] = next(bins[j] for j in probes[i] if bins[j] is not None)
+    return tuple(signature)
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(faixas, linhas por faixa) com b*r = num_perm e limiar (1/b)^(1/r) logo abaixo de threshold.
+
+    Ficar abaixo do limiar pedido troca alguns candidatos a mais (descartados
+    pelo Jaccard exato) por menos duplicatas perdidas.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1])) if below else options[-1]
+
+
+def candidate_pairs(signatures, bands, rows):
+    """Pares de ids que coincidem em pelo menos uma faixa da assinatura."""
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        start = band * rows
+        for art_id, signature in signatures.items():
+            buckets[signature[start:start + rows]].append(art_id)
+        for ids in buckets.values():
+            if len(ids) > 1:
+                pairs.update(combinations(sorted(ids), 2))
+    return pairs
+
+
+def estimate(sig_a, sig_b):
+    """Jaccard estimado: fração de posições iguais nas assinaturas."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def find_duplicates(conn, threshold=THRESHOLD, num_perm=NUM_PERM):
+    """Pares quase duplicados do acervo.
+
+    Retorna (pares, estatísticas); cada par é (id_a, id_b, estimado, exato),
+    do mais para o menos parecido.
+    """
+    t0 = time.monotonic()
+    probes = probe_order(num_perm)
+    sets = {}
+    signatures = {}
+    for art_id, title, subtitle, abstract in conn.execute(
+            'SELECT id, title, subtitle, abstract FROM articles ORDER BY id'):
+        hashes = shingles(' '.join(part or '' for part in (title, subtitle, abstract)))
+        if hashes:
+            sets[art_id] = hashes
+            signatures[art_id] = minhash(hashes, probes)
+    t_sign = time.monotonic() - t0
+
+    bands, rows = lsh_params(threshold, num_perm)
+    candidates = candidate_pairs(signatures, bands, rows)
+    pairs = []
+    for a, b in candidates:
+        exact = jaccard(sets[a], sets[b])
+        if exact >= threshold:
+            pairs.append((a, b, estimate(signatures[a], signatures[b]), exact))
+    pairs.sort(key=lambda p: (-p[3], p[0], p[1]))
+
+    n = len(signatures)
+    stats = {
+        'articles': n,
+        'bands': bands,
+        'rows': rows,
+        'candidates': len(candidates),
+        'all_pairs': n * (n - 1) // 2,
+        'sign_seconds': t_sign,
+        'total_seconds': time.monotonic() - t0,
+    }
+    return pairs, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detectar artigos quase duplicados (MinHash/LSH)')
+    parser.add_argument('--slug', help='Mostrar apenas pares com artigos deste seminário')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'Jaccard mínimo dos shingles (default: {THRESHOLD})')
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM,
+                        help=f'Tamanho da assinatura MinHash (default: {NUM_PERM})')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f'Banco não encontrado: {DB_PATH}')
+        sys.exit(1)
+
+    conn = anais_db.connect_readonly(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    pairs, stats = find_duplicates(conn, args.threshold, args.num_perm)
+
+    info = {}
+    ids = sorted({art_id for p in pairs for art_id in p[:2]})
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        info.update((r['id'], r) for r in conn.execute(
+            f"SELECT id, seminar_slug, title FROM articles WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+    conn.close()
+    if args.slug:
+        pairs = [p for p in pairs if args.slug in (info[p[0]]['seminar_slug'], info[p[1]]['seminar_slug'])]
+
+    for a, b, est, exact in pairs:
+        where = 'mesmo seminário' if info[a]['seminar_slug'] == info[b]['seminar_slug'] else 'seminários diferentes'
+        print(f'  DUP  {a} × {b}  Jaccard {exact:.2f} (estimado {est:.2f}) — {where}')
+        print(f'       {info[a]["title"][:110]}')
+        print(f'       {info[b]["title"][:110]}')
+
+    print(f"\n{stats['articles']} artigos, LSH {stats['bands']}×{stats['rows']}: "
+          f"{stats['candidates']} pares candidatos de {stats['all_pairs']} possíveis "
+          f"(assinaturas {stats['sign_seconds']:.2f}s, total {stats['total_seconds']:.2f}s)")
+    print(f'Total: {len(pairs)} pares com Jaccard >= {args.threshold}')
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,8 @@ import re
 import sqlite3
 import sys
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -128,7 +130,7 @@ def main():
     parser.add_argument('--fix', action='store_true', help='Aplicar correções automáticas (UF, en-dash)')
     args = parser.parse_args()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
     if args.slug:
@@ -29,6 +29,8 @@ import re
 import sqlite3
 import sys
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -193,7 +195,7 @@ def main():
                         help='Máximo de problemas a mostrar no detalhe (default: 200)')
     args = parser.parse_args()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect_readonly(DB_PATH)
     conn.row_factory = sqlite3.Row
 
     where = "WHERE references_ IS NOT NULL AND references_ != ''"
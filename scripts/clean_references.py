@@ -21,9 +21,10 @@ import argparse
 import json
 import os
 import re
-import sqlite3
 import sys
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -171,7 +172,7 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Mostrar mudanças sem aplicar')
     args = parser.parse_args()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     where = "WHERE references_ IS NOT NULL AND references_ != '' AND references_ != '[]'"
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Miniaturas das capas dos seminários (WebP + JPEG de fallback), com cache.
+
+As capas em COVER_DIRS (db2hugo.py) são PNGs em tamanho de impressão, mas
+o site as mostra com 65–160 px de largura. Este módulo gera variantes em
+WIDTHS (1x/2x de cada uso) e grava em .cover_cache/, com o hash da origem
+no nome: capa sem mudança não é reprocessada. O db2hugo copia as variantes
+para o bundle do seminário e lista-as em cover_variants no front matter,
+para o srcset dos templates (partials/cover.html).
+
+Requer: Pillow (pip install pillow). Sem Pillow, cover_variants() retorna
+lista vazia e o site continua usando o PNG original.
+
+Uso direto (pré-gera o cache e mostra a economia):
+    python3 scripts/cover_thumbs.py
+    python3 scripts/cover_thumbs.py --seminar sdnne08
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, '.cover_cache')
+
+WIDTHS = (80, 160, 320)
+FORMATS = (
+    # (extensão, tipo MIME, formato Pillow, opções)
+    ('webp', 'image/webp', 'WEBP', {'quality': 80, 'method': 6}),
+    ('jpg', 'image/jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+_warned = False
+
+
+def source_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def _render(src, dest, width, fmt, options):
+    """Grava a variante; retorna a largura real (nunca amplia a origem)."""
+    with Image.open(src) as im:
+        im = im.convert('RGB')  # JPEG não tem alfa; capas não usam transparência
+        if im.width > width:
+            height = round(im.height * width / im.width)
+            im = im.resize((width, height), Image.LANCZOS)
+        tmp = dest + '.tmp'
+        im.save(tmp, fmt, **options)
+    os.replace(tmp, dest)
+    return im.width
+
+
+def target_widths(source_width):
+    """Larguras de WIDTHS que cabem na origem; capa mais estreita que a
+    maior delas ganha também uma variante na largura original."""
+    widths = [w for w in WIDTHS if w <= source_width]
+    if source_width < WIDTHS[-1] and source_width not in widths:
+        widths.append(source_width)
+    return widths
+
+
+def cover_variants(slug, src, cache_dir=CACHE_DIR):
+    """Gera (se preciso) as variantes da capa. Retorna lista de dicts.
+
+    Cada dict: {file, width, type, path}; file é o nome no bundle do
+    seminário, path é o arquivo no cache e width a largura real do arquivo
+    (o srcset anuncia {width}w). Larguras maiores que a origem não são
+    geradas. Lista vazia sem Pillow.
+    """
+    global _warned
+    if Image is None:
+        if not _warned:
+            print('AVISO: Pillow não instalado, capas sem miniaturas (pip install pillow)')
+            _warned = True
+        return []
+
+    digest = source_hash(src)
+    with Image.open(src) as im:  # só o cabeçalho
+        widths = target_widths(im.width)
+    os.makedirs(cache_dir, exist_ok=True)
+    variants = []
+    for ext, mime, fmt, options in FORMATS:
+        for width in widths:
+            path = os.path.join(cache_dir, f'{slug}-{digest}-{width}.{ext}')
+            if os.path.exists(path):
+                with Image.open(path) as im:
+                    actual = im.width
+            else:
+                actual = _render(src, path, width, fmt, options)
+            variants.append({
+                'file': f'{slug}-{width}.{ext}',
+                'width': actual,
+                'type': mime,
+                'path': path,
+            })
+    return variants
+
+
+def prune_cache(keep, cache_dir=CACHE_DIR):
+    """Apaga do cache variantes de capas antigas (hash que não está em keep)."""
+    if not os.path.isdir(cache_dir):
+        return 0
+    removed = 0
+    for name in os.listdir(cache_dir):
+        if os.path.join(cache_dir, name) not in keep:
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+    return removed
+
+
+def main():
+    from db2hugo import find_cover, get_db
+
+    parser = argparse.ArgumentParser(description='Gera miniaturas das capas (cache .cover_cache/)')
+    parser.add_argument('--seminar', help='Só este seminário')
+    args = parser.parse_args()
+
+    if Image is None:
+        print('ERRO: Pillow necessário. pip install pillow')
+        sys.exit(1)
+
+    db = get_db()
+    slugs = [args.seminar] if args.seminar else [
+        r['slug'] for r in db.execute('SELECT slug FROM seminars ORDER BY slug')]
+    db.close()
+
+    keep = set()
+    total_src = total_thumb = 0
+    for slug in slugs:
+        src = find_cover(slug)
+        if not src:
+            continue
+        variants = cover_variants(slug, src)
+        keep.update(v['path'] for v in variants)
+        src_kb = os.path.getsize(src) / 1024
+        sizes = {v['file']: os.path.getsize(v['path']) / 1024 for v in variants}
+        # Peso servido na listagem: a variante de 160 px (2x das miniaturas),
+        # ou a maior que houver numa capa mais estreita
+        webp = [v for v in variants if v['type'] == 'image/webp' and v['width'] <= 160]
+        webp160 = sizes[max(webp, key=lambda v: v['width'])['file']]
+        total_src += src_kb
+        total_thumb += webp160
+        print(f'{slug}: original {src_kb:7.1f} KB → webp 160px {webp160:5.1f} KB '
+              f'({len(variants)} variantes)')
+
+    if not args.seminar:
+        removed = prune_cache(keep)
+        if removed:
+            print(f'{removed} variantes antigas removidas do cache')
+    if total_src:
+        print(f'\nListagens: {total_src / 1024:.1f} MB de capas originais → '
+              f'{total_thumb / 1024:.2f} MB em WebP 160px '
+              f'({100 * (1 - total_thumb / total_src):.0f}% menos)')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,20 +7,42 @@ Uso:
 
     # Gerar para todos os regionais
     python3 scripts/db2hugo.py --all --outdir site/content
+
+    # Renderizar em 4 processos (saída idêntica ao modo serial)
+    python3 scripts/db2hugo.py --all --outdir site/content --workers 4
+
+    # Listar o que mudou (para rebuild/deploy parcial)
+    python3 scripts/db2hugo.py --all --outdir site/content --changed changed.txt
+
+Geração incremental: só grava páginas cujo conteúdo mudou, comparando com o
+manifesto de hashes (site/.content_manifest.json para site/content), e apaga
+as páginas de artigos que saíram do banco.
+
+Autores: uma página por autor (autores/{id}/, chave authors.id), com
+artigos, seminários, coautores e grafias alternativas já agregados no
+banco — o Hugo não calcula mais a taxonomia de autores.
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import sqlite3
 import sys
 import textwrap
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import shutil
 
 import yaml
 
+import anais_db
+from cover_thumbs import cover_variants
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'anais.db')
 FICHAS_PATH = os.path.join(os.path.dirname(__file__), '..', 'revisao', 'fichas_catalograficas.yaml')
 REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
@@ -46,7 +68,8 @@ AMBITO_MAP = {
 
 
 def get_db():
-    db = sqlite3.connect(DB_PATH)
+    """Conexão só leitura (o db2hugo e os geradores que o importam não gravam)."""
+    db = anais_db.connect_readonly(DB_PATH)
     db.row_factory = sqlite3.Row
     return db
 
@@ -170,14 +193,40 @@ def fetch_articles(db, slug):
     """, (slug,)).fetchall()
 
 
-def fetch_authors(db, article_id):
-    return db.execute("""
-        SELECT au.givenname, au.familyname, aa.affiliation, au.orcid
+def fetch_authors_grouped(db, slug=None):
+    """Autores de todos os artigos de um seminário (ou do acervo, se slug=None).
+
+    Uma única consulta; retorna {article_id: [autores em ordem de seq]}.
+    """
+    sql = """
+        SELECT aa.article_id, aa.author_id, au.givenname, au.familyname, aa.affiliation, au.orcid
         FROM article_author aa
         JOIN authors au ON au.id = aa.author_id
-        WHERE aa.article_id = ?
-        ORDER BY aa.seq
-    """, (article_id,)).fetchall()
+    """
+    params = ()
+    if slug:
+        sql += ' JOIN articles a ON a.id = aa.article_id WHERE a.seminar_slug = ?'
+        params = (slug,)
+    sql += ' ORDER BY aa.article_id, aa.seq'
+    grouped = {}
+    for row in db.execute(sql, params):
+        grouped.setdefault(row['article_id'], []).append(row)
+    return grouped
+
+
+class QueryStats:
+    """Conta consultas SQL (via trace callback) e linhas lidas."""
+
+    def __init__(self, db):
+        self.queries = 0
+        self.rows = 0
+        db.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.queries += 1
+
+    def snapshot(self):
+        return self.queries, self.rows
 
 
 def parse_json_field(val):
@@ -203,11 +252,9 @@ def doi_to_record_id(doi):
     return None
 
 
-def write_article_page(outdir, article, authors, seminar, ambito_slug, ambito_nome, ficha=None):
-    """Write a Hugo content page for a single article."""
+def render_article_page(article, authors, seminar, ambito_slug, ambito_nome, ficha=None):
+    """Render the Hugo content page for a single article. Returns (relpath, content)."""
     article_id = article['id']
-    article_dir = os.path.join(outdir, ambito_slug, seminar['slug'], article_id)
-    os.makedirs(article_dir, exist_ok=True)
 
     doi = article['doi']
     record_id = doi_to_record_id(doi)
@@ -278,6 +325,7 @@ def write_article_page(outdir, article, authors, seminar, ambito_slug, ambito_no
         for au in authors:
             lines.append(f'  - givenname: "{yaml_escape(au["givenname"])}"')
             lines.append(f'    familyname: "{yaml_escape(au["familyname"])}"')
+            lines.append(f'    id: {au["author_id"]}')
             if au['affiliation']:
                 lines.append(f'    affiliation: "{yaml_escape(au["affiliation"])}"')
             if au['orcid']:
@@ -295,11 +343,7 @@ def write_article_page(outdir, article, authors, seminar, ambito_slug, ambito_no
     if ficha:
         lines.append(f'ficha_catalografica: "{yaml_escape(ficha)}"')
 
-    # Taxonomies for Hugo
-    if authors:
-        lines.append('autores:')
-        for au in authors:
-            lines.append(f'  - "{yaml_escape(au["familyname"])}, {yaml_escape(au["givenname"])}"')
+    # Taxonomy for Hugo (autores têm páginas próprias, ver render_authors)
     if keywords:
         lines.append('palavras-chave:')
         for kw in keywords:
@@ -318,26 +362,17 @@ def write_article_page(outdir, article, authors, seminar, ambito_slug, ambito_no
     if body_parts:
         content += '\n' + '\n'.join(body_parts) + '\n'
 
-    filepath = os.path.join(article_dir, 'index.md')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    return f'{ambito_slug}/{seminar["slug"]}/{article_id}/index.md', content
 
-    return filepath
 
+def render_event_index(seminar, articles, ambito_slug, ambito_nome, cover=None, variants=()):
+    """Render _index.md for an event (seminar). Returns (relpath, content).
 
-def write_event_index(outdir, seminar, articles, ambito_slug, ambito_nome):
-    """Write _index.md for an event (seminar)."""
+    cover: caminho da capa (find_cover), copiada ao lado do _index.md.
+    variants: miniaturas da capa (cover_thumbs.cover_variants), para srcset.
+    """
     slug = seminar['slug']
-    event_dir = os.path.join(outdir, ambito_slug, slug)
-    os.makedirs(event_dir, exist_ok=True)
-
-    # Copy cover image if available
-    cover = find_cover(slug)
-    has_cover = False
-    if cover:
-        dest = os.path.join(event_dir, f'{slug}.png')
-        shutil.copy2(cover, dest)
-        has_cover = True
+    has_cover = bool(cover)
 
     lines = ['---']
     lines.append(f'title: "{yaml_escape(seminar["title"])}"')
@@ -362,6 +397,12 @@ def write_event_index(outdir, seminar, articles, ambito_slug, ambito_nome):
         lines.append(f'description: {yaml_multiline(seminar["description"])}')
     if has_cover:
         lines.append(f'cover: "{slug}.png"')
+    if variants:
+        lines.append('cover_variants:')
+        for v in variants:
+            lines.append(f'  - file: "{v["file"]}"')
+            lines.append(f'    width: {v["width"]}')
+            lines.append(f'    type: "{v["type"]}"')
     if seminar['volume_pdf']:
         lines.append(f'volume_pdf: "{seminar["volume_pdf"]}"')
     lines.append(f'article_count: {len(articles)}')
@@ -375,19 +416,14 @@ def write_event_index(outdir, seminar, articles, ambito_slug, ambito_nome):
             lines.append(f'event_state_name: "{state_info[1]}"')
     lines.append('---')
 
-    filepath = os.path.join(event_dir, '_index.md')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines) + '\n')
-    return filepath
+    return f'{ambito_slug}/{slug}/_index.md', '\n'.join(lines) + '\n'
 
 
 AMBITO_WEIGHT = {'brasil': 1, 'se': 2, 'nne': 3, 'sul': 4}
 
 
-def write_ambito_index(outdir, ambito_slug, ambito_nome):
-    """Write _index.md for an âmbito (region)."""
-    ambito_dir = os.path.join(outdir, ambito_slug)
-    os.makedirs(ambito_dir, exist_ok=True)
+def render_ambito_index(ambito_slug, ambito_nome):
+    """Render _index.md for an âmbito (region). Returns (relpath, content)."""
     lines = ['---']
     lines.append(f'title: "Seminários Docomomo {ambito_nome}"')
     lines.append(f'type: ambito')
@@ -395,61 +431,435 @@ def write_ambito_index(outdir, ambito_slug, ambito_nome):
     lines.append(f'ambito_nome: "{ambito_nome}"')
     lines.append(f'weight: {AMBITO_WEIGHT.get(ambito_slug, 99)}')
     lines.append('---')
-    filepath = os.path.join(ambito_dir, '_index.md')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines) + '\n')
-    return filepath
+    return f'{ambito_slug}/_index.md', '\n'.join(lines) + '\n'
 
 
-def write_homepage(outdir):
-    """Write top-level _index.md."""
+def render_homepage():
+    """Render top-level _index.md. Returns (relpath, content)."""
     lines = ['---']
     lines.append('title: "Anais Docomomo Brasil"')
     lines.append('type: homepage')
     lines.append('---')
-    filepath = os.path.join(outdir, '_index.md')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines) + '\n')
-    return filepath
+    return '_index.md', '\n'.join(lines) + '\n'
+
+
+# --- Páginas de autores (autores/{id}/), agregadas no banco ---
+
+AUTHORS_SECTION = 'autores'
+
+
+def _name_key(name):
+    """Chave de ordenação sem acentos e sem caixa."""
+    folded = unicodedata.normalize('NFKD', name)
+    return ''.join(c for c in folded if not unicodedata.combining(c)).lower()
+
+
+def fetch_author_profiles(db):
+    """Perfis de todos os autores com artigos, em quatro consultas.
+
+    Retorna [perfil] em ordem alfabética; cada perfil traz os artigos
+    (mais recentes primeiro), seminários, coautores (com nº de artigos em
+    comum) e grafias alternativas (author_variants).
+    """
+    profiles = {}
+    for row in db.execute("""
+        SELECT id, givenname, familyname, orcid FROM authors
+        WHERE id IN (SELECT author_id FROM article_author)
+    """):
+        profiles[row['id']] = {
+            'id': row['id'],
+            'givenname': row['givenname'],
+            'familyname': row['familyname'],
+            'name': f"{row['familyname']}, {row['givenname']}",
+            'orcid': row['orcid'],
+            'variants': [],
+            'articles': [],
+            'seminars': [],
+            'coauthors': [],
+        }
+
+    for row in db.execute("""
+        SELECT author_id, givenname, familyname FROM author_variants
+        ORDER BY author_id, familyname, givenname
+    """):
+        prof = profiles.get(row['author_id'])
+        if prof is None:
+            continue
+        variant = f"{row['familyname']}, {row['givenname']}"
+        if variant != prof['name'] and variant not in prof['variants']:
+            prof['variants'].append(variant)
+
+    seminars = {}
+    for row in db.execute("""
+        SELECT aa.author_id, a.id, a.title, a.subtitle, a.seminar_slug,
+               s.title AS event_title, s.year
+        FROM article_author aa
+        JOIN articles a ON a.id = aa.article_id
+        JOIN seminars s ON s.slug = a.seminar_slug
+        ORDER BY aa.author_id, s.date_published DESC, a.id
+    """):
+        prof = profiles[row['author_id']]
+        ambito_slug, _ = get_ambito(row['seminar_slug'])
+        prof['articles'].append({
+            'id': row['id'],
+            'title': row['title'],
+            'subtitle': row['subtitle'],
+            'url': f"/{ambito_slug}/{row['seminar_slug']}/{row['id']}/",
+            'event_title': row['event_title'],
+            'year': row['year'],
+        })
+        counts = seminars.setdefault(row['author_id'], {})
+        if row['seminar_slug'] not in counts:
+            counts[row['seminar_slug']] = {
+                'slug': row['seminar_slug'],
+                'title': row['event_title'],
+                'url': f"/{ambito_slug}/{row['seminar_slug']}/",
+                'count': 0,
+            }
+        counts[row['seminar_slug']]['count'] += 1
+    for author_id, counts in seminars.items():
+        profiles[author_id]['seminars'] = list(counts.values())
+
+    for row in db.execute("""
+        SELECT x.author_id, y.author_id AS coauthor_id, COUNT(*) AS n
+        FROM article_author x
+        JOIN article_author y ON y.article_id = x.article_id AND y.author_id != x.author_id
+        GROUP BY x.author_id, y.author_id
+    """):
+        co = profiles[row['coauthor_id']]
+        profiles[row['author_id']]['coauthors'].append(
+            {'id': co['id'], 'name': co['name'], 'count': row['n']})
+    for prof in profiles.values():
+        prof['coauthors'].sort(key=lambda c: (-c['count'], _name_key(c['name']), c['id']))
+
+    return sorted(profiles.values(), key=lambda p: (_name_key(p['name']), p['id']))
+
+
+def taxonomy_slug(term):
+    """Caminho que o Hugo dava ao termo na antiga taxonomia 'autores'.
+
+    Reproduz o urlize do Hugo (UnicodeSanitize + minúsculas): mantém letras,
+    dígitos, marcas e . / \\ _ # + ~ - @; espaços viram um hífen; o resto
+    (vírgula, aspas, parênteses) é descartado. "Silva, João" → "silva-joão".
+    """
+    out = []
+    pending_hyphen = was_hyphen = False
+    for ch in term:
+        category = unicodedata.category(ch)
+        allowed = ch in './\\_#+~-@' or category[0] in 'LM' or category == 'Nd'
+        if allowed:
+            was_hyphen = ch == '-'
+            if pending_hyphen and not was_hyphen:
+                out.append('-')
+            pending_hyphen = False
+            out.append(ch)
+        elif out and not was_hyphen and ch.isspace():
+            pending_hyphen = True
+    return ''.join(out).lower()
+
+
+def assign_aliases(profiles):
+    """URLs antigas /autores/{termo}/ de cada perfil, para redirecionar.
+
+    O termo era "Família, Nome" (nome atual e grafias de author_variants).
+    Um caminho reivindicado por mais de um autor fica com quem o tem como
+    nome atual; entre variantes, com o menor id.
+    """
+    owners = {}
+    for prof in sorted(profiles, key=lambda p: p['id']):
+        owners.setdefault(taxonomy_slug(prof['name']), prof['id'])
+    for prof in sorted(profiles, key=lambda p: p['id']):
+        for variant in prof['variants']:
+            owners.setdefault(taxonomy_slug(variant), prof['id'])
+    for prof in profiles:
+        prof['aliases'] = []
+        for term in [prof['name']] + prof['variants']:
+            slug = taxonomy_slug(term)
+            path = f'/{AUTHORS_SECTION}/{slug}/'
+            if slug and slug != str(prof['id']) and owners[slug] == prof['id'] and path not in prof['aliases']:
+                prof['aliases'].append(path)
+
+
+def render_author_page(profile):
+    """Render autores/{id}/index.md. Returns (relpath, content)."""
+    lines = ['---']
+    lines.append(f'title: "{yaml_escape(profile["name"])}"')
+    lines.append('type: autor')
+    lines.append('outputs: ["HTML"]')
+    lines.append(f'author_id: {profile["id"]}')
+    if profile.get('aliases'):
+        lines.append('aliases:')
+        for alias in profile['aliases']:
+            lines.append(f'  - "{yaml_escape(alias)}"')
+    lines.append(f'givenname: "{yaml_escape(profile["givenname"])}"')
+    lines.append(f'familyname: "{yaml_escape(profile["familyname"])}"')
+    if profile['orcid']:
+        lines.append(f'orcid: "{profile["orcid"]}"')
+    if profile['variants']:
+        lines.append('variants:')
+        for v in profile['variants']:
+            lines.append(f'  - "{yaml_escape(v)}"')
+    lines.append(f'article_count: {len(profile["articles"])}')
+    lines.append('articles:')
+    for art in profile['articles']:
+        lines.append(f'  - id: {art["id"]}')
+        lines.append(f'    title: "{yaml_escape(art["title"])}"')
+        if art['subtitle']:
+            lines.append(f'    subtitle: "{yaml_escape(art["subtitle"])}"')
+        lines.append(f'    url: "{art["url"]}"')
+        lines.append(f'    event_title: "{yaml_escape(art["event_title"])}"')
+        if art['year']:
+            lines.append(f'    year: {art["year"]}')
+    lines.append('seminars:')
+    for sem in profile['seminars']:
+        lines.append(f'  - slug: {sem["slug"]}')
+        lines.append(f'    title: "{yaml_escape(sem["title"])}"')
+        lines.append(f'    url: "{sem["url"]}"')
+        lines.append(f'    count: {sem["count"]}')
+    if profile['coauthors']:
+        lines.append('coauthors:')
+        for co in profile['coauthors']:
+            lines.append(f'  - id: {co["id"]}')
+            lines.append(f'    name: "{yaml_escape(co["name"])}"')
+            lines.append(f'    count: {co["count"]}')
+    lines.append('---')
+    return f'{AUTHORS_SECTION}/{profile["id"]}/index.md', '\n'.join(lines) + '\n'
 
 
-def generate_seminar(db, slug, outdir, fichas=None):
-    """Generate all Hugo content for one seminar."""
+def render_authors_index(profiles):
+    """Render autores/_index.md com a lista já ordenada. Returns (relpath, content)."""
+    lines = ['---']
+    lines.append('title: "Autores"')
+    lines.append('type: autores')
+    lines.append(f'author_count: {len(profiles)}')
+    lines.append('authors:')
+    for prof in profiles:
+        lines.append(f'  - id: {prof["id"]}')
+        lines.append(f'    name: "{yaml_escape(prof["name"])}"')
+        lines.append(f'    count: {len(prof["articles"])}')
+    lines.append('---')
+    return f'{AUTHORS_SECTION}/_index.md', '\n'.join(lines) + '\n'
+
+
+def render_authors(db):
+    """Todas as páginas de autores, como [('page', relpath, conteúdo)]."""
+    profiles = fetch_author_profiles(db)
+    assign_aliases(profiles)
+    files = [('page', *render_authors_index(profiles))]
+    files += [('page', *render_author_page(prof)) for prof in profiles]
+    return files
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ContentWriter:
+    """Grava o conteúdo Hugo só quando muda, guiado por um manifesto de hashes.
+
+    O manifesto ({relpath: sha256}) fica fora do diretório de conteúdo, para
+    o Hugo não publicá-lo. Um arquivo cujo hash bate com o manifesto (ou, sem
+    entrada no manifesto, com o arquivo em disco) não é regravado. Arquivos
+    do manifesto que não foram gerados nesta execução são apagados por
+    prune(). Cada alteração fica em self.changes como (A|M|D, relpath).
+    """
+
+    def __init__(self, outdir, manifest_path=None):
+        self.outdir = outdir
+        if manifest_path is None:
+            manifest_path = default_manifest_path(outdir)
+        self.manifest_path = manifest_path
+        self.manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self.seen = set()
+        self.changes = []
+        self.unchanged = 0
+
+    def _store(self, relpath, digest, write):
+        self.seen.add(relpath)
+        path = os.path.join(self.outdir, relpath)
+        exists = os.path.exists(path)
+        old = self.manifest.get(relpath)
+        if exists and old is None:
+            old = _file_sha256(path)
+        self.manifest[relpath] = digest
+        if exists and old == digest:
+            self.unchanged += 1
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(path)
+        self.changes.append(('M' if exists else 'A', relpath))
+        return True
+
+    def write(self, relpath, content):
+        """Grava uma página renderizada, se mudou. Retorna True se gravou."""
+        if relpath in self.seen:
+            return False  # já gravada nesta execução (ex.: _index.md do âmbito)
+        data = content.encode('utf-8')
+
+        def write(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        return self._store(relpath, _sha256(data), write)
+
+    def copy(self, relpath, src):
+        """Copia um arquivo (capa), se o conteúdo da origem mudou."""
+        if relpath in self.seen:
+            return False
+        return self._store(relpath, _file_sha256(src), lambda path: shutil.copy2(src, path))
+
+    def prune(self, prefixes=None):
+        """Apaga arquivos do manifesto não gerados nesta execução.
+
+        prefixes: só considera caminhos sob esses prefixos (ex.: o seminário
+        gerado com --seminar); None considera o manifesto inteiro.
+        """
+        for relpath in sorted(self.manifest):
+            if relpath in self.seen:
+                continue
+            if prefixes is not None and not relpath.startswith(tuple(prefixes)):
+                continue
+            path = os.path.join(self.outdir, relpath)
+            if os.path.exists(path):
+                os.remove(path)
+                self.changes.append(('D', relpath))
+                _remove_empty_dirs(os.path.dirname(path), self.outdir)
+            del self.manifest[relpath]
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+
+def default_manifest_path(outdir):
+    """site/content -> site/.content_manifest.json (fora do conteúdo do Hugo)."""
+    outdir = os.path.normpath(outdir)
+    return os.path.join(os.path.dirname(outdir) or '.', f'.{os.path.basename(outdir)}_manifest.json')
+
+
+def _remove_empty_dirs(path, stop):
+    stop = os.path.normpath(stop)
+    path = os.path.normpath(path)
+    while path != stop and path.startswith(stop) and not os.listdir(path):
+        os.rmdir(path)
+        path = os.path.dirname(path)
+
+
+def render_seminar(db, slug, fichas=None, authors_by_article=None, stats=None):
+    """Render all Hugo content for one seminar, without writing anything.
+
+    Retorna (nº de artigos, arquivos), arquivos = [(tipo, relpath, dado)]
+    com tipo 'page' (dado = conteúdo) ou 'copy' (dado = caminho da origem),
+    na ordem em que devem ser gravados (ver write_files).
+
+    authors_by_article: {article_id: [autores]} já carregado (ver
+    fetch_authors_grouped); se None, busca os autores do seminário numa
+    única consulta.
+    """
     seminar = fetch_seminar(db, slug)
     if not seminar:
         print(f"Seminário '{slug}' não encontrado")
-        return 0
+        return 0, []
 
     ambito_slug, ambito_nome = get_ambito(slug)
     articles = fetch_articles(db, slug)
+    if stats is not None:
+        stats.rows += 1 + len(articles)
 
     if not articles:
         print(f"Nenhum artigo para '{slug}'")
-        return 0
+        return 0, []
+
+    if authors_by_article is None:
+        authors_by_article = fetch_authors_grouped(db, slug)
+        if stats is not None:
+            stats.rows += sum(len(v) for v in authors_by_article.values())
 
     ficha = (fichas or {}).get(slug)
+    files = []
 
-    # Write ambito index
-    write_ambito_index(outdir, ambito_slug, ambito_nome)
+    # Ambito index
+    files.append(('page', *render_ambito_index(ambito_slug, ambito_nome)))
 
-    # Write event index
-    write_event_index(outdir, seminar, articles, ambito_slug, ambito_nome)
+    # Event index (and cover)
+    cover = find_cover(slug)
+    variants = cover_variants(slug, cover) if cover else []
+    if cover:
+        files.append(('copy', f'{ambito_slug}/{slug}/{slug}.png', cover))
+    for v in variants:
+        files.append(('copy', f'{ambito_slug}/{slug}/{v["file"]}', v['path']))
+    files.append(('page', *render_event_index(seminar, articles, ambito_slug, ambito_nome,
+                                              cover, variants)))
 
-    # Write article pages
-    count = 0
+    # Article pages
     for art in articles:
-        authors = fetch_authors(db, art['id'])
-        write_article_page(outdir, art, authors, seminar, ambito_slug, ambito_nome, ficha=ficha)
-        count += 1
+        authors = authors_by_article.get(art['id'], [])
+        files.append(('page', *render_article_page(art, authors, seminar, ambito_slug, ambito_nome,
+                                                   ficha=ficha)))
 
+    return len(articles), files
+
+
+def write_files(writer, files):
+    """Grava (em lote) os arquivos renderizados por render_seminar."""
+    for kind, relpath, payload in files:
+        if kind == 'copy':
+            writer.copy(relpath, payload)
+        else:
+            writer.write(relpath, payload)
+
+
+def generate_seminar(db, slug, writer, fichas=None, authors_by_article=None, stats=None):
+    """Generate all Hugo content for one seminar. Returns the article count."""
+    count, files = render_seminar(db, slug, fichas, authors_by_article, stats)
+    write_files(writer, files)
     return count
 
 
+def _render_seminar_job(slug, fichas):
+    """Worker do --workers: renderiza um seminário com conexão própria, só leitura."""
+    t0 = time.monotonic()
+    db = get_db()
+    stats = QueryStats(db)
+    try:
+        count, files = render_seminar(db, slug, fichas, stats=stats)
+    finally:
+        db.close()
+    return {
+        'slug': slug,
+        'count': count,
+        'files': files,
+        'queries': stats.queries,
+        'rows': stats.rows,
+        'seconds': time.monotonic() - t0,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description='Gera conteúdo Hugo a partir do anais.db')
     parser.add_argument('--seminar', help='Slug do seminário (ex: sdnne08)')
     parser.add_argument('--all', action='store_true', help='Gerar para todos os seminários (regionais + nacionais)')
     parser.add_argument('--outdir', default='site/content', help='Diretório de saída')
+    parser.add_argument('--manifest',
+                        help='Manifesto de hashes (default: .{outdir}_manifest.json ao lado de outdir)')
+    parser.add_argument('--changed', metavar='ARQUIVO',
+                        help="Lista os arquivos alterados (A/M/D relpath) em ARQUIVO ('-' = stdout)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Renderiza seminários em N processos (default: 1, serial)')
     args = parser.parse_args()
 
     if not args.seminar and not args.all:
@@ -463,8 +873,10 @@ def main():
     # Load fichas catalográficas
     fichas = load_fichas()
 
+    writer = ContentWriter(outdir, args.manifest)
+
     # Write homepage
-    write_homepage(outdir)
+    writer.write(*render_homepage())
 
     if args.all:
         slugs = [r['slug'] for r in db.execute(
@@ -473,13 +885,72 @@ def main():
     else:
         slugs = [args.seminar]
 
-    total = 0
-    for slug in slugs:
-        count = generate_seminar(db, slug, outdir, fichas=fichas)
-        print(f"{slug}: {count} artigos")
-        total += count
+    stats = QueryStats(db)
+    t_start = time.monotonic()
+
+    # --all: autores do acervo inteiro numa só passada (no modo serial;
+    # com --workers cada processo busca os autores do seu seminário)
+    authors_by_article = None
+    if args.all and args.workers <= 1:
+        authors_by_article = fetch_authors_grouped(db)
+        stats.rows += sum(len(v) for v in authors_by_article.values())
+        print(f"Autores pré-carregados: {stats.rows} vínculos em {len(authors_by_article)} artigos "
+              f"({time.monotonic() - t_start:.2f}s)")
 
-    print(f"\nTotal: {total} artigos em {outdir}/")
+    total = 0
+    if args.workers > 1:
+        # Renderização em processos; gravação no processo principal, um lote
+        # por seminário, na mesma ordem do modo serial (saída idêntica)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for res in pool.map(_render_seminar_job, slugs, repeat(fichas)):
+                t0 = time.monotonic()
+                write_files(writer, res['files'])
+                stats.queries += res['queries']
+                stats.rows += res['rows']
+                print(f"{res['slug']}: {res['count']} artigos ({res['queries']} consultas, "
+                      f"{res['rows']} linhas, render {res['seconds']:.2f}s, "
+                      f"escrita {time.monotonic() - t0:.2f}s)")
+                total += res['count']
+    else:
+        for slug in slugs:
+            t0 = time.monotonic()
+            q0, r0 = stats.snapshot()
+            count = generate_seminar(db, slug, writer, fichas=fichas,
+                                     authors_by_article=authors_by_article, stats=stats)
+            q1, r1 = stats.snapshot()
+            print(f"{slug}: {count} artigos ({q1 - q0} consultas, {r1 - r0} linhas, "
+                  f"{time.monotonic() - t0:.2f}s)")
+            total += count
+
+    # Páginas de autores: agregam o acervo inteiro, então são refeitas
+    # também com --seminar (só as que mudaram são gravadas)
+    t0 = time.monotonic()
+    q0, _ = stats.snapshot()
+    author_files = render_authors(db)
+    write_files(writer, author_files)
+    print(f"{AUTHORS_SECTION}: {len(author_files) - 1} autores ({stats.queries - q0} consultas, "
+          f"{time.monotonic() - t0:.2f}s)")
+
+    # Páginas de artigos/seminários/autores que sumiram do banco
+    if args.all:
+        writer.prune()
+    else:
+        writer.prune([f'{get_ambito(slug)[0]}/{slug}/' for slug in slugs] + [f'{AUTHORS_SECTION}/'])
+    writer.save()
+
+    print(f"\nTotal: {total} artigos em {outdir}/ "
+          f"({stats.queries} consultas, {stats.rows} linhas, {time.monotonic() - t_start:.2f}s)")
+    by_status = {st: sum(1 for c, _ in writer.changes if c == st) for st in 'AMD'}
+    print(f"Arquivos: {by_status['A']} novos, {by_status['M']} alterados, "
+          f"{by_status['D']} apagados, {writer.unchanged} inalterados")
+
+    if args.changed:
+        listing = ''.join(f'{st} {relpath}\n' for st, relpath in writer.changes)
+        if args.changed == '-':
+            sys.stdout.write(listing)
+        else:
+            with open(args.changed, 'w', encoding='utf-8') as f:
+                f.write(listing)
     db.close()
 
 
@@ -30,6 +30,8 @@ import re
 import unicodedata
 from collections import defaultdict
 
+import anais_db
+
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
 PILOTIS_PATH = os.path.join(BASE, '..', 'financeiro', 'pilotis', 'dados', 'data', 'pilotis.db')
@@ -756,7 +758,7 @@ def main():
         print(f'Banco não encontrado: {DB_PATH}')
         sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     conn.execute('PRAGMA foreign_keys = ON')
     cur = conn.cursor()
 
@@ -1,33 +1,281 @@
 #!/usr/bin/env python3
-"""Gera anais.sql a partir de anais.db (dump completo)."""
+"""Gera anais.sql a partir de anais.db (dump completo).
 
-import sqlite3
+Modos:
+    (padrão)      anais.sql via iterdump(), gravado com buffer de 1 MB
+    --sorted      anais.sql determinístico: tabelas por nome e linhas pela
+                  chave primária, então o diff entre dois dumps mostra só os
+                  registros alterados (não depende da ordem de inserção)
+    --snapshot    cópia binária consistente via API de backup do SQLite
+                  (anais.snapshot.db; com --zstd, anais.snapshot.db.zst,
+                  requer o módulo zstandard)
+    --restore F   reconstrói o banco a partir de um .sql, .db ou .db.zst
+                  (destino --to, default anais.db; exige --force se existir)
+
+A busca textual (articles_fts e seus triggers, ver anais_db.py) é derivada
+de articles e fica fora do dump SQL; ao restaurar um .sql as migrações são
+aplicadas e o índice é reconstruído. Os snapshots binários a mantêm.
+
+A restauração grava pela API de backup no destino, o que respeita o WAL e
+os locks de quem estiver com o banco aberto. --timings mede, depois de
+gerar, quanto leva para restaurar o arquivo gerado (num diretório
+temporário).
+
+Uso:
+    python3 scripts/dump_anais_db.py
+    python3 scripts/dump_anais_db.py --sorted --timings
+    python3 scripts/dump_anais_db.py --snapshot --zstd
+    python3 scripts/dump_anais_db.py --restore anais.snapshot.db.zst --to /tmp/anais.db
+"""
+
+import argparse
 import os
+import shutil
+import sqlite3
 import sys
+import tempfile
+import time
+
+import anais_db
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
 SQL_PATH = os.path.join(BASE, 'anais.sql')
+SNAPSHOT_PATH = os.path.join(BASE, 'anais.snapshot.db')
+BUFFER_SIZE = 1 << 20
+ZSTD_LEVEL = 10
+
+
+def _size(path):
+    size = os.path.getsize(path)
+    if size > 1_000_000:
+        return f'{size / 1_000_000:.1f} MB'
+    return f'{size / 1_000:.1f} KB'
+
+
+def _quote_ident(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+# Linhas do iterdump() que pertencem à busca textual (tabela FTS, tabelas
+# internas, triggers e a entrada da tabela virtual em sqlite_master)
+DERIVED_PREFIXES = (
+    f'CREATE TABLE \'{anais_db.FTS_TABLE}',
+    f'INSERT INTO "{anais_db.FTS_TABLE}',
+    f"INSERT INTO sqlite_master(type,name,tbl_name,rootpage,sql)VALUES('table','{anais_db.FTS_TABLE}'",
+    f'CREATE TRIGGER {anais_db.FTS_TABLE}_',
+)
+
+
+def iter_dump(conn):
+    """conn.iterdump() sem a busca textual.
+
+    Sem outras tabelas virtuais, o PRAGMA writable_schema que o iterdump()
+    acrescenta por causa da FTS também sai, e o dump fica igual ao de um
+    banco sem busca.
+    """
+    virtual = conn.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'
+    ''').fetchall()
+    keep_writable = any(not anais_db.is_derived(name) for (name,) in virtual)
+    for line in conn.iterdump():
+        if line.startswith(DERIVED_PREFIXES):
+            continue
+        if not keep_writable and line.startswith('PRAGMA writable_schema='):
+            continue
+        yield line
+
+
+def iter_sorted_dump(conn):
+    """Como conn.iterdump(), mas com linhas em ordem determinística.
+
+    Tabelas por nome; linhas pela chave primária (ou por todas as colunas,
+    se a tabela não tiver); índices, triggers e views por nome. A busca
+    textual fica de fora, como em iter_dump().
+    """
+    cur = conn.cursor()
+    yield 'BEGIN TRANSACTION;'
+    writable_schema = False
+    sqlite_sequence = []
+    tables = cur.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE sql NOT NULL AND type = 'table' ORDER BY name
+    ''').fetchall()
+    for name, sql in tables:
+        if name == 'sqlite_sequence':
+            sqlite_sequence = ['DELETE FROM "sqlite_sequence";'] + [
+                f'INSERT INTO "sqlite_sequence" VALUES(\'{seq_name}\',{seq});'
+                for seq_name, seq in cur.execute('SELECT name, seq FROM sqlite_sequence ORDER BY name')]
+            continue
+        if name == 'sqlite_stat1':
+            yield 'ANALYZE "sqlite_master";'
+        elif name.startswith('sqlite_') or anais_db.is_derived(name):
+            continue
+        elif sql.startswith('CREATE VIRTUAL TABLE'):
+            if not writable_schema:
+                writable_schema = True
+                yield 'PRAGMA writable_schema=ON;'
+            yield ("INSERT INTO sqlite_master(type,name,tbl_name,rootpage,sql)"
+                   "VALUES('table','{0}','{0}',0,'{1}');".format(
+                       name.replace("'", "''"), sql.replace("'", "''")))
+        else:
+            yield f'{sql};'
+
+        info = cur.execute(f'PRAGMA table_info({_quote_ident(name)})').fetchall()
+        columns = [_quote_ident(col[1]) for col in info]
+        key = [_quote_ident(col[1]) for col in sorted(info, key=lambda c: c[5]) if col[5]] or columns
+        values = "||','||".join(f'quote({col})' for col in columns)
+        table = _quote_ident(name)
+        rows = cur.execute(f'''
+            SELECT 'INSERT INTO {table.replace("'", "''")} VALUES('||{values}||');'
+            FROM {table} ORDER BY {', '.join(key)}
+        ''')
+        for (line,) in rows:
+            yield line
+
+    for name, sql in cur.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE sql NOT NULL AND type IN ('index', 'trigger', 'view') ORDER BY type, name
+    ''').fetchall():
+        if anais_db.is_derived(name):
+            continue
+        yield f'{sql};'
+    if writable_schema:
+        yield 'PRAGMA writable_schema=OFF;'
+    yield from sqlite_sequence
+    yield 'COMMIT;'
+
+
+def write_dump(conn, path, sort=False):
+    """Grava o dump SQL (tmp + rename), com buffer grande em vez de uma escrita por linha."""
+    lines = iter_sorted_dump(conn) if sort else iter_dump(conn)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        f.writelines(f'{line}\n' for line in lines)
+    os.replace(tmp, path)
+
+
+def write_snapshot(conn, path, compress=False):
+    """Cópia binária consistente via API de backup; com compress, zstd em stream."""
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    dest = sqlite3.connect(tmp)
+    conn.backup(dest)
+    dest.execute('PRAGMA journal_mode = DELETE')  # snapshot autocontido, sem -wal
+    dest.close()
+    if compress:
+        with open(tmp, 'rb') as src, open(path + '.part', 'wb') as out:
+            zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, out)
+        os.remove(tmp)
+        tmp = path + '.part'
+    os.replace(tmp, path)
+
+
+def restore(src_path, target):
+    """Reconstrói target a partir de um dump .sql, snapshot .db ou .db.zst.
+
+    O banco é montado à parte e copiado para target pela API de backup.
+    Retorna o tempo em segundos.
+    """
+    t0 = time.monotonic()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        staging = os.path.join(tmpdir, 'restore.db')
+        if src_path.endswith('.sql'):
+            conn = sqlite3.connect(staging)
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            with open(src_path, encoding='utf-8') as f:
+                conn.executescript(f.read())
+            anais_db.migrate(conn)  # o dump não traz user_version nem a FTS
+            conn.close()
+        elif src_path.endswith('.zst'):
+            with open(src_path, 'rb') as src, open(staging, 'wb') as out:
+                zstandard.ZstdDecompressor().copy_stream(src, out)
+        else:
+            shutil.copyfile(src_path, staging)
+
+        source = sqlite3.connect(staging)
+        check = source.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            source.close()
+            raise sqlite3.DatabaseError(f'{src_path}: quick_check falhou ({check})')
+        dest = sqlite3.connect(target)
+        source.backup(dest)
+        dest.close()
+        source.close()
+    return time.monotonic() - t0
+
+
+def report_restore_time(path):
+    """Restaura path num diretório temporário e mostra o tempo."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        seconds = restore(path, os.path.join(tmpdir, 'anais.db'))
+    print(f'Restauração de {os.path.basename(path)}: {seconds:.2f}s')
 
 
 def main():
-    if not os.path.exists(DB_PATH):
-        print(f'Banco não encontrado: {DB_PATH}')
+    parser = argparse.ArgumentParser(description='Dump/snapshot/restauração do anais.db')
+    parser.add_argument('--sorted', action='store_true',
+                        help='Dump determinístico, linhas ordenadas pela chave primária (para diff)')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Cópia binária via API de backup, em vez do dump SQL')
+    parser.add_argument('--zstd', action='store_true',
+                        help='Snapshot comprimido com zstd (.db.zst; implica --snapshot, requer zstandard)')
+    parser.add_argument('-o', '--output',
+                        help='Arquivo de saída (default: anais.sql ou anais.snapshot.db[.zst])')
+    parser.add_argument('--restore', metavar='ARQUIVO',
+                        help='Restaura o banco a partir de .sql, .db ou .db.zst')
+    parser.add_argument('--to', default=DB_PATH,
+                        help='Destino da restauração (default: anais.db)')
+    parser.add_argument('--force', action='store_true',
+                        help='Permite restaurar sobre um banco existente')
+    parser.add_argument('--timings', action='store_true',
+                        help='Mede a restauração do arquivo gerado (em diretório temporário)')
+    args = parser.parse_args()
+
+    args.snapshot = args.snapshot or args.zstd
+    needs_zstd = args.zstd or (args.restore or '').endswith('.zst')
+    if needs_zstd and zstandard is None:
+        print('Módulo zstandard não instalado (pip install zstandard)')
         sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
+    if args.restore:
+        if not os.path.exists(args.restore):
+            print(f'Arquivo não encontrado: {args.restore}')
+            sys.exit(1)
+        if os.path.exists(args.to) and not args.force:
+            print(f'{args.to} já existe; use --force para sobrescrever')
+            sys.exit(1)
+        seconds = restore(args.restore, args.to)
+        print(f'Banco restaurado: {args.to} ({_size(args.to)}) a partir de {args.restore} em {seconds:.2f}s')
+        return
 
-    with open(SQL_PATH, 'w', encoding='utf-8') as f:
-        for line in conn.iterdump():
-            f.write(line + '\n')
+    if not os.path.exists(DB_PATH):
+        print(f'Banco não encontrado: {DB_PATH}')
+        sys.exit(1)
 
+    conn = anais_db.connect(DB_PATH)
+    t0 = time.monotonic()
+    if args.snapshot:
+        path = args.output or SNAPSHOT_PATH + ('.zst' if args.zstd else '')
+        write_snapshot(conn, path, compress=args.zstd)
+        kind = 'Snapshot'
+    else:
+        path = args.output or SQL_PATH
+        write_dump(conn, path, sort=args.sorted)
+        kind = 'Dump ordenado' if args.sorted else 'Dump'
     conn.close()
+    print(f'{kind} gerado: {path} ({_size(path)}) em {time.monotonic() - t0:.2f}s')
 
-    size = os.path.getsize(SQL_PATH)
-    if size > 1_000_000:
-        print(f'Dump gerado: {SQL_PATH} ({size / 1_000_000:.1f} MB)')
-    else:
-        print(f'Dump gerado: {SQL_PATH} ({size / 1_000:.1f} KB)')
+    if args.timings:
+        report_restore_time(path)
 
 
 if __name__ == '__main__':
@@ -26,6 +26,8 @@ import urllib.parse
 import urllib.request
 from collections import defaultdict
 
+import anais_db
+
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
 PILOTIS_DB = os.path.expanduser(
@@ -278,7 +280,7 @@ def apply_corrections(db, corrections):
 
 def cmd_report():
     """Generate a report of all authors with initials."""
-    db = sqlite3.connect(DB_PATH)
+    db = anais_db.connect(DB_PATH)
     authors = get_authors_with_initials(db)
     db.close()
 
@@ -301,7 +303,7 @@ def cmd_report():
 
 def cmd_pilotis():
     """Match authors with initials against Pilotis and apply."""
-    db = sqlite3.connect(DB_PATH)
+    db = anais_db.connect(DB_PATH)
     authors = get_authors_with_initials(db)
 
     pilotis = load_pilotis_names()
@@ -330,7 +332,7 @@ def cmd_pilotis():
 
 def cmd_web():
     """Search the web for full names of authors with initials."""
-    db = sqlite3.connect(DB_PATH)
+    db = anais_db.connect(DB_PATH)
     authors = get_authors_with_initials(db)
     db.close()
 
@@ -393,7 +395,7 @@ def cmd_apply(filepath):
         print("Nenhuma correção encontrada no arquivo.")
         return
 
-    db = sqlite3.connect(DB_PATH)
+    db = anais_db.connect(DB_PATH)
     apply_corrections(db, corrections)
     db.close()
 
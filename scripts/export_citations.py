@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Exporta as citações do acervo em pacotes (BibTeX, RIS, CSL-JSON, JSON Lines).
+
+Em vez de um cite.bib/cite.ris/cite.json por página (templates Hugo em
+site/layouts/artigo/), gera um arquivo por seminário e um do acervo inteiro,
+comprimidos com gzip, em site/static/citacoes/:
+
+    {slug}.bib.gz   {slug}.ris.gz   {slug}.csl.json.gz   {slug}.jsonl.gz
+    anais.bib.gz    anais.ris.gz    anais.csl.json.gz    anais.jsonl.gz
+    index.json      arquivos, nº de registros, bytes e sha256
+
+Os campos seguem os templates single.bib / single.ris / single.json /
+single.yaml (o JSON Lines traz o registro completo do single.yaml). Os
+artigos são lidos num único cursor e escritos em streaming; o gzip é
+determinístico (mtime=0), então arquivos sem mudança não são regravados.
+
+Uso:
+    python3 scripts/export_citations.py
+    python3 scripts/export_citations.py --seminar sdnne08
+    python3 scripts/export_citations.py --outdir /tmp/citacoes
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+from db2hugo import doi_to_record_id, fetch_authors_grouped, get_db, parse_json_field
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT_DIR = os.path.join(BASE_DIR, 'site', 'static', 'citacoes')
+ARCHIVE_NAME = 'anais'
+
+FORMATS = ('bib', 'ris', 'csl.json', 'jsonl')
+
+
+# --- Registro comum (mesmos dados que o db2hugo põe no front matter) ---
+
+def build_record(row, authors):
+    """Dict com os campos usados pelos templates de citação."""
+    pdf_url = None
+    record_id = doi_to_record_id(row['doi'])
+    if record_id and row['file']:
+        pdf_url = f"https://zenodo.org/records/{record_id}/files/{row['file']}"
+    section = row['section_title']
+    if section:
+        for marker in (' — sd', ' - sd'):
+            idx = section.find(marker)
+            if idx > 0:
+                section = section[:idx]
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'subtitle': row['subtitle'],
+        'date': row['date_published'],
+        'locale': row['locale'] or 'pt-BR',
+        'event_slug': row['seminar_slug'],
+        'event_title': row['event_title'],
+        'event_location': row['location'],
+        'section': section,
+        'doi': row['doi'],
+        'isbn': row['isbn'],
+        'pages': row['pages'],
+        'authors': [
+            {k: au[k] for k in ('givenname', 'familyname', 'affiliation', 'orcid') if au[k]}
+            for au in authors
+        ],
+        'abstract': row['abstract'],
+        'keywords': parse_json_field(row['keywords']),
+        'pdf_url': pdf_url,
+    }
+
+
+def _full_title(rec):
+    return rec['title'] + (f": {rec['subtitle']}" if rec['subtitle'] else '')
+
+
+# --- Formatos (espelham os templates Hugo) ---
+
+def to_bibtex(rec):
+    authors = ' and '.join(f"{au['familyname']}, {au['givenname']}" for au in rec['authors'])
+    lines = [
+        f"@inproceedings{{{rec['id']},",
+        f"  title     = {{{_full_title(rec)}}},",
+        f"  author    = {{{authors}}},",
+        f"  booktitle = {{{rec['event_title']}}},",
+    ]
+    if rec['date']:
+        lines.append(f"  year      = {{{rec['date'][:4]}}},")
+    for key, field in (('address', 'event_location'), ('pages', 'pages'), ('doi', 'doi'),
+                       ('isbn', 'isbn'), ('url', 'pdf_url')):
+        if rec[field]:
+            lines.append(f"  {key:<9} = {{{rec[field]}}},")
+    lines.append('}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def to_ris(rec):
+    lines = ['TY  - CPAPER']
+    lines += [f"AU  - {au['familyname']}, {au['givenname']}" for au in rec['authors']]
+    lines.append(f'TI  - {_full_title(rec)}')
+    lines.append(f"T2  - {rec['event_title']}")
+    if rec['date']:
+        lines.append(f"PY  - {rec['date'][:4]}")
+        lines.append(f"DA  - {rec['date'].replace('-', '/')}")
+    for tag, field in (('CY', 'event_location'), ('SP', 'pages'), ('DO', 'doi'),
+                       ('SN', 'isbn'), ('UR', 'pdf_url'), ('AB', 'abstract')):
+        if rec[field]:
+            lines.append(f'{tag}  - {rec[field]}')
+    lines += [f'KW  - {kw}' for kw in rec['keywords']]
+    lines.append('LA  - pt')
+    lines.append('ER  -')
+    return '\n'.join(lines) + '\n\n'
+
+
+def to_csl(rec):
+    item = {
+        'id': rec['id'],
+        'type': 'paper-conference',
+        'title': _full_title(rec),
+        'container-title': rec['event_title'],
+        'event-title': rec['event_title'],
+    }
+    if rec['event_location']:
+        item['event-place'] = rec['event_location']
+        item['publisher-place'] = rec['event_location']
+    if rec['date']:
+        item['issued'] = {'date-parts': [[int(p) for p in rec['date'].split('-')]]}
+    for key, field in (('DOI', 'doi'), ('ISBN', 'isbn'), ('page', 'pages'), ('URL', 'pdf_url')):
+        if rec[field]:
+            item[key] = rec[field]
+    item['language'] = rec['locale']
+    item['author'] = []
+    for au in rec['authors']:
+        entry = {'family': au['familyname'], 'given': au['givenname']}
+        if au.get('orcid'):
+            entry['ORCID'] = f"https://orcid.org/{au['orcid']}"
+        item['author'].append(entry)
+    return item
+
+
+def to_jsonl(rec):
+    return json.dumps({k: v for k, v in rec.items() if v not in (None, '', [])},
+                      ensure_ascii=False) + '\n'
+
+
+# --- Saída em streaming ---
+
+class Bundle:
+    """Os quatro arquivos .gz de um escopo (um seminário ou o acervo)."""
+
+    def __init__(self, outdir, name):
+        self.outdir = outdir
+        self.name = name
+        self.count = 0
+        self.streams = {}
+        for fmt in FORMATS:
+            path = os.path.join(outdir, f'{name}.{fmt}.gz.tmp')
+            raw = open(path, 'wb')
+            self.streams[fmt] = (path, raw, gzip.GzipFile(
+                filename='', mode='wb', fileobj=raw, mtime=0))
+        self._write('csl.json', '[\n')
+
+    def _write(self, fmt, text):
+        self.streams[fmt][2].write(text.encode('utf-8'))
+
+    def add(self, rec):
+        if self.count:
+            self._write('csl.json', ',\n')
+        self._write('bib', to_bibtex(rec))
+        self._write('ris', to_ris(rec))
+        self._write('csl.json', json.dumps(to_csl(rec), ensure_ascii=False, indent=2))
+        self._write('jsonl', to_jsonl(rec))
+        self.count += 1
+
+    def close(self):
+        """Fecha e publica os arquivos. Retorna [(arquivo, bytes, sha256, gravado)]."""
+        self._write('csl.json', '\n]\n')
+        results = []
+        for fmt, (tmp, raw, gz) in self.streams.items():
+            gz.close()
+            raw.close()
+            final = tmp[:-len('.tmp')]
+            digest = _file_sha256(tmp)
+            changed = not os.path.exists(final) or _file_sha256(final) != digest
+            if changed:
+                os.replace(tmp, final)
+            else:
+                os.remove(tmp)
+            results.append((os.path.basename(final), os.path.getsize(final), digest, changed))
+        return results
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_articles(db, slug=None):
+    """Artigos com dados do seminário e da seção, em ordem (seminário, id)."""
+    sql = """
+        SELECT a.*, sec.title AS section_title,
+               s.title AS event_title, s.location, s.isbn, s.date_published
+        FROM articles a
+        JOIN seminars s ON s.slug = a.seminar_slug
+        LEFT JOIN sections sec ON sec.id = a.section_id
+    """
+    params = ()
+    if slug:
+        sql += ' WHERE a.seminar_slug = ?'
+        params = (slug,)
+    sql += ' ORDER BY a.seminar_slug, a.id'
+    return db.execute(sql, params)
+
+
+def export(db, outdir, slug=None):
+    """Escreve os pacotes. Retorna a lista de entradas para o index.json."""
+    os.makedirs(outdir, exist_ok=True)
+    authors = fetch_authors_grouped(db, slug)
+    archive = None if slug else Bundle(outdir, ARCHIVE_NAME)
+    current = None
+    entries = []
+
+    def finish(bundle):
+        for name, size, digest, changed in bundle.close():
+            entries.append({'file': name, 'scope': bundle.name, 'records': bundle.count,
+                            'bytes': size, 'sha256': digest, 'changed': changed})
+
+    for row in iter_articles(db, slug):
+        if current is None or current.name != row['seminar_slug']:
+            if current:
+                finish(current)
+            current = Bundle(outdir, row['seminar_slug'])
+        rec = build_record(row, authors.get(row['id'], []))
+        current.add(rec)
+        if archive:
+            archive.add(rec)
+    if current:
+        finish(current)
+    if archive:
+        finish(archive)
+    return entries
+
+
+def write_index(outdir, entries):
+    """index.json com todos os pacotes presentes no diretório (mescla com o anterior)."""
+    path = os.path.join(outdir, 'index.json')
+    files = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            files = {e['file']: e for e in json.load(f).get('files', [])}
+    for e in entries:
+        files[e['file']] = {k: v for k, v in e.items() if k != 'changed'}
+    files = {name: e for name, e in files.items() if os.path.exists(os.path.join(outdir, name))}
+    data = {'formats': list(FORMATS), 'files': [files[name] for name in sorted(files)]}
+    text = json.dumps(data, ensure_ascii=False, indent=1) + '\n'
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta citações do acervo em pacotes .gz')
+    parser.add_argument('--seminar', help='Só este seminário (sem o pacote do acervo)')
+    parser.add_argument('--outdir', default=OUT_DIR, help='Diretório de saída (default: site/static/citacoes)')
+    args = parser.parse_args()
+
+    db = get_db()
+    t0 = time.monotonic()
+    entries = export(db, args.outdir, args.seminar)
+    db.close()
+    if not entries:
+        print('Nenhum artigo encontrado')
+        sys.exit(1)
+    write_index(args.outdir, entries)
+
+    changed = sum(e['changed'] for e in entries)
+    for e in entries:
+        if e['scope'] == ARCHIVE_NAME:
+            print(f"  {e['file']:<22} {e['records']:5d} registros  {e['bytes'] / 1024:8.1f} KB")
+    scopes = {e['scope'] for e in entries} - {ARCHIVE_NAME}
+    print(f'{len(scopes)} seminários, {len(entries)} arquivos ({changed} alterados) '
+          f'em {time.monotonic() - t0:.1f}s → {args.outdir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,20 +7,35 @@ Sobrescreve os YAMLs existentes com os dados enriquecidos do banco
 Mantém o formato canônico (issue: + articles:) para todos os seminários.
 Preserva a ordem original dos artigos e autores.
 
+O YAML é escrito artigo a artigo num arquivo temporário ao lado do destino;
+se o sha256 bate com o do arquivo existente, o temporário é descartado,
+senão substitui o arquivo de forma atômica (os.replace). Seminários sem
+mudança não são regravados.
+
 Uso:
     python3 scripts/export_db_to_yaml.py                    # exporta todos
     python3 scripts/export_db_to_yaml.py --slug sdnne07     # exporta um
-    python3 scripts/export_db_to_yaml.py --dry-run           # mostra o que faria
+    python3 scripts/export_db_to_yaml.py --dry-run           # mostra o que mudaria
+    python3 scripts/export_db_to_yaml.py --workers 4         # 4 seminários em paralelo
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import yaml
 
+import anais_db
+
+try:
+    from yaml import CDumper as BaseDumper
+except ImportError:
+    from yaml import Dumper as BaseDumper
+
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
 
@@ -40,7 +55,7 @@ def _init_slug_paths():
                 SLUG_TO_PATH[slug] = os.path.join(root, f)
 
 
-class OrderedDumper(yaml.Dumper):
+class OrderedDumper(BaseDumper):
     """YAML dumper que preserva ordem dos dicts e usa largura grande."""
     pass
 
@@ -68,10 +83,18 @@ def _none_representer(dumper, data):
 OrderedDumper.add_representer(type(None), _none_representer)
 
 
-def export_seminar(conn, slug):
-    """Exporta um seminário do banco para dict no formato YAML."""
+def _parse_json_or_none(val):
+    if not val:
+        return None
+    try:
+        parsed = json.loads(val)
+        return parsed if isinstance(parsed, list) and parsed else None
+    except (json.JSONDecodeError, TypeError):
+        return None
+
 
-    # Seminar metadata
+def seminar_issue(conn, slug):
+    """Metadados do seminário (bloco issue:) ou None se não existe."""
     sem = conn.execute('SELECT * FROM seminars WHERE slug = ?', (slug,)).fetchone()
     if not sem:
         print(f'  AVISO: seminário {slug} não encontrado no banco', file=sys.stderr)
@@ -128,7 +151,36 @@ def export_seminar(conn, slug):
                 s['hide_title'] = True
             issue['sections'].append(s)
 
-    # Articles
+    return issue
+
+
+def iter_articles(conn, slug):
+    """Artigos do seminário como dicts no formato YAML, um a um (ordem por id).
+
+    Os autores do seminário inteiro vêm numa única consulta.
+    """
+    authors_by_article = {}
+    for au in conn.execute(
+        '''SELECT aa.article_id, au.givenname, au.familyname, au.email, au.orcid,
+                  aa.affiliation, aa.bio, aa.country, aa.seq, aa.primary_contact
+           FROM article_author aa
+           JOIN authors au ON au.id = aa.author_id
+           JOIN articles a ON a.id = aa.article_id
+           WHERE a.seminar_slug = ?
+           ORDER BY aa.article_id, aa.seq''',
+        (slug,)
+    ):
+        authors_by_article.setdefault(au['article_id'], []).append({
+            'givenname': au['givenname'],
+            'familyname': au['familyname'],
+            'email': au['email'],
+            'affiliation': au['affiliation'],
+            'orcid': au['orcid'],
+            'bio': au['bio'],
+            'country': au['country'] or 'BR',
+            'primary_contact': bool(au['primary_contact']),
+        })
+
     articles_raw = conn.execute(
         '''SELECT a.*, s.title as section_title
            FROM articles a
@@ -136,51 +188,15 @@ def export_seminar(conn, slug):
            WHERE a.seminar_slug = ?
            ORDER BY a.id''',
         (slug,)
-    ).fetchall()
+    )
 
-    articles = []
     for art in articles_raw:
-        # Authors
-        authors_raw = conn.execute(
-            '''SELECT au.givenname, au.familyname, au.email, au.orcid,
-                      aa.affiliation, aa.bio, aa.country, aa.seq, aa.primary_contact
-               FROM article_author aa
-               JOIN authors au ON au.id = aa.author_id
-               WHERE aa.article_id = ?
-               ORDER BY aa.seq''',
-            (art['id'],)
-        ).fetchall()
-
-        authors = []
-        for au in authors_raw:
-            author = {
-                'givenname': au['givenname'],
-                'familyname': au['familyname'],
-            }
-            author['email'] = au['email']
-            author['affiliation'] = au['affiliation']
-            author['orcid'] = au['orcid']
-            author['bio'] = au['bio']
-            author['country'] = au['country'] or 'BR'
-            author['primary_contact'] = bool(au['primary_contact'])
-            authors.append(author)
-
-        # Keywords
-        def parse_json_or_none(val):
-            if not val:
-                return None
-            try:
-                parsed = json.loads(val)
-                return parsed if isinstance(parsed, list) and parsed else None
-            except (json.JSONDecodeError, TypeError):
-                return None
-
-        keywords = parse_json_or_none(art['keywords'])
-        keywords_en = parse_json_or_none(art['keywords_en'])
-        keywords_es = parse_json_or_none(art['keywords_es'])
+        keywords = _parse_json_or_none(art['keywords'])
+        keywords_en = _parse_json_or_none(art['keywords_en'])
+        keywords_es = _parse_json_or_none(art['keywords_es'])
 
         # References
-        references = parse_json_or_none(art['references_'])
+        references = _parse_json_or_none(art['references_'])
 
         # Ordem lógica: id, título, subtítulo, autores, seção, resumo, keywords,
         # abstract_en, keywords_en, abstract_es, keywords_es, referências,
@@ -195,7 +211,7 @@ def export_seminar(conn, slug):
             article['title_en'] = art['title_en']
         if art['subtitle_en']:
             article['subtitle_en'] = art['subtitle_en']
-        article['authors'] = authors
+        article['authors'] = authors_by_article.get(art['id'], [])
         article['section'] = art['section_title']
         article['abstract'] = art['abstract']
         if keywords:
@@ -220,17 +236,12 @@ def export_seminar(conn, slug):
         if art['document_type'] and art['document_type'] != 'artigo':
             article['document_type'] = art['document_type']
 
-        articles.append(article)
-
-    return {'issue': issue, 'articles': articles}
+        yield article
 
 
 def dump_yaml(data):
-    """Serializa para YAML no formato canônico do projeto.
-
-    Adiciona linha em branco entre artigos para legibilidade.
-    """
-    raw = yaml.dump(
+    """Serializa um fragmento no formato canônico do projeto."""
+    return yaml.dump(
         data,
         Dumper=OrderedDumper,
         default_flow_style=False,
@@ -238,27 +249,97 @@ def dump_yaml(data):
         sort_keys=False,
         width=10000,
     )
-    # Adicionar linha em branco entre artigos (antes de cada "- id:")
-    lines = raw.split('\n')
-    result = []
-    for i, line in enumerate(lines):
-        if line.startswith('- id:') and i > 0 and result and result[-1] != '':
-            result.append('')
-        result.append(line)
-    return '\n'.join(result)
+
+
+def iter_yaml_chunks(conn, slug):
+    """YAML do seminário em pedaços (artigo?, texto): issue:, depois um artigo por vez.
+
+    Cada artigo é um item da lista articles: (sequência sem indentação,
+    como o PyYAML emite dentro de um mapa), precedido de linha em branco
+    para legibilidade. Retorna None se o seminário não existe.
+    """
+    issue = seminar_issue(conn, slug)
+    if issue is None:
+        return None
+
+    def chunks():
+        yield False, dump_yaml({'issue': issue})
+        count = 0
+        for article in iter_articles(conn, slug):
+            if not count:
+                yield False, 'articles:\n'
+            yield True, '\n' + dump_yaml([article])
+            count += 1
+        if not count:
+            yield False, 'articles: []\n'
+
+    return chunks()
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_seminar(conn, slug, outpath, dry_run=False):
+    """Escreve o YAML do seminário em streaming, só substituindo se mudou.
+
+    Retorna (nº de artigos, mudou) ou None se o seminário não existe.
+    """
+    chunks = iter_yaml_chunks(conn, slug)
+    if chunks is None:
+        return None
+
+    os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
+    tmp = f'{outpath}.{os.getpid()}.tmp'
+    h = hashlib.sha256()
+    count = 0
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for is_article, chunk in chunks:
+            count += is_article
+            h.update(chunk.encode('utf-8'))
+            f.write(chunk)
+
+    changed = not os.path.exists(outpath) or _file_sha256(outpath) != h.hexdigest()
+    if changed and not dry_run:
+        os.replace(tmp, outpath)
+    else:
+        os.remove(tmp)
+    return count, changed
+
+
+def get_conn():
+    """Conexão só leitura (a exportação não grava no banco)."""
+    conn = anais_db.connect_readonly(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _export_job(job):
+    """Worker do --workers: exporta um seminário com conexão própria, só leitura."""
+    slug, outpath, dry_run = job
+    conn = get_conn()
+    try:
+        return slug, outpath, write_seminar(conn, slug, outpath, dry_run)
+    finally:
+        conn.close()
 
 
 def main():
     parser = argparse.ArgumentParser(description='Exportar anais.db para YAMLs')
     parser.add_argument('--slug', help='Exportar apenas este seminário')
-    parser.add_argument('--dry-run', action='store_true', help='Apenas mostrar, não escrever')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas mostrar o que mudaria, não escrever')
     parser.add_argument('--outdir', help='Diretório de saída (default: sobrescreve YAMLs existentes)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Exporta seminários em N processos (default: 1, serial)')
     args = parser.parse_args()
 
     _init_slug_paths()
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = get_conn()
 
     if args.slug:
         slugs = [args.slug]
@@ -266,14 +347,8 @@ def main():
         rows = conn.execute('SELECT slug FROM seminars ORDER BY volume, number').fetchall()
         slugs = [r['slug'] for r in rows]
 
-    exported = 0
+    jobs = []
     for slug in slugs:
-        data = export_seminar(conn, slug)
-        if not data:
-            continue
-
-        n_articles = len(data['articles'])
-
         if args.outdir:
             outpath = os.path.join(args.outdir, f'{slug}.yaml')
         elif slug in SLUG_TO_PATH:
@@ -281,19 +356,32 @@ def main():
         else:
             print(f'  {slug}: sem YAML existente, pulando (use --outdir)', file=sys.stderr)
             continue
+        jobs.append((slug, outpath, args.dry_run))
 
-        if args.dry_run:
-            print(f'  {slug}: {n_articles} artigos → {outpath}')
-        else:
-            os.makedirs(os.path.dirname(outpath), exist_ok=True)
-            with open(outpath, 'w', encoding='utf-8') as f:
-                f.write(dump_yaml(data))
-            print(f'  {slug}: {n_articles} artigos → {outpath}')
+    if args.workers > 1:
+        conn.close()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(_export_job, jobs))
+    else:
+        results = [(slug, outpath, write_seminar(conn, slug, outpath, dry_run))
+                   for slug, outpath, dry_run in jobs]
+        conn.close()
 
+    exported = changed = 0
+    for slug, outpath, result in results:
+        if result is None:
+            continue
+        n_articles, was_changed = result
+        if was_changed:
+            status = 'alteraria' if args.dry_run else 'alterado'
+        else:
+            status = 'inalterado'
+        print(f'  {slug}: {n_articles} artigos → {outpath} ({status})')
         exported += 1
+        changed += was_changed
 
-    conn.close()
-    print(f'\nTotal: {exported} seminários exportados')
+    verb = 'a alterar' if args.dry_run else 'alterados'
+    print(f'\nTotal: {exported} seminários exportados ({changed} {verb})')
 
 
 if __name__ == '__main__':
@@ -28,7 +28,6 @@ Versionamento:
 import json
 import os
 import re
-import sqlite3
 import sys
 import time
 import unicodedata
@@ -36,6 +35,8 @@ import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta
 
+import anais_db
+
 # Versão do pipeline — incrementar ao adicionar fontes, corrigir bugs, ou
 # alterar critérios de matching. Permite saber se vale a pena re-checar autores.
 # Changelog:
@@ -524,18 +525,9 @@ def phase_search(resume=False, recheck_days=None):
         recheck_days: se > 0, re-checa autores cuja última verificação
                       foi há mais de N dias (mesmo que já tenham sido checados)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
-    # Garantir que as colunas de tracking existem
-    cur.execute("PRAGMA table_info(authors)")
-    cols = [r[1] for r in cur.fetchall()]
-    if 'orcid_checked_at' not in cols:
-        cur.execute('ALTER TABLE authors ADD COLUMN orcid_checked_at TEXT')
-    if 'orcid_pipeline_version' not in cols:
-        cur.execute('ALTER TABLE authors ADD COLUMN orcid_pipeline_version TEXT')
-    conn.commit()
-
     # Carregar resultados anteriores se resumindo
     results = {'confirmed': [], 'candidates': [], 'not_found': [],
                'too_many': [], 'skipped': [], 'already_has': []}
@@ -827,7 +819,7 @@ def phase_review():
     with open(RESULTS_PATH, 'r') as f:
         results = json.load(f)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     candidates = results.get('candidates', [])
@@ -876,7 +868,7 @@ def phase_apply():
         print('Nenhum ORCID confirmado para aplicar.')
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     applied = 0
@@ -934,7 +926,7 @@ def print_stats(results=None):
 
 def print_check_status():
     """Mostra estatísticas de checagem de ORCIDs no banco."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     cur.execute("SELECT COUNT(*) FROM authors")
@@ -1065,7 +1057,7 @@ def phase_scrape_faculty(apply=False):
     with open(FACULTY_YAML, 'r') as f:
         pages = yaml.safe_load(f)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     # TODOS os autores sem ORCID
@@ -4,14 +4,15 @@
 Applies fixes to anais.db and regional YAML files.
 Only touches regional seminars (never sdbr*).
 """
-import sqlite3
 import glob
 import os
 
+import anais_db
+
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB = os.path.join(BASE, 'anais.db')
 
-db = sqlite3.connect(DB)
+db = anais_db.connect(DB)
 cur = db.cursor()
 total = 0
 
@@ -18,6 +18,8 @@ import sqlite3
 import sys
 import os
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -50,7 +52,7 @@ def is_sdsp06_header_only(ref):
 def main():
     dry_run = '--dry-run' in sys.argv
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
     rows = conn.execute('''
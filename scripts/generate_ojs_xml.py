@@ -26,6 +26,8 @@ import yaml
 from xml.etree.ElementTree import Element, SubElement, tostring
 from xml.dom import minidom
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 FICHAS_PATH = os.path.join(BASE_DIR, 'revisao', 'fichas_catalograficas.yaml')
@@ -116,7 +118,7 @@ def linkify_ficha(text):
 
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect_readonly(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
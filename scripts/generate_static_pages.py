@@ -10,11 +10,15 @@ The HTML uses only inline styles compatible with OJS's TinyMCE editor.
 Cover images use actual OJS URLs from a cover map (JSON: {slug: url}).
 
 Usage:
-    # Fetch cover URLs from OJS API and generate pages:
+    # Fetch cover URLs from OJS API (cached in .ojs_cache/covers_{host}.json;
+    # later runs with --ojs-url reuse the cache, no network):
     python3 scripts/generate_static_pages.py --base-url /index.php/ojs \\
         --ojs-url https://docomomo.ojs.com.br/index.php/ojs \\
         --ojs-user $OJS_TEST_USER --ojs-pass $OJS_TEST_PASS
 
+    # Refresh the cached cover map:
+    python3 scripts/generate_static_pages.py --ojs-url ... --ojs-user ... --ojs-pass ... --refresh-covers
+
     # Or use a pre-built cover map:
     python3 scripts/generate_static_pages.py --cover-map covers.json
 
@@ -26,9 +30,14 @@ import argparse
 import json
 import os
 import sqlite3
+import time
+from urllib.parse import urlparse
+
+import anais_db
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
+CACHE_DIR = os.path.join(BASE_DIR, '.ojs_cache')
 
 # Group definitions
 GROUPS = [
@@ -80,23 +89,16 @@ GROUPS = [
 ]
 
 
-def fetch_cover_map(ojs_url, ojs_user, ojs_pass):
-    """Query OJS API to build {slug: cover_image_url} mapping."""
-    import requests
-
+def fetch_cover_map(client):
+    """Query OJS API (OJSClient) to build {slug: cover_image_url} mapping."""
     VOL_PREFIX = {1: 'sdbr', 3: 'sdnne', 4: 'sdrj', 5: 'sdsp', 6: 'sdsul'}
 
-    s = requests.Session()
-    s.post(f'{ojs_url}/login/signIn',
-           data={'username': ojs_user, 'password': ojs_pass})
-
     cover_map = {}
     offset = 0
     while True:
-        r = s.get(f'{ojs_url}/api/v1/issues',
-                  params={'count': 50, 'offset': offset},
-                  headers={'Accept': 'application/json'})
-        data = r.json()
+        data = client.get_json('/api/v1/issues', params={'count': 50, 'offset': offset})
+        if data is None:
+            raise RuntimeError(f'GET /api/v1/issues offset={offset} failed')
         items = data.get('items', [])
         if not items:
             break
@@ -106,7 +108,7 @@ def fetch_cover_map(ojs_url, ojs_user, ojs_pass):
             prefix = VOL_PREFIX.get(vol)
             if prefix:
                 slug = f'{prefix}{num:02d}'
-                cover_url = issue.get('coverImageUrl', {}).get('pt_BR', '')
+                cover_url = (issue.get('coverImageUrl') or {}).get('pt_BR', '')
                 if cover_url:
                     cover_map[slug] = cover_url
         offset += len(items)
@@ -116,35 +118,85 @@ def fetch_cover_map(ojs_url, ojs_user, ojs_pass):
     return cover_map
 
 
-def get_seminars(conn, volume):
-    """Get all seminars for a volume/group."""
-    rows = conn.execute('''
-        SELECT s.slug, s.title, s.year, s.number, s.volume_pdf,
-               (SELECT COUNT(*) FROM articles a WHERE a.seminar_slug = s.slug) as n_arts
-        FROM seminars s
-        WHERE s.volume = ?
-        ORDER BY s.number
-    ''', (volume,)).fetchall()
-    return rows
+def cover_cache_path(ojs_url):
+    """.ojs_cache/covers_{host}.json (same directory as the OJS index cache)."""
+    host = urlparse(ojs_url).netloc.replace(':', '_')
+    return os.path.join(CACHE_DIR, f'covers_{host}.json')
 
 
-def get_sections(conn, slug):
-    """Get sections for a seminar."""
-    rows = conn.execute('''
-        SELECT sec.title,
-               (SELECT COUNT(*) FROM articles a WHERE a.section_id = sec.id) as n_arts
-        FROM sections sec
-        WHERE sec.seminar_slug = ?
-        ORDER BY sec.seq, sec.id
-    ''', (slug,)).fetchall()
-    return rows
+def load_cover_map(ojs_url, ojs_user=None, ojs_pass=None, refresh=False):
+    """Cover map from the local cache; only queries OJS if refresh=True or not cached.
+
+    Returns (cover_map, source description).
+    """
+    path = cover_cache_path(ojs_url)
+    if not refresh and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['covers'], f'cache {os.path.relpath(path, BASE_DIR)} ({cached["fetched_at"]})'
 
+    if not (ojs_user and ojs_pass):
+        raise SystemExit(f'No cached cover map for {ojs_url}: pass --ojs-user/--ojs-pass')
 
-def generate_group_page(conn, group, base_url, cover_map=None):
-    """Generate HTML for a group index page."""
+    from ojs_client import OJSClient
+    client = OJSClient(ojs_url, ojs_user, ojs_pass)
+    try:
+        cover_map = fetch_cover_map(client)
+    finally:
+        client.close()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'base_url': ojs_url, 'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'covers': cover_map}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+    return cover_map, 'OJS API (cache updated)'
+
+
+def load_archive(conn):
+    """Seminars of all groups, with article and section counts, in one aggregate query.
+
+    Returns {volume: [seminar, ...]}; each seminar is a dict with slug, title,
+    year, number, volume_pdf, n_arts and sections = [{title, n_arts}, ...]
+    (seminars ordered by number, sections by seq, id).
+    """
+    rows = conn.execute('''
+        WITH sem_arts AS (
+            SELECT seminar_slug, COUNT(*) AS n FROM articles GROUP BY seminar_slug
+        ), sec_arts AS (
+            SELECT section_id, COUNT(*) AS n FROM articles
+            WHERE section_id IS NOT NULL GROUP BY section_id
+        )
+        SELECT s.volume, s.slug, s.title, s.year, s.number, s.volume_pdf,
+               COALESCE(sa.n, 0) AS n_arts,
+               sec.id AS sec_id, sec.title AS sec_title, COALESCE(xa.n, 0) AS sec_n
+        FROM seminars s
+        LEFT JOIN sem_arts sa ON sa.seminar_slug = s.slug
+        LEFT JOIN sections sec ON sec.seminar_slug = s.slug
+        LEFT JOIN sec_arts xa ON xa.section_id = sec.id
+        ORDER BY s.volume, s.number, s.slug, sec.seq, sec.id
+    ''').fetchall()
+
+    archive = {}
+    by_slug = {}
+    for r in rows:
+        sem = by_slug.get(r['slug'])
+        if sem is None:
+            sem = {k: r[k] for k in ('slug', 'title', 'year', 'number', 'volume_pdf', 'n_arts')}
+            sem['sections'] = []
+            by_slug[r['slug']] = sem
+            archive.setdefault(r['volume'], []).append(sem)
+        if r['sec_id'] is not None:
+            sem['sections'].append({'title': r['sec_title'], 'n_arts': r['sec_n']})
+    return archive
+
+
+def generate_group_page(archive, group, base_url, cover_map=None):
+    """Generate HTML for a group index page (archive: see load_archive)."""
     if cover_map is None:
         cover_map = {}
-    seminars = get_seminars(conn, group['volume'])
+    seminars = archive.get(group['volume'], [])
 
     html = f'''<div style="max-width: 900px; margin: 0 auto;">
 <p style="font-size: 1.1em; color: #555; margin-bottom: 2em;">{group['description']}</p>
@@ -157,8 +209,7 @@ def generate_group_page(conn, group, base_url, cover_map=None):
         title = sem['title']
         n_arts = sem['n_arts']
 
-        # Get sections
-        sections = get_sections(conn, slug)
+        sections = sem['sections']
 
         issue_url = f'{base_url}/issue/view/{slug}'
         cover_url = cover_map.get(slug, '')
@@ -205,8 +256,8 @@ def generate_group_page(conn, group, base_url, cover_map=None):
     return html
 
 
-def generate_landing_page(conn, base_url, cover_map=None):
-    """Generate HTML for the main landing page with all groups."""
+def generate_landing_page(archive, base_url, cover_map=None):
+    """Generate HTML for the main landing page with all groups (archive: see load_archive)."""
     if cover_map is None:
         cover_map = {}
 
@@ -216,7 +267,7 @@ def generate_landing_page(conn, base_url, cover_map=None):
 '''
 
     for group in GROUPS:
-        seminars = get_seminars(conn, group['volume'])
+        seminars = archive.get(group['volume'], [])
         total_arts = sum(s['n_arts'] for s in seminars)
         n_sems = len(seminars)
         page_url = f'{base_url}/{group["slug"]}'
@@ -265,6 +316,8 @@ def main():
                        help='OJS base URL to fetch cover URLs (e.g. https://docomomo.ojs.com.br/index.php/ojs)')
     parser.add_argument('--ojs-user', help='OJS username')
     parser.add_argument('--ojs-pass', help='OJS password')
+    parser.add_argument('--refresh-covers', action='store_true',
+                       help='Re-fetch cover URLs from OJS even if cached in .ojs_cache/')
     args = parser.parse_args()
 
     os.makedirs(args.outdir, exist_ok=True)
@@ -275,31 +328,33 @@ def main():
         with open(args.cover_map, encoding='utf-8') as f:
             cover_map = json.load(f)
         print(f'Loaded {len(cover_map)} cover URLs from {args.cover_map}')
-    elif args.ojs_url and args.ojs_user and args.ojs_pass:
-        cover_map = fetch_cover_map(args.ojs_url, args.ojs_user, args.ojs_pass)
-        print(f'Fetched {len(cover_map)} cover URLs from OJS API')
+    elif args.ojs_url:
+        cover_map, source = load_cover_map(args.ojs_url, args.ojs_user, args.ojs_pass,
+                                           refresh=args.refresh_covers)
+        print(f'Loaded {len(cover_map)} cover URLs from {source}')
     else:
         print('No cover map provided (use --cover-map or --ojs-url/user/pass). Pages will have no cover images.')
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect_readonly(DB_PATH)
     conn.row_factory = sqlite3.Row
+    archive = load_archive(conn)
+    conn.close()
 
     # Generate landing page
-    landing = generate_landing_page(conn, args.base_url, cover_map)
+    landing = generate_landing_page(archive, args.base_url, cover_map)
     with open(os.path.join(args.outdir, 'landing.html'), 'w', encoding='utf-8') as f:
         f.write(landing)
     print(f'Generated: landing.html')
 
     # Generate group pages
     for group in GROUPS:
-        page = generate_group_page(conn, group, args.base_url, cover_map)
+        page = generate_group_page(archive, group, args.base_url, cover_map)
         filename = f'{group["slug"]}.html'
         with open(os.path.join(args.outdir, filename), 'w', encoding='utf-8') as f:
             f.write(page)
-        n_sems = len(get_seminars(conn, group['volume']))
+        n_sems = len(archive.get(group['volume'], []))
         print(f'Generated: {filename} ({n_sems} seminários)')
 
-    conn.close()
     print(f'\nAll pages in {args.outdir}/')
 
 
@@ -5,12 +5,13 @@ Importa XMLs no OJS via Native XML Plugin.
 Modos de operação:
   --import           Importa XMLs faltantes (sessão fresca por XML)
   --cleanup          Limpa issues duplicadas/vazias/parciais
-  --verify           Verifica estado atual (lista issues e contagens)
+  --verify           Verifica estado atual (índice local de issues/submissions)
   --upload-galleys   Upload PDFs de edição completa como issue galleys
   --dry-run          Apenas lista XMLs sem conectar
 
 Regras:
-- Sessão FRESCA para cada XML (evita rate limiting)
+- Sessão FRESCA para cada XML (evita rate limiting); verificação, limpeza e
+  listagens reaproveitam a sessão do pool (ver ojs_client.py)
 - Mínimo de chamadas API por sessão (login → upload → import → fim)
 - Após importar, NÃO verifica contagem na mesma sessão
 - Verificação é feita em modo separado (--verify)
@@ -28,365 +29,120 @@ Uso:
 
 import argparse
 import glob
+import hashlib
 import os
 import re
-import sqlite3
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
+import anais_db
+from ojs_client import ENVS, MultipartFileStream, OJSClient, get_expected_counts
+from ojs_index import OJSIndex, diff_report, print_diff_report
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-ENVS = {
-    'test': {
-        'url': 'https://docomomo.ojs.com.br/index.php/ojs',
-        'username': os.environ.get('OJS_TEST_USER', 'editor'),
-        'password': os.environ.get('OJS_TEST_PASS', ''),
-    },
-    'prod': {
-        'url': 'https://publicacoes.docomomobrasil.com/anais',
-        'username': os.environ.get('OJS_PROD_USER', 'dmacedo'),
-        'password': os.environ.get('OJS_PROD_PASS', ''),
-    },
-}
-
 IMPORT_DELAY = 60  # segundos entre importações (cooldown do servidor)
 
 
-def fresh_session(base_url, username, password):
-    """Cria sessão nova, faz login, retorna (session, csrf_token)."""
-    s = requests.Session()
-    # Login
-    resp = s.post(
-        f'{base_url}/login/signIn',
-        data={'username': username, 'password': password},
-        allow_redirects=True, timeout=30,
-    )
-    if resp.status_code != 200:
-        raise RuntimeError(f'Login falhou: HTTP {resp.status_code}')
-    # CSRF
-    resp = s.get(
-        f'{base_url}/management/importexport/plugin/NativeImportExportPlugin',
-        timeout=30,
-    )
-    match = re.search(r'"csrfToken":"([^"]+)"', resp.text)
-    if not match:
-        raise RuntimeError('Não obteve CSRF token')
-    return s, match.group(1)
-
-
-def upload_and_import(base_url, session, csrf, filepath):
-    """Upload + import de um XML. Retorna (sucesso, mensagem, temp_id)."""
-    # 1. Upload
-    with open(filepath, 'rb') as f:
-        resp = session.post(
-            f'{base_url}/management/importexport/plugin/'
-            'NativeImportExportPlugin/uploadImportXML',
-            headers={'X-Requested-With': 'XMLHttpRequest'},
-            data={'csrfToken': csrf},
-            files={'uploadedFile': (os.path.basename(filepath), f, 'text/xml')},
-            timeout=120,
-        )
-    if resp.status_code != 200:
-        return False, f'upload HTTP {resp.status_code}', None
-    match = re.search(r'"temporaryFileId":"?(\d+)', resp.text)
-    if not match:
-        return False, f'sem temporaryFileId: {resp.text[:200]}', None
-    temp_id = match.group(1)
-
-    # 2. importBounce
-    session.post(
-        f'{base_url}/management/importexport/plugin/'
-        'NativeImportExportPlugin/importBounce',
-        data={'csrfToken': csrf, 'temporaryFileId': temp_id},
-        timeout=30,
-    )
-
-    # 3. Executar import (pode demorar)
-    try:
-        resp = session.get(
-            f'{base_url}/management/importexport/plugin/'
-            'NativeImportExportPlugin/import',
-            params={'temporaryFileId': temp_id, 'csrfToken': csrf},
-            timeout=600,
-        )
-        text = resp.text
-    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
-        return False, 'timeout/conexão perdida na execução', temp_id
-
-    if not text:
-        return False, 'resposta vazia', temp_id
-    if 'xito' in text:
-        return True, 'OK', temp_id
-    errors = re.findall(r'<li>([^<]+)</li>', text)
-    if errors:
-        return False, '; '.join(e.strip()[:120] for e in errors[:5]), temp_id
-    return False, f'resposta desconhecida: {text[:200]}', temp_id
-
-
-def count_issue_articles(base_url, session, issue_id):
-    """Conta artigos de uma issue. Retorna -1 se erro."""
-    try:
-        resp = session.get(
-            f'{base_url}/api/v1/submissions',
-            params={'issueIds': issue_id, 'count': 1},
-            headers={'Accept': 'application/json'}, timeout=30,
-        )
-        if resp.status_code != 200:
-            return -1
-        return resp.json().get('itemsMax', 0)
-    except Exception:
-        return -1
-
-
-def load_all_issues(base_url, session):
-    """Carrega TODAS as issues. Retorna lista de {id, slug}."""
-    issues = []
-    offset = 0
-    while True:
-        try:
-            resp = session.get(
-                f'{base_url}/api/v1/issues',
-                params={'count': 50, 'offset': offset},
-                headers={'Accept': 'application/json'}, timeout=30,
-            )
-        except Exception:
-            break
-        if resp.status_code != 200:
-            break
-        data = resp.json()
-        items = data.get('items', [])
-        if not items:
-            break
-        for iss in items:
-            url = iss.get('publishedUrl', '') or ''
-            slug = url.rstrip('/').split('/')[-1] if url else None
-            if slug and slug not in ('ojs', 'anais'):
-                issues.append({'id': iss['id'], 'slug': slug})
-        if offset + len(items) >= data.get('itemsMax', 0):
-            break
-        offset += 50
-    return issues
-
-
-def get_issue_submission_ids(base_url, session, issue_id):
-    """Retorna lista de submission IDs de uma issue."""
-    ids = []
-    offset = 0
-    while True:
-        try:
-            resp = session.get(
-                f'{base_url}/api/v1/submissions',
-                params={'issueIds': issue_id, 'count': 100, 'offset': offset},
-                headers={'Accept': 'application/json'}, timeout=30,
-            )
-            if resp.status_code != 200:
-                break
-            data = resp.json()
-        except Exception:
-            break
-        items = data.get('items', [])
-        if not items:
-            break
-        ids.extend(item['id'] for item in items)
-        if len(ids) >= data.get('itemsMax', 0):
-            break
-        offset += 100
-    return ids
-
-
-def delete_submission(base_url, session, csrf, sub_id):
-    """Despublica e deleta um submission."""
-    try:
-        resp = session.get(
-            f'{base_url}/api/v1/submissions/{sub_id}',
-            headers={'Accept': 'application/json'}, timeout=15,
-        )
-        if resp.status_code != 200:
-            return False
-        pub_id = resp.json().get('currentPublicationId')
-        if pub_id:
-            session.put(
-                f'{base_url}/api/v1/submissions/{sub_id}/publications/{pub_id}/unpublish',
-                headers={'X-Csrf-Token': csrf, 'Accept': 'application/json'},
-                timeout=15,
-            )
-        resp = session.delete(
-            f'{base_url}/api/v1/submissions/{sub_id}',
-            headers={'X-Csrf-Token': csrf, 'Accept': 'application/json'},
-            timeout=15,
-        )
-        return resp.status_code == 200
-    except Exception:
-        return False
-
-
-def delete_issue(base_url, session, csrf, issue_id):
-    """Deleta uma issue (deve estar sem artigos)."""
-    try:
-        resp = session.post(
-            f'{base_url}/$$$call$$$/grid/issues/back-issue-grid/delete-issue',
-            data={'csrfToken': csrf, 'issueId': issue_id},
-            timeout=30,
-        )
-        return resp.status_code == 200
-    except Exception:
-        return False
-
-
-def wipe_issue(base_url, session, csrf, issue_id, slug=''):
-    """Apaga todos os artigos de uma issue e depois a issue em si."""
-    sub_ids = get_issue_submission_ids(base_url, session, issue_id)
-    if sub_ids:
-        print(f'    apagando {len(sub_ids)} artigos da issue {issue_id} ({slug})...')
-        for i, sub_id in enumerate(sub_ids):
-            delete_submission(base_url, session, csrf, sub_id)
-            time.sleep(1)
-    if delete_issue(base_url, session, csrf, issue_id):
-        print(f'    issue {issue_id} ({slug}) apagada')
-        return True
-    else:
-        print(f'    AVISO: não conseguiu apagar issue {issue_id} ({slug})')
-        return False
-
-
-def get_expected_counts(db_path):
-    """Lê contagem esperada de artigos por seminário."""
-    conn = sqlite3.connect(db_path)
-    rows = conn.execute(
-        "SELECT seminar_slug, COUNT(*) FROM articles "
-        "WHERE seminar_slug NOT LIKE 'sdbr%' GROUP BY seminar_slug"
-    ).fetchall()
-    conn.close()
-    return dict(rows)
+def cmd_verify(client, expected, full=False):
+    """Verifica estado atual do servidor (issues e contagens) em uma passada."""
+    print('Atualizando índice de issues/submissions...')
+    index = OJSIndex(client).refresh(full=full)
+    st = index.stats
+    print(f'  {st["mode"]}, {st["requests"]} requisições, {st["seconds"]:.1f}s\n')
 
+    rows = diff_report(index, expected)
+    print_diff_report(rows)
+    return {r['slug']: r['issues'][0][0] for r in rows if r['status'] == 'OK'}
 
-def cmd_verify(env, expected):
-    """Verifica estado atual do servidor (issues e contagens)."""
-    base = env['url']
-    print('Login...')
-    s, csrf = fresh_session(base, env['username'], env['password'])
 
-    print('Carregando issues...')
-    all_issues = load_all_issues(base, s)
-    print(f'{len(all_issues)} issues encontradas\n')
+def cmd_cleanup(client, expected):
+    """Limpa issues duplicadas, vazias e parciais.
 
-    from collections import defaultdict
-    by_slug = defaultdict(list)
-    for iss in all_issues:
-        by_slug[iss['slug']].append(iss['id'])
-
-    good = {}
-    problems = []
-
-    for slug, ids in sorted(by_slug.items()):
-        exp = expected.get(slug, '?')
-        for issue_id in ids:
-            count = count_issue_articles(base, s, issue_id)
-            if count == -1:
-                # Sessão pode ter expirado, refazer
-                time.sleep(5)
-                s, csrf = fresh_session(base, env['username'], env['password'])
-                count = count_issue_articles(base, s, issue_id)
-
-            status = ''
-            if isinstance(exp, int):
-                if count >= exp:
-                    status = ' ✅'
-                    good[slug] = issue_id
-                elif count == 0:
-                    status = ' ❌ VAZIA'
-                    problems.append((slug, issue_id, count))
-                elif count > 0:
-                    status = f' ⚠️ PARCIAL (esperado {exp})'
-                    problems.append((slug, issue_id, count))
-            print(f'  {slug}: issue {issue_id}, {count} arts (esperado: {exp}){status}')
-            time.sleep(2)  # Delay entre contagens
-
-    # Slugs sem issue
-    all_slugs = set(expected.keys())
-    found_slugs = set(by_slug.keys())
-    missing = all_slugs - found_slugs
-    if missing:
-        print(f'\nSem issue no servidor ({len(missing)}):')
-        for slug in sorted(missing):
-            print(f'  {slug} ({expected[slug]} artigos)')
-
-    print(f'\n--- Resumo ---')
-    print(f'OK: {len(good)}/{len(expected)}')
-    if problems:
-        print(f'Problemas: {len(problems)}')
-    if missing:
-        print(f'Faltam: {len(missing)}')
-
-    return good
-
-
-def cmd_cleanup(env, expected):
-    """Limpa issues duplicadas, vazias e parciais."""
-    base = env['url']
-    print('Login...')
-    s, csrf = fresh_session(base, env['username'], env['password'])
-
-    print('Carregando issues...')
-    all_issues = load_all_issues(base, s)
-    print(f'{len(all_issues)} issues encontradas\n')
-
-    from collections import defaultdict
-    by_slug = defaultdict(list)
-    for iss in all_issues:
-        by_slug[iss['slug']].append(iss['id'])
+    O índice é relistado por completo (sem o atalho incremental) e só indica
+    candidatas: antes de apagar, cada uma é recontada no servidor
+    (issueIds), assim como a issue boa que motivou apagar uma duplicata.
+    Contagem que falha ou diverge do índice mantém a issue.
+    """
+    print('Atualizando índice de issues/submissions (completo)...')
+    index = OJSIndex(client).refresh(full=True)
+    counts = index.counts_by_issue()
+    by_slug = index.issues_by_slug()
+    print(f'{sum(len(ids) for ids in by_slug.values())} issues encontradas\n')
 
     to_delete = []
+    good = {}
 
     for slug, ids in sorted(by_slug.items()):
         exp = expected.get(slug, 0)
         good_id = None
 
-        for issue_id in sorted(ids):
-            count = count_issue_articles(base, s, issue_id)
-            if count == -1:
-                time.sleep(5)
-                s, csrf = fresh_session(base, env['username'], env['password'])
-                count = count_issue_articles(base, s, issue_id)
-            if count == -1:
-                print(f'  {slug}: issue {issue_id} — ERRO na contagem, pulando')
-                continue
-            if exp > 0 and count >= exp and good_id is None:
+        for issue_id in ids:
+            # Sem submissions no índice: pode ser vazia ou issueId não listado
+            count = counts.get(issue_id)
+            if count is not None and exp > 0 and count >= exp and good_id is None:
                 good_id = issue_id
+                good[slug] = (issue_id, exp)
                 print(f'  {slug}: issue {issue_id} OK ({count} arts)')
             else:
                 to_delete.append((issue_id, slug, count))
-                label = f'{count} arts' if count > 0 else 'vazia'
+                label = _count_label(count)
                 if good_id:
                     print(f'  {slug}: issue {issue_id} DUPLICATA ({label})')
                 else:
                     print(f'  {slug}: issue {issue_id} ({label}, esperado {exp})')
-            time.sleep(2)
 
     if not to_delete:
         print('\nNenhuma issue para limpar.')
         return
 
-    print(f'\n{len(to_delete)} issues para apagar:')
+    print(f'\nConferindo {len(to_delete)} issues no servidor...')
+    confirmed = []
+    good_ok = {}
     for issue_id, slug, count in to_delete:
-        label = f'{count} arts' if count > 0 else 'vazia'
-        print(f'  issue {issue_id} ({slug}): {label}')
+        if slug in good and slug not in good_ok:
+            good_id, exp = good[slug]
+            live = client.count_issue_articles(good_id)
+            good_ok[slug] = live >= exp
+            if not good_ok[slug]:
+                print(f'  {slug}: issue boa {good_id} tem {live if live >= 0 else "?"} arts '
+                      f'no servidor (esperado {exp}) — duplicatas mantidas')
+        if not good_ok.get(slug, True):
+            continue
+        live = client.count_issue_articles(issue_id)
+        if live < 0:
+            print(f'  issue {issue_id} ({slug}): contagem indisponível — mantida')
+        elif live != (count or 0):
+            print(f'  issue {issue_id} ({slug}): {live} arts no servidor × índice: '
+                  f'{_count_label(count)} — mantida (rode --verify --full-refresh)')
+        else:
+            confirmed.append((issue_id, slug, live))
+
+    if not confirmed:
+        print('\nNenhuma issue confirmada para apagar.')
+        return
+
+    print(f'\n{len(confirmed)} issues para apagar:')
+    for issue_id, slug, count in confirmed:
+        print(f'  issue {issue_id} ({slug}): {_count_label(count)}')
 
     print('\nApagando...')
-    for issue_id, slug, count in to_delete:
-        # Sessão fresca para cada deleção pesada
-        s, csrf = fresh_session(base, env['username'], env['password'])
-        wipe_issue(base, s, csrf, issue_id, slug)
+    for issue_id, slug, count in confirmed:
+        client.wipe_issue(issue_id, slug)
         time.sleep(3)
 
     print('Limpeza concluída.')
 
 
-def cmd_import(env, expected, xml_dir, slug_filter=None):
+def _count_label(count):
+    if count is None:
+        return 'sem contagem no índice'
+    return f'{count} arts' if count > 0 else 'vazia'
+
+
+def cmd_import(client, expected, xml_dir, slug_filter=None):
     """Importa XMLs faltantes. Sessão fresca para cada XML."""
-    base = env['url']
 
     # Listar XMLs
     if slug_filter:
@@ -398,13 +154,12 @@ def cmd_import(env, expected, xml_dir, slug_filter=None):
         files = sorted(glob.glob(os.path.join(xml_dir, '*.xml')))
     files = [f for f in files if not os.path.basename(f).startswith('sdbr')]
 
-    # Descobrir quais já existem (sessão 1: só lista issues, sem contar artigos)
+    # Descobrir quais já existem (índice local, atualizado incrementalmente)
     print('Verificando issues existentes...')
-    s, csrf = fresh_session(base, env['username'], env['password'])
-    existing_issues = load_all_issues(base, s)
+    index = OJSIndex(client).refresh()
+    existing_issues = list(index.data['issues']['items'])
     existing_slugs = {iss['slug'] for iss in existing_issues}
     print(f'  {len(existing_slugs)} slugs no servidor')
-    del s  # Descarta sessão
 
     # Filtrar XMLs a importar (exclui os que já têm issue)
     to_import = []
@@ -432,7 +187,7 @@ def cmd_import(env, expected, xml_dir, slug_filter=None):
 
         # Sessão FRESCA para cada XML
         try:
-            s, csrf = fresh_session(base, env['username'], env['password'])
+            csrf = client.renew()
         except Exception as e:
             print(f'    ERRO no login: {e}')
             print(f'    PARANDO.')
@@ -442,7 +197,7 @@ def cmd_import(env, expected, xml_dir, slug_filter=None):
 
         # Upload + import
         try:
-            ok, msg, temp_id = upload_and_import(base, s, csrf, filepath)
+            ok, msg, temp_id = client.upload_and_import(filepath)
         except Exception as e:
             print(f'    EXCEÇÃO: {e}')
             ok, msg, temp_id = False, str(e), None
@@ -458,27 +213,24 @@ def cmd_import(env, expected, xml_dir, slug_filter=None):
                 print(f'    Aguardando 120s para o servidor processar...')
                 time.sleep(120)
                 try:
-                    s2, csrf2 = fresh_session(base, env['username'], env['password'])
-                    issues2 = load_all_issues(base, s2)
-                    slug_issues = [iss for iss in issues2 if iss['slug'] == slug]
+                    client.renew()
+                    slug_issues = index.refresh().slug_counts(slug)
                     if slug_issues:
-                        issue_id = slug_issues[0]['id']
-                        count = count_issue_articles(base, s2, issue_id)
+                        issue_id, count = slug_issues[0]
                         if isinstance(exp, int) and count >= exp:
                             print(f'    ✅ SIM! {count} artigos importados (issue {issue_id})')
                             success.append(slug)
                         elif count > 0:
                             print(f'    ⚠️ PARCIAL: {count}/{exp} artigos (issue {issue_id})')
                             print(f'    Apagando issue parcial...')
-                            wipe_issue(base, s2, csrf2, issue_id, slug)
+                            client.wipe_issue(issue_id, slug)
                             print(f'    PARANDO.')
                             sys.exit(1)
                         else:
                             print(f'    ❌ Issue {issue_id} criada mas vazia. Apagando...')
-                            wipe_issue(base, s2, csrf2, issue_id, slug)
+                            client.wipe_issue(issue_id, slug)
                     else:
                         print(f'    Issue não encontrada — import realmente falhou')
-                    del s2
                 except Exception as e2:
                     print(f'    Erro na verificação: {e2}')
                     print(f'    PARANDO. Verificar manualmente.')
@@ -488,13 +240,13 @@ def cmd_import(env, expected, xml_dir, slug_filter=None):
                 print(f'    PARANDO. Limpando issue se criada...')
                 time.sleep(5)
                 try:
-                    s2, csrf2 = fresh_session(base, env['username'], env['password'])
-                    issues2 = load_all_issues(base, s2)
+                    client.renew()
+                    issues2 = index.refresh().data['issues']['items']
                     for iss in issues2:
                         if iss['slug'] == slug and iss['id'] not in [
                             i2['id'] for i2 in existing_issues
                         ]:
-                            wipe_issue(base, s2, csrf2, iss['id'], slug)
+                            client.wipe_issue(iss['id'], slug)
                 except Exception:
                     print(f'    AVISO: não conseguiu limpar. Verificar manualmente.')
                 sys.exit(1)
@@ -529,7 +281,7 @@ REGION_MAP = {
 def find_volume_pdf(slug):
     """Localiza o PDF do volume completo a partir do slug."""
     db_path = os.path.join(BASE_DIR, 'anais.db')
-    conn = sqlite3.connect(db_path)
+    conn = anais_db.connect_readonly(db_path)
     row = conn.execute('SELECT volume_pdf FROM seminars WHERE slug = ?', (slug,)).fetchone()
     conn.close()
     if not row or not row[0]:
@@ -550,54 +302,135 @@ def find_volume_pdf(slug):
     return None
 
 
-def upload_issue_galley(base_url, session, csrf, issue_id, filepath, label='Edição completa'):
-    """Upload PDF como issue galley. Retorna True se ok."""
-    # Step 1: Add galley entry
-    resp = session.post(
-        f'{base_url}/$$$call$$$/grid/issues/issue-galley-grid/add-galley',
-        data={
-            'csrfToken': csrf,
-            'issueId': issue_id,
-            'label': label,
-            'galleyLocale': 'pt_BR',
-        },
-        timeout=30,
-    )
-    if resp.status_code != 200:
-        return False, f'add-galley HTTP {resp.status_code}'
-
-    # Extrair galleyId da resposta
-    match = re.search(r'"issueGalleyId"[:\s]*"?(\d+)', resp.text)
-    if not match:
-        # Tentar outra forma de extrair o ID
-        match = re.search(r'galleyId[=&](\d+)', resp.text)
-    if not match:
-        return False, f'galleyId não encontrado na resposta add-galley'
-    galley_id = match.group(1)
-
-    # Step 2: Upload file
+GALLEY_LABEL = 'Edição completa'
+GALLEY_MAX_MB = 20  # limite de upload do servidor
+GALLEY_WORKERS = 2  # uploads simultâneos (issues diferentes)
+
+
+def file_md5(filepath, chunk_size=1024 * 1024):
+    """MD5 de um arquivo, lido em blocos."""
+    h = hashlib.md5()
     with open(filepath, 'rb') as f:
-        resp = session.post(
-            f'{base_url}/$$$call$$$/grid/issues/issue-galley-grid/upload-file',
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _galley_file_info(galley):
+    """(tamanho, md5) informados pelo servidor para um galley (None se ausentes)."""
+    file_info = galley.get('file') or {}
+    size = galley.get('fileSize') or file_info.get('fileSize') or file_info.get('size')
+    md5 = galley.get('md5') or file_info.get('md5') or file_info.get('checksum')
+    return (int(size) if size else None), md5
+
+
+def find_existing_galley(client, issue_id, filepath, label=GALLEY_LABEL, verify_hash=False):
+    """Procura no servidor um galley da issue com o mesmo arquivo.
+
+    Compara o tamanho informado pela API; se o servidor informar checksum
+    (ou verify_hash=True, baixando o galley em blocos), compara também o MD5.
+    Retorna o galley encontrado ou None.
+    """
+    data = client.get_json(f'/api/v1/issues/{issue_id}')
+    if not data:
+        return None
+    size = os.path.getsize(filepath)
+    local_md5 = None
+    for galley in data.get('galleys', []) or []:
+        if (galley.get('label') or '') != label:
+            continue
+        remote_size, remote_md5 = _galley_file_info(galley)
+        if remote_size != size:
+            continue
+        if remote_md5 is None and verify_hash and galley.get('id'):
+            # Rota montada pelos ids, relativa a client.base_url: a
+            # urlPublished pode vir com outro host/esquema (http, www, proxy)
+            h = hashlib.md5()
+            resp = client.request('GET', f"/issue/download/{issue_id}/{galley['id']}",
+                                  stream=True, timeout=600)
+            if resp.status_code != 200:
+                continue
+            for chunk in resp.iter_content(MultipartFileStream.CHUNK_SIZE):
+                h.update(chunk)
+            remote_md5 = h.hexdigest()
+        if remote_md5 is not None:
+            local_md5 = local_md5 or file_md5(filepath)
+            if remote_md5 != local_md5:
+                continue
+        return galley
+    return None
+
+
+def upload_issue_galley(client, issue_id, filepath, label=GALLEY_LABEL):
+    """Upload PDF como issue galley. Retorna (ok, mensagem).
+
+    O PDF é enviado em streaming (MultipartFileStream), sem carregar o
+    arquivo inteiro em memória.
+    """
+    with client.session() as sess:
+        # Step 1: Add galley entry
+        resp = client.request(
+            'POST', '/$$$call$$$/grid/issues/issue-galley-grid/add-galley',
+            session=sess, csrf='data',
             data={
-                'csrfToken': csrf,
                 'issueId': issue_id,
-                'issueGalleyId': galley_id,
+                'label': label,
+                'galleyLocale': 'pt_BR',
             },
-            files={'uploadedFile': (os.path.basename(filepath), f, 'application/pdf')},
+        )
+        if resp.status_code != 200:
+            return False, f'add-galley HTTP {resp.status_code}'
+
+        # Extrair galleyId da resposta
+        match = re.search(r'"issueGalleyId"[:\s]*"?(\d+)', resp.text)
+        if not match:
+            # Tentar outra forma de extrair o ID
+            match = re.search(r'galleyId[=&](\d+)', resp.text)
+        if not match:
+            return False, f'galleyId não encontrado na resposta add-galley'
+        galley_id = match.group(1)
+
+        # Step 2: Upload file
+        body = MultipartFileStream(
+            {'issueId': issue_id, 'issueGalleyId': galley_id},
+            'uploadedFile', filepath, 'application/pdf',
+        )
+        resp = client.request(
+            'POST', '/$$$call$$$/grid/issues/issue-galley-grid/upload-file',
+            session=sess, csrf='data',
+            data=body, headers={'Content-Type': body.content_type},
             timeout=600,
         )
-    if resp.status_code != 200:
-        return False, f'upload-file HTTP {resp.status_code}'
+        if resp.status_code != 200:
+            return False, f'upload-file HTTP {resp.status_code}'
 
     return True, f'galley {galley_id}'
 
 
-def cmd_upload_galleys(env, slug_filter=None):
-    """Upload PDFs de edição completa como issue galleys."""
-    base = env['url']
+def _upload_galley_job(client, slug, issue_id, pdf_path, verify_hash):
+    """Uma tarefa do pool: pula se já existe, senão envia. Retorna linha de log."""
+    size_mb = os.path.getsize(pdf_path) / 1024 / 1024
+    prefix = f'  {slug}: issue {issue_id}, {size_mb:.1f} MB'
+    existing = find_existing_galley(client, issue_id, pdf_path, verify_hash=verify_hash)
+    if existing:
+        return 'skip', f'{prefix} — já existe (galley {existing.get("id")}), pulando'
+    t0 = time.monotonic()
+    ok, msg = upload_issue_galley(client, issue_id, pdf_path)
+    elapsed = time.monotonic() - t0
+    if not ok:
+        return 'error', f'{prefix} — ERRO: {msg}'
+    rate = size_mb / elapsed if elapsed else 0
+    return 'ok', f'{prefix} — OK ({msg}, {elapsed:.1f}s, {rate:.2f} MB/s)'
+
+
+def cmd_upload_galleys(client, slug_filter=None, workers=GALLEY_WORKERS, verify_hash=False):
+    """Upload PDFs de edição completa como issue galleys.
+
+    Envia até `workers` issues em paralelo; galleys cujo arquivo já está no
+    servidor (mesmo rótulo e tamanho/MD5) são pulados.
+    """
     db_path = os.path.join(BASE_DIR, 'anais.db')
-    conn = sqlite3.connect(db_path)
+    conn = anais_db.connect_readonly(db_path)
 
     # Buscar seminários com volume_pdf
     if slug_filter:
@@ -616,13 +449,11 @@ def cmd_upload_galleys(env, slug_filter=None):
         print('Nenhum seminário com volume_pdf encontrado.')
         return
 
-    print(f'{len(rows)} seminários com edição completa\n')
+    print(f'{len(rows)} seminários com edição completa ({workers} uploads simultâneos)\n')
 
-    # Login e listar issues
-    s, csrf = fresh_session(base, env['username'], env['password'])
-    all_issues = load_all_issues(base, s)
-    issue_map = {iss['slug']: iss['id'] for iss in all_issues}
+    issue_map = {slug: ids[0] for slug, ids in OJSIndex(client).refresh().issues_by_slug().items()}
 
+    jobs = []
     for slug, volume_pdf in rows:
         pdf_path = find_volume_pdf(slug)
         if not pdf_path:
@@ -635,34 +466,42 @@ def cmd_upload_galleys(env, slug_filter=None):
             continue
 
         size_mb = os.path.getsize(pdf_path) / 1024 / 1024
-        if size_mb > 20:
-            print(f'  {slug}: PDF muito grande ({size_mb:.1f} MB > 20 MB limite), pulando')
+        if size_mb > GALLEY_MAX_MB:
+            print(f'  {slug}: PDF muito grande ({size_mb:.1f} MB > {GALLEY_MAX_MB} MB limite), pulando')
             continue
+        jobs.append((slug, issue_id, pdf_path))
+
+    t0 = time.monotonic()
+    totals = {'ok': 0, 'skip': 0, 'error': 0}
+    sent_mb = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_upload_galley_job, client, slug, issue_id, pdf_path, verify_hash):
+                (slug, pdf_path)
+            for slug, issue_id, pdf_path in jobs
+        }
+        for future in as_completed(futures):
+            slug, pdf_path = futures[future]
+            try:
+                status, line = future.result()
+            except Exception as e:
+                status, line = 'error', f'  {slug}: ERRO: {e}'
+            totals[status] += 1
+            if status == 'ok':
+                sent_mb += os.path.getsize(pdf_path) / 1024 / 1024
+            print(line, flush=True)
 
-        print(f'  {slug}: issue {issue_id}, {size_mb:.1f} MB ... ', end='', flush=True)
-
-        # Sessão fresca para cada upload
-        try:
-            s, csrf = fresh_session(base, env['username'], env['password'])
-        except Exception as e:
-            print(f'ERRO login: {e}')
-            break
-
-        ok, msg = upload_issue_galley(base, s, csrf, issue_id, pdf_path)
-        if ok:
-            print(f'OK ({msg})')
-        else:
-            print(f'ERRO: {msg}')
-
-        time.sleep(5)
-
-    print('\nUpload de galleys concluído.')
+    elapsed = time.monotonic() - t0
+    print(f'\nUpload de galleys concluído: {totals["ok"]} enviados, '
+          f'{totals["skip"]} já existentes, {totals["error"]} erros')
+    if sent_mb:
+        print(f'{sent_mb:.1f} MB em {elapsed:.1f}s ({sent_mb / elapsed:.2f} MB/s agregado)')
 
 
 PER_ARTICLE_DELAY = 15  # segundos entre artigos (mesmo issue, mais rápido)
 
 
-def cmd_import_per_article(env, expected, xml_dir, slug_filter=None):
+def cmd_import_per_article(client, expected, xml_dir, slug_filter=None):
     """Importa XMLs per-article (1 artigo por XML, com PDF embutido).
 
     Diferenças do cmd_import:
@@ -671,7 +510,6 @@ def cmd_import_per_article(env, expected, xml_dir, slug_filter=None):
     - Delay menor entre XMLs (mesmo issue)
     - Para no primeiro erro (não tenta recuperar parciais)
     """
-    base = env['url']
 
     # Listar XMLs
     if slug_filter:
@@ -740,7 +578,7 @@ def cmd_import_per_article(env, expected, xml_dir, slug_filter=None):
 
             # Sessão fresca para cada XML
             try:
-                s, csrf = fresh_session(base, env['username'], env['password'])
+                client.renew()
             except Exception as e:
                 print(f'ERRO login: {e}')
                 errors.append((name, str(e)))
@@ -748,7 +586,7 @@ def cmd_import_per_article(env, expected, xml_dir, slug_filter=None):
                 break
 
             try:
-                ok, msg, temp_id = upload_and_import(base, s, csrf, filepath)
+                ok, msg, temp_id = client.upload_and_import(filepath)
             except Exception as e:
                 ok, msg = False, str(e)
 
@@ -792,12 +630,19 @@ def main():
     parser.add_argument('--slug', help='Importar apenas este seminário')
     parser.add_argument('--cleanup', action='store_true', help='Só limpar duplicatas')
     parser.add_argument('--verify', action='store_true', help='Verificar estado')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Com --verify: ignora o cache do índice e relista tudo')
     parser.add_argument('--xml-dir', help='Diretório dos XMLs (default: xml_test/)')
     parser.add_argument('--dry-run', action='store_true', help='Apenas listar')
     parser.add_argument('--per-article', action='store_true',
                        help='Modo per-article: 1 XML por artigo (com PDF embutido)')
     parser.add_argument('--upload-galleys', action='store_true',
                        help='Upload PDFs de edição completa como issue galleys')
+    parser.add_argument('--galley-workers', type=int, default=GALLEY_WORKERS,
+                        help=f'Uploads de galleys simultâneos (default: {GALLEY_WORKERS})')
+    parser.add_argument('--verify-hash', action='store_true',
+                        help='Com --upload-galleys: confere MD5 baixando o galley '
+                             'quando o servidor só informa o tamanho')
     args = parser.parse_args()
 
     env = ENVS[args.env]
@@ -822,23 +667,22 @@ def main():
             print(f'  {name}: {size:,} bytes')
         return
 
-    if args.verify:
-        cmd_verify(env, expected)
-        return
-
-    if args.cleanup:
-        cmd_cleanup(env, expected)
-        return
-
-    if args.upload_galleys:
-        cmd_upload_galleys(env, args.slug)
-        return
-
-    if args.per_article:
-        cmd_import_per_article(env, expected, xml_dir, args.slug)
-    else:
-        cmd_import(env, expected, xml_dir, args.slug)
-
+    client = OJSClient.from_env(env, pool_size=max(4, args.galley_workers))
+    try:
+        if args.verify:
+            cmd_verify(client, expected, full=args.full_refresh)
+        elif args.cleanup:
+            cmd_cleanup(client, expected)
+        elif args.upload_galleys:
+            cmd_upload_galleys(client, args.slug, workers=args.galley_workers,
+                               verify_hash=args.verify_hash)
+        elif args.per_article:
+            cmd_import_per_article(client, expected, xml_dir, args.slug)
+        else:
+            cmd_import(client, expected, xml_dir, args.slug)
+    finally:
+        client.print_metrics()
+        client.close()
 
 if __name__ == '__main__':
     main()
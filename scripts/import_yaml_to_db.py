@@ -1,19 +1,45 @@
 #!/usr/bin/env python3
 """Importa todos os YAMLs (nacionais + regionais) para anais.db.
 
-Trata três formatos de YAML:
-1. {issue: {...}, articles: [...]}  — maioria
-2. {slug, evento, publicacao, artigos: [...]}  — sdnne02, sdnne05
-3. {slug, title, year, articles: [...]}  — sdsul06-08 (sem wrapper issue)
+Os três formatos de YAML ({issue, articles}, {evento, publicacao, artigos}
+e campos no topo) são convertidos por yaml_schema.adapt() e validados
+contra schema/*.yaml antes de qualquer gravação: se algum arquivo tem erro,
+todos os erros de todos os arquivos são listados e o banco não é tocado.
+--check só valida.
 
 Fase 1 de deduplicação de autores: match exato por (givenname, familyname).
+
+Leitura: usa o loader C do libyaml (CSafeLoader) quando o PyYAML foi
+compilado com ele, e lê/valida/normaliza os arquivos em --workers
+processos; as gravações no banco ficam num único processo, na ordem de
+find_yaml_files() (mesmos ids que a importação serial). O tempo de leitura
+e o de inserção são mostrados por arquivo.
+
+--sync: em vez de apagar e reinserir, compara o hash do registro
+normalizado de cada artigo com articles.yaml_hash e aplica só inserções,
+atualizações (apenas colunas/vínculos alterados) e remoções dos artigos que
+mudaram. Os autores são resolvidos pelo nome e por author_variants, então
+ids, ORCIDs e dedup ficam preservados. Na primeira execução os artigos sem
+hash só recebem o hash: rode export_db_to_yaml.py antes, para o YAML
+refletir o banco.
+
+Uso:
+    python3 scripts/import_yaml_to_db.py --check
+    python3 scripts/import_yaml_to_db.py --sync
+    python3 scripts/import_yaml_to_db.py --sync --only sdnne08
 """
 
+import hashlib
 import sqlite3
+import time
 import yaml
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import anais_db
+from yaml_schema import SafeLoader, adapt, load_yaml, validate
 
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DB_PATH = os.path.join(BASE, 'anais.db')
@@ -32,173 +58,478 @@ def find_yaml_files():
     return yamls
 
 
-def parse_seminar(data):
-    """Extrai metadados do seminário, independente do formato."""
-    # Formato 1: {issue: {...}, articles: [...]}
-    if 'issue' in data:
-        iss = data['issue']
-        return {
-            'slug': iss.get('slug'),
-            'title': iss.get('title'),
-            'subtitle': iss.get('subtitle'),
-            'year': iss.get('year'),
-            'volume': iss.get('volume'),
-            'number': iss.get('number'),
-            'date_published': iss.get('date_published'),
-            'isbn': iss.get('isbn'),
-            'doi': iss.get('doi'),
-            'description': iss.get('description'),
-            'location': iss.get('location'),
-            'publisher': iss.get('publisher'),
-            'source': iss.get('source'),
-            'editors': iss.get('editors', []),
-            'volume_pdf': iss.get('volume_pdf'),
-            'related_urls': iss.get('related_urls', []),
-        }
-
-    # Formato 2: sdnne02/05 com evento/publicacao
-    if 'evento' in data:
-        ev = data.get('evento', {})
-        pub = data.get('publicacao', {})
-        return {
-            'slug': data.get('slug'),
-            'title': ev.get('titulo'),
-            'subtitle': ev.get('tema'),
-            'year': ev.get('data'),
-            'volume': data.get('volume'),
-            'number': data.get('number'),
-            'date_published': f"{ev.get('data', '')}-01-01" if ev.get('data') else None,
-            'isbn': pub.get('isbn'),
-            'doi': None,
-            'description': pub.get('ficha_catalografica'),
-            'location': ev.get('local'),
-            'publisher': None,
-            'source': (data.get('fontes', {}).get('docomomobrasil', {}) or {}).get('url'),
-            'editors': ev.get('organizacao', []),
-            'volume_pdf': data.get('volume_pdf'),
-            'related_urls': data.get('related_urls', []),
-        }
-
-    # Formato 3: sdsul06-08 com campos no topo
+def normalize_article(rec):
+    """Registro canônico de um artigo (yaml_schema.adapt) -> valores do banco."""
+    def as_json(value):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, list) else value
+
     return {
-        'slug': data.get('slug'),
-        'title': data.get('title'),
-        'subtitle': data.get('subtitle'),
-        'year': data.get('year'),
-        'volume': data.get('volume'),
-        'number': data.get('number'),
-        'date_published': data.get('date_published'),
-        'isbn': data.get('isbn'),
-        'doi': data.get('doi'),
-        'description': data.get('description'),
-        'location': data.get('location'),
-        'publisher': data.get('publisher'),
-        'source': data.get('source'),
-        'editors': data.get('editors', []),
-        'volume_pdf': data.get('volume_pdf'),
-        'related_urls': data.get('related_urls', []),
+        'id': rec['id'],
+        'title': rec['title'],
+        'subtitle': rec['subtitle'],
+        'section': rec['section'],
+        'locale': rec['locale'],
+        'pages': rec['pages'],
+        'pages_count': rec['pages_count'],
+        'file': rec['file'],
+        'abstract': rec['abstract'],
+        'abstract_en': rec['abstract_en'],
+        'abstract_es': rec['abstract_es'],
+        'keywords': as_json(rec['keywords']),
+        'keywords_en': as_json(rec['keywords_en']),
+        'keywords_es': as_json(rec['keywords_es']),
+        'references_': as_json(rec['references']),
+        'ojs_id': rec['ojs_id'],
+        'doi': rec['doi'],
+        'authors': rec['authors'] or [],
     }
 
 
-def parse_articles(data):
-    """Retorna lista de artigos, independente do formato."""
-    return data.get('articles', data.get('artigos', []))
-
-
-def parse_sections_from_data(data):
-    """Extrai seções pré-definidas (sdsul06-08)."""
-    return data.get('sections', [])
-
-
-def get_field(art, *names, default=None):
-    """Retorna o primeiro campo encontrado dentre os nomes possíveis."""
-    for name in names:
-        val = art.get(name)
-        if val is not None:
-            return val
-    return default
-
-
-def normalize_article(art, seminar_slug):
-    """Normaliza campos de um artigo para o formato canônico."""
-    title = get_field(art, 'title', 'titulo')
-    subtitle = get_field(art, 'subtitle', 'subtitulo')
-    section = get_field(art, 'section', 'secao')
-    abstract = get_field(art, 'abstract', 'resumo')
-    abstract_en = get_field(art, 'abstract_en', 'resumo_en')
-    abstract_es = get_field(art, 'abstract_es', 'resumo_es')
-    keywords = get_field(art, 'keywords', 'palavras_chave')
-    keywords_en = get_field(art, 'keywords_en', 'palavras_chave_en')
-    keywords_es = get_field(art, 'keywords_es', 'palavras_chave_es')
-    references = get_field(art, 'references', 'referencias')
-    file_ = get_field(art, 'file', 'arquivo_pdf')
-    pages = get_field(art, 'pages', 'paginas')
-    pages_count = get_field(art, 'pages_count', 'paginas_total')
-    authors = get_field(art, 'authors', 'autores', default=[])
-
-    # Gerar ID se ausente
-    art_id = art.get('id')
-
+class AuthorResolver:
+    """Resolve (givenname, familyname) -> author_id em lote. Match exato.
+
+    Carrega os autores do banco uma vez num mapa em memória, incluindo as
+    grafias de author_variants (apontando para o autor canônico, para não
+    recriar autores já deduplicados); resolve() cria os nomes novos de um
+    seminário com um único executemany (na ordem em que aparecem, como a
+    criação um a um) e completa email/orcid vazios com o primeiro valor
+    encontrado.
+    """
+
+    def __init__(self, cur):
+        self.authors = {}
+        by_id = {}
+        for author_id, gn, fn, email, orcid in cur.execute(
+                'SELECT id, givenname, familyname, email, orcid FROM authors'):
+            entry = {'id': author_id, 'email': email, 'orcid': orcid}
+            self.authors[(gn, fn)] = by_id[author_id] = entry
+        for author_id, gn, fn in cur.execute(
+                'SELECT author_id, givenname, familyname FROM author_variants'):
+            if (gn, fn) not in self.authors and author_id in by_id:
+                self.authors[(gn, fn)] = by_id[author_id]
+
+    def resolve(self, cur, people):
+        """people: [(givenname, familyname, email, orcid)]. Retorna nº de autores novos."""
+        new = []
+        dirty = set()
+        for gn, fn, email, orcid in people:
+            key = (gn, fn)
+            entry = self.authors.get(key)
+            if entry is None:
+                self.authors[key] = {'id': None, 'email': email or None, 'orcid': orcid or None}
+                new.append(key)
+                continue
+            if email and not entry['email']:
+                entry['email'] = email
+                if entry['id'] is not None:
+                    dirty.add(entry['id'])
+            if orcid and not entry['orcid']:
+                entry['orcid'] = orcid
+                if entry['id'] is not None:
+                    dirty.add(entry['id'])
+
+        if new:
+            max_id = cur.execute('SELECT COALESCE(MAX(id), 0) FROM authors').fetchone()[0]
+            cur.executemany(
+                'INSERT INTO authors (givenname, familyname, email, orcid) VALUES (?, ?, ?, ?)',
+                [(gn, fn, self.authors[(gn, fn)]['email'], self.authors[(gn, fn)]['orcid'])
+                 for gn, fn in new])
+            for author_id, gn, fn in cur.execute(
+                    'SELECT id, givenname, familyname FROM authors WHERE id > ?', (max_id,)):
+                self.authors[(gn, fn)]['id'] = author_id
+
+        if dirty:
+            entries = {e['id']: e for e in self.authors.values() if e['id'] in dirty}
+            cur.executemany('UPDATE authors SET email = ?, orcid = ? WHERE id = ?',
+                            [(e['email'], e['orcid'], author_id) for author_id, e in entries.items()])
+        return len(new)
+
+    def id(self, givenname, familyname):
+        return self.authors[(givenname, familyname)]['id']
+
+
+def prepare_file(path):
+    """Lê, adapta e valida um YAML (roda nos processos de leitura).
+
+    Retorna dict com seminário, seções, artigos normalizados, erros/avisos
+    de validação e os tempos, ou None se o arquivo não tem artigos.
+    """
+    t0 = time.monotonic()
+    try:
+        adapted = adapt(load_yaml(path))
+    except yaml.YAMLError as e:
+        adapted = {'seminar': {'slug': None}, 'sections': [], 'articles': []}
+        errors, warnings = [f'YAML inválido: {e}'], []
+    else:
+        if adapted is None:
+            return None
+        errors, warnings = validate(adapted)
+    t1 = time.monotonic()
     return {
-        'id': art_id,
-        'title': title,
-        'subtitle': subtitle,
-        'section': section,
-        'locale': art.get('locale', 'pt-BR'),
-        'pages': str(pages) if pages else None,
-        'pages_count': pages_count,
-        'file': file_,
-        'abstract': abstract,
-        'abstract_en': abstract_en,
-        'abstract_es': abstract_es,
-        'keywords': json.dumps(keywords, ensure_ascii=False) if isinstance(keywords, list) else keywords,
-        'keywords_en': json.dumps(keywords_en, ensure_ascii=False) if isinstance(keywords_en, list) else keywords_en,
-        'keywords_es': json.dumps(keywords_es, ensure_ascii=False) if isinstance(keywords_es, list) else keywords_es,
-        'references_': json.dumps(references, ensure_ascii=False) if isinstance(references, list) else references,
-        'ojs_id': art.get('ojs_id'),
-        'doi': art.get('doi'),
-        'authors': authors,
+        'path': path,
+        'seminar': adapted['seminar'],
+        'sections': adapted['sections'],
+        'articles': [] if errors else [normalize_article(rec) for rec in adapted['articles']],
+        'count': len(adapted['articles']),
+        'errors': errors,
+        'warnings': warnings,
+        'parse_seconds': t1 - t0,
+        'validate_seconds': time.monotonic() - t1,
     }
 
 
-def get_or_create_author(cur, givenname, familyname):
-    """Retorna author_id, criando se necessário. Match exato."""
-    cur.execute(
-        'SELECT id FROM authors WHERE givenname = ? AND familyname = ?',
-        (givenname, familyname)
-    )
-    row = cur.fetchone()
-    if row:
-        return row[0]
-    cur.execute(
-        'INSERT INTO authors (givenname, familyname) VALUES (?, ?)',
-        (givenname, familyname)
+def iter_prepared(paths, workers):
+    """prepare_file para cada caminho, na ordem, em N processos (1 = serial)."""
+    if workers <= 1:
+        for path in paths:
+            yield prepare_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map preserva a ordem
+        yield from pool.map(prepare_file, paths)
+
+
+SEMINAR_COLUMNS = ('title', 'subtitle', 'year', 'volume', 'number', 'date_published',
+                   'isbn', 'doi', 'description', 'location', 'publisher', 'source',
+                   'editors', 'volume_pdf', 'related_urls')
+ARTICLE_COLUMNS = ('section_id', 'title', 'subtitle', 'locale', 'pages', 'pages_count',
+                   'file', 'abstract', 'abstract_en', 'abstract_es', 'keywords',
+                   'keywords_en', 'keywords_es', 'references_', 'ojs_id', 'doi')
+LINK_COLUMNS = ('author_id', 'seq', 'primary_contact', 'affiliation', 'bio', 'country')
+
+
+def article_hash(slug, art_id, art):
+    """sha256 do registro normalizado do artigo (inclui autores e seção)."""
+    record = dict(art, id=art_id, seminar_slug=slug)
+    data = json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def seminar_values(sem):
+    """Valores das colunas de seminars (SEMINAR_COLUMNS), na ordem."""
+    related = sem.get('related_urls', [])
+    return (
+        sem['title'], sem['subtitle'], sem['year'],
+        sem['volume'], sem['number'],
+        str(sem['date_published']) if sem['date_published'] else None,
+        sem['isbn'], sem['doi'], sem['description'],
+        sem['location'], sem['publisher'], sem['source'],
+        json.dumps(sem['editors'], ensure_ascii=False) if sem['editors'] else '[]',
+        sem['volume_pdf'],
+        json.dumps(related, ensure_ascii=False) if related else None,
     )
-    return cur.lastrowid
 
 
-def update_author_contact(cur, author_id, email, orcid):
-    """Atualiza email/orcid se o novo valor for mais completo."""
-    if not email and not orcid:
-        return
-    cur.execute('SELECT email, orcid FROM authors WHERE id = ?', (author_id,))
-    current = cur.fetchone()
-    updates = {}
-    if email and not current[0]:
-        updates['email'] = email
-    if orcid and not current[1]:
-        updates['orcid'] = orcid
-    if updates:
-        sets = ', '.join(f'{k} = ?' for k in updates)
-        cur.execute(f'UPDATE authors SET {sets} WHERE id = ?',
-                    list(updates.values()) + [author_id])
+def article_values(art, sections):
+    """Valores das colunas de articles (ARTICLE_COLUMNS), na ordem."""
+    return (
+        sections.get(art['section']) if art['section'] else None,
+        art['title'], art['subtitle'],
+        art['locale'], art['pages'], art['pages_count'], art['file'],
+        art['abstract'], art['abstract_en'], art['abstract_es'],
+        art['keywords'], art['keywords_en'], art['keywords_es'],
+        art['references_'], art['ojs_id'], art['doi'],
+    )
 
 
-def parse_issue_sections(data):
-    """Extrai seções definidas em issue.sections (sdrj02, sdrj03, etc.)."""
-    if 'issue' in data:
-        return data['issue'].get('sections', [])
-    return []
+def resolve_sections(cur, slug, prepared, stats):
+    """Cria as seções do seminário que faltam. Retorna {título: section_id}.
+
+    Pré-definidas primeiro, depois as citadas pelos artigos (na ordem).
+    """
+    cur.executemany('''
+        INSERT OR IGNORE INTO sections (seminar_slug, title, abbrev, seq, hide_title)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(slug, sec['title'], sec.get('abbrev'), i, 1 if sec.get('hide_title') else 0)
+          for i, sec in enumerate(prepared['sections'])])
+    sections = dict(cur.execute(
+        'SELECT title, id FROM sections WHERE seminar_slug = ?', (slug,)).fetchall())
+    new_sections = []
+    for art in prepared['articles']:
+        if art['section'] and art['section'] not in sections and art['section'] not in new_sections:
+            new_sections.append(art['section'])
+    if new_sections:
+        cur.executemany(
+            'INSERT INTO sections (seminar_slug, title, seq) VALUES (?, ?, ?)',
+            [(slug, title, stats['sections'] + i) for i, title in enumerate(new_sections)])
+        stats['sections'] += len(new_sections)
+        sections = dict(cur.execute(
+            'SELECT title, id FROM sections WHERE seminar_slug = ?', (slug,)).fetchall())
+    return sections
+
+
+def iter_valid_articles(prepared, article_ids, stats):
+    """(art_id, artigo) válidos, na ordem do YAML.
+
+    article_ids: ids já em uso (artigo repetido é pulado, como o
+    IntegrityError da inserção um a um); os aceitos são acrescentados.
+    """
+    slug = prepared['seminar']['slug']
+    for idx, art in enumerate(prepared['articles']):
+        # Gerar ID se ausente
+        art_id = art['id'] or f'{slug}-{idx+1:03d}'
+        if art_id in article_ids:
+            print(f'\n  ERRO artigo {art_id}: UNIQUE constraint failed: articles.id')
+            stats['skipped'] += 1
+            continue
+        if art['title'] is None:
+            print(f'\n  ERRO artigo {art_id}: NOT NULL constraint failed: articles.title')
+            stats['skipped'] += 1
+            continue
+        article_ids.add(art_id)
+        yield art_id, art
+
+
+def author_links(cur, resolver, articles):
+    """Resolve os autores de [(art_id, artigo)] de uma vez.
+
+    Retorna {art_id: [(author_id, seq, primary_contact, affiliation, bio, country)]}.
+    """
+    pending = []
+    for art_id, art in articles:
+        for seq, author in enumerate(art['authors']):
+            gn = (author.get('givenname') or '').strip()
+            fn = (author.get('familyname') or '').strip()
+            if gn and fn:
+                pending.append((art_id, seq, gn, fn, author))
+    resolver.resolve(cur, [(gn, fn, author.get('email'), author.get('orcid'))
+                           for _, _, gn, fn, author in pending])
+    links = {art_id: [] for art_id, _ in articles}
+    for art_id, seq, gn, fn, author in pending:
+        links[art_id].append((
+            resolver.id(gn, fn), seq,
+            1 if author.get('primary_contact') else 0,
+            author.get('affiliation'),
+            author.get('bio'),
+            author.get('country', 'BR'),
+        ))
+    return links
+
+
+def insert_links(cur, links):
+    cur.executemany(f'''
+        INSERT OR IGNORE INTO article_author
+        (article_id, {', '.join(LINK_COLUMNS)})
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(art_id, *link) for art_id, rows in links.items() for link in rows])
+    return sum(len(rows) for rows in links.values())
+
+
+def insert_articles(cur, slug, rows):
+    """rows: [(art_id, valores de ARTICLE_COLUMNS, yaml_hash)]."""
+    cur.executemany(f'''
+        INSERT INTO articles
+        (id, seminar_slug, {', '.join(ARTICLE_COLUMNS)}, yaml_hash)
+        VALUES ({', '.join('?' * (len(ARTICLE_COLUMNS) + 3))})
+    ''', [(art_id, slug, *values, digest) for art_id, values, digest in rows])
+
+
+def insert_seminar(cur, prepared, resolver, article_ids, stats):
+    """Grava um seminário lido por prepare_file. Retorna nº de artigos inseridos.
+
+    Seções e autores novos são criados em lote antes dos artigos; artigos e
+    vínculos autor-artigo vão em executemany.
+    """
+    sem = prepared['seminar']
+    slug = sem['slug']
+
+    # Inserir seminário
+    cur.execute(f'''
+        INSERT OR REPLACE INTO seminars (slug, {', '.join(SEMINAR_COLUMNS)})
+        VALUES ({', '.join('?' * (len(SEMINAR_COLUMNS) + 1))})
+    ''', (slug, *seminar_values(sem)))
+    stats['seminars'] += 1
+
+    sections = resolve_sections(cur, slug, prepared, stats)
+    accepted = list(iter_valid_articles(prepared, article_ids, stats))
+    insert_articles(cur, slug, [(art_id, article_values(art, sections), article_hash(slug, art_id, art))
+                                for art_id, art in accepted])
+
+    # Autores: todos os nomes do seminário resolvidos de uma vez
+    stats['article_author'] += insert_links(cur, author_links(cur, resolver, accepted))
+    return len(accepted)
+
+
+def sync_seminar(cur, prepared, resolver, article_ids, stats):
+    """Aplica ao banco só o que mudou no YAML de um seminário (--sync).
+
+    Compara o hash de cada artigo (article_hash) com articles.yaml_hash:
+    artigo novo é inserido, artigo com hash diferente tem só as colunas e
+    vínculos de autores alterados regravados, artigo que saiu do YAML é
+    apagado. Autores são resolvidos pelo nome (e variantes), então os ids
+    existentes são preservados. Artigo sem hash gravado (banco anterior ao
+    --sync) só recebe o hash, sem mudar dados.
+
+    Retorna {'novos', 'alterados', 'apagados', 'inalterados', 'registrados'}.
+    """
+    sem = prepared['seminar']
+    slug = sem['slug']
+    counts = dict.fromkeys(('novos', 'alterados', 'apagados', 'inalterados', 'registrados'), 0)
+
+    # Seminário: INSERT se novo, UPDATE só das colunas que mudaram
+    values = seminar_values(sem)
+    row = cur.execute(f"SELECT {', '.join(SEMINAR_COLUMNS)} FROM seminars WHERE slug = ?",
+                      (slug,)).fetchone()
+    if row is None:
+        cur.execute(f'''
+            INSERT INTO seminars (slug, {', '.join(SEMINAR_COLUMNS)})
+            VALUES ({', '.join('?' * (len(SEMINAR_COLUMNS) + 1))})
+        ''', (slug, *values))
+        stats['seminars'] += 1
+    else:
+        changed = [(col, new) for col, old, new in zip(SEMINAR_COLUMNS, row, values) if old != new]
+        if changed:
+            cur.execute(f"UPDATE seminars SET {', '.join(f'{col} = ?' for col, _ in changed)} WHERE slug = ?",
+                        [new for _, new in changed] + [slug])
+            stats['seminars'] += 1
+
+    sections = resolve_sections(cur, slug, prepared, stats)
+    stored = {r[0]: (r[1], r[2:]) for r in cur.execute(
+        f"SELECT id, yaml_hash, {', '.join(ARTICLE_COLUMNS)} FROM articles WHERE seminar_slug = ?",
+        (slug,))}
+
+    # Os ids deste seminário podem reaparecer; os de outros seminários não
+    others = article_ids - set(stored)
+    inserts, updates, baseline = [], [], []
+    seen = set()
+    for art_id, art in iter_valid_articles(prepared, others, stats):
+        seen.add(art_id)
+        digest = article_hash(slug, art_id, art)
+        if art_id not in stored:
+            inserts.append((art_id, art, digest))
+        elif stored[art_id][0] is None:
+            baseline.append((digest, art_id))
+        elif stored[art_id][0] != digest:
+            updates.append((art_id, art, digest))
+        else:
+            counts['inalterados'] += 1
+    article_ids |= seen
+
+    links = author_links(cur, resolver, [(art_id, art) for art_id, art, _ in inserts + updates])
+
+    # Novos
+    insert_articles(cur, slug, [(art_id, article_values(art, sections), digest)
+                                for art_id, art, digest in inserts])
+    stats['article_author'] += insert_links(cur, {art_id: links[art_id] for art_id, _, _ in inserts})
+    counts['novos'] = len(inserts)
+
+    # Alterados: só as colunas e vínculos que mudaram
+    if updates:
+        current_links = {}
+        placeholders = ', '.join('?' * len(updates))
+        for r in cur.execute(f'''
+            SELECT article_id, {', '.join(LINK_COLUMNS)} FROM article_author
+            WHERE article_id IN ({placeholders}) ORDER BY article_id, seq
+        ''', [art_id for art_id, _, _ in updates]):
+            current_links.setdefault(r[0], []).append(tuple(r[1:]))
+    for art_id, art, digest in updates:
+        new_values = article_values(art, sections)
+        changed = [(col, new) for col, old, new in zip(ARTICLE_COLUMNS, stored[art_id][1], new_values)
+                   if old != new]
+        cur.execute(f"UPDATE articles SET {''.join(f'{col} = ?, ' for col, _ in changed)}yaml_hash = ? "
+                    f"WHERE id = ?", [new for _, new in changed] + [digest, art_id])
+        if current_links.get(art_id, []) != links[art_id]:
+            cur.execute('DELETE FROM article_author WHERE article_id = ?', (art_id,))
+            stats['article_author'] += insert_links(cur, {art_id: links[art_id]})
+        counts['alterados'] += 1
+
+    # Sem hash gravado: só registra
+    cur.executemany('UPDATE articles SET yaml_hash = ? WHERE id = ?', baseline)
+    counts['registrados'] = len(baseline)
+
+    # Apagados do YAML (mantidos se alguma FK ainda os referencia)
+    for art_id in sorted(set(stored) - seen):
+        cur.execute('SAVEPOINT apagar')
+        try:
+            cur.execute('DELETE FROM article_author WHERE article_id = ?', (art_id,))
+            cur.execute('DELETE FROM articles WHERE id = ?', (art_id,))
+        except sqlite3.IntegrityError as e:
+            cur.execute('ROLLBACK TO apagar')
+            print(f'\n  AVISO artigo {art_id} fora do YAML mas mantido: {e}')
+        else:
+            article_ids.discard(art_id)
+            counts['apagados'] += 1
+        cur.execute('RELEASE apagar')
+
+    return counts
+
+
+def remove_seminar(cur, slug, article_ids):
+    """Apaga um seminário que saiu dos YAMLs (artigos, vínculos, seções).
+
+    Tudo ou nada: se alguma FK ainda referencia o seminário, ele é mantido
+    com um aviso. Retorna o nº de artigos apagados (None se mantido).
+    """
+    ids = [r[0] for r in cur.execute('SELECT id FROM articles WHERE seminar_slug = ?', (slug,))]
+    cur.execute('SAVEPOINT apagar_seminario')
+    try:
+        cur.execute('DELETE FROM article_author WHERE article_id IN '
+                    '(SELECT id FROM articles WHERE seminar_slug = ?)', (slug,))
+        cur.execute('DELETE FROM articles WHERE seminar_slug = ?', (slug,))
+        cur.execute('DELETE FROM sections WHERE seminar_slug = ?', (slug,))
+        cur.execute('DELETE FROM seminars WHERE slug = ?', (slug,))
+    except sqlite3.IntegrityError as e:
+        cur.execute('ROLLBACK TO apagar_seminario')
+        cur.execute('RELEASE apagar_seminario')
+        print(f'  AVISO seminário {slug} fora dos YAMLs mas mantido: {e}')
+        return None
+    cur.execute('RELEASE apagar_seminario')
+    article_ids.difference_update(ids)
+    return len(ids)
+
+
+def prune_orphan_authors(cur):
+    """Apaga autores que ficaram sem artigos (vínculo reescrito ou artigo apagado).
+
+    Autores com ORCID, grafias em author_variants ou exclusões de ORCID
+    são mantidos (dados de curadoria que a reimportação não refaz).
+    Retorna (nº apagados, [(id, nome)] mantidos).
+    """
+    orphans = cur.execute('''
+        SELECT au.id, au.givenname, au.familyname,
+               au.orcid IS NOT NULL
+               OR EXISTS (SELECT 1 FROM author_variants v WHERE v.author_id = au.id)
+               OR EXISTS (SELECT 1 FROM orcid_exclusions x WHERE x.author_id = au.id)
+        FROM authors au
+        WHERE NOT EXISTS (SELECT 1 FROM article_author aa WHERE aa.author_id = au.id)
+        ORDER BY au.id
+    ''').fetchall()
+    kept = [(author_id, f'{gn} {fn}') for author_id, gn, fn, curated in orphans if curated]
+    removed = [(author_id,) for author_id, _, _, curated in orphans if not curated]
+    cur.executemany('DELETE FROM authors WHERE id = ?', removed)
+    return len(removed), kept
+
+
+def prepare_files(paths, workers, only=None):
+    """Lê e valida todos os YAMLs (filtrando por slug) antes de gravar.
+
+    Mostra os avisos e todos os erros de cada arquivo. Retorna (arquivos
+    preparados, nº de erros).
+    """
+    t0 = time.monotonic()
+    files = []
+    n_errors = n_warnings = n_articles = 0
+    validate_total = 0.0
+    for prepared in iter_prepared(paths, workers):
+        if prepared is None:
+            continue
+        if only and prepared['seminar'].get('slug') not in only:
+            continue
+        files.append(prepared)
+        n_articles += prepared['count']
+        validate_total += prepared['validate_seconds']
+        problems = ([f'ERRO {e}' for e in prepared['errors']] +
+                    [f'AVISO {w}' for w in prepared['warnings']])
+        if problems:
+            print(f"{os.path.relpath(prepared['path'], BASE)}:")
+            for problem in problems:
+                print(f'  {problem}')
+        n_errors += len(prepared['errors'])
+        n_warnings += len(prepared['warnings'])
+    print(f'Validação: {len(files)} arquivos, {n_articles} artigos — {n_errors} erro(s), '
+          f'{n_warnings} aviso(s) (validação {validate_total * 1000:.0f} ms, '
+          f'leitura+validação {time.monotonic() - t0:.1f}s)\n')
+    return files, n_errors
 
 
 def main():
@@ -208,24 +539,50 @@ def main():
                         help='Importar sem apagar dados existentes')
     parser.add_argument('--only', nargs='+', metavar='SLUG',
                         help='Importar apenas estes slugs (ex: sdrj02 sdrj03)')
+    parser.add_argument('--sync', action='store_true',
+                        help='Sincroniza por hash: só insere/atualiza/apaga artigos alterados '
+                             '(preserva ids de autores; combina com --only)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos para ler os YAMLs (default: nº de CPUs; 1 = serial)')
+    parser.add_argument('--check', action='store_true',
+                        help='Só valida os YAMLs contra schema/*.yaml, sem gravar no banco')
     args = parser.parse_args()
 
-    if not os.path.exists(DB_PATH):
+    if not args.check and not os.path.exists(DB_PATH):
         print(f'Banco não encontrado: {DB_PATH}')
         print('Execute init_anais_db.py primeiro.')
         sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
+    # Tudo é lido e validado antes de abrir o banco
+    t_start = time.monotonic()
+    files, n_errors = prepare_files(find_yaml_files(), args.workers, args.only)
+    if n_errors:
+        print(f'{n_errors} erro(s) de validação — nada foi gravado no banco.')
+        sys.exit(1)
+    if args.check:
+        return
+
+    full_reimport = not (args.incremental or args.only or args.sync)
+    conn = anais_db.connect(DB_PATH)
     conn.execute('PRAGMA foreign_keys = ON')
+    # Importação em lote numa transação só. Na reimportação completa o banco
+    # é refeito a partir dos YAMLs se algo falhar, então dispensa o fsync
+    conn.execute(f"PRAGMA synchronous = {'OFF' if full_reimport else 'NORMAL'}")
     cur = conn.cursor()
 
-    if not args.incremental and not args.only:
-        # Limpar dados existentes (para reimportação completa)
+    if args.sync:
+        pass  # nada é apagado de antemão
+    elif full_reimport:
+        # Limpar dados existentes (para reimportação completa). A busca
+        # textual é reindexada uma vez no fim, em vez de trigger por artigo.
+        # Limpeza, carga e reindexação numa transação só: se algo falhar,
+        # o rollback devolve também os triggers removidos
+        conn.execute('BEGIN')
+        anais_db.suspend_fts(conn)
         for table in ['article_author', 'author_variants', 'articles', 'authors', 'sections', 'seminars']:
             cur.execute(f'DELETE FROM {table}')
         # Reset autoincrement
         cur.execute("DELETE FROM sqlite_sequence")
-        conn.commit()
     elif args.only:
         # Limpar apenas os slugs especificados
         for slug in args.only:
@@ -236,150 +593,59 @@ def main():
         conn.commit()
         print(f'Limpou dados de: {", ".join(args.only)}')
 
-    yaml_files = find_yaml_files()
     stats = {
         'seminars': 0, 'sections': 0, 'articles': 0,
         'authors': 0, 'article_author': 0, 'skipped': 0,
     }
 
-    for path in yaml_files:
-        with open(path) as f:
-            data = yaml.safe_load(f)
-
-        if not data or not isinstance(data, dict):
-            continue
-
-        # Verificar se tem artigos
-        articles_raw = parse_articles(data)
-        if not articles_raw:
-            continue
-
-        # Parsear seminário
-        sem = parse_seminar(data)
-        if not sem.get('slug'):
-            print(f'  SKIP (sem slug): {path}')
-            continue
-
-        slug = sem['slug']
-
-        # Filtrar por --only se especificado
-        if args.only and slug not in args.only:
-            continue
-
-        print(f'{slug:12s} — {len(articles_raw)} artigos ... ', end='', flush=True)
-
-        # Inserir seminário
-        related = sem.get('related_urls', [])
-        cur.execute('''
-            INSERT OR REPLACE INTO seminars
-            (slug, title, subtitle, year, volume, number, date_published,
-             isbn, doi, description, location, publisher, source, editors,
-             volume_pdf, related_urls)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            slug, sem['title'], sem['subtitle'], sem['year'],
-            sem['volume'], sem['number'],
-            str(sem['date_published']) if sem['date_published'] else None,
-            sem['isbn'], sem['doi'], sem['description'],
-            sem['location'], sem['publisher'], sem['source'],
-            json.dumps(sem['editors'], ensure_ascii=False) if sem['editors'] else '[]',
-            sem['volume_pdf'],
-            json.dumps(related, ensure_ascii=False) if related else None,
-        ))
-        stats['seminars'] += 1
-
-        # Seções pré-definidas (sdsul06-08 no topo, sdrj02-03 em issue.sections)
-        predefined_sections = parse_sections_from_data(data) or parse_issue_sections(data)
-        for i, sec in enumerate(predefined_sections):
-            cur.execute('''
-                INSERT OR IGNORE INTO sections (seminar_slug, title, abbrev, seq, hide_title)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (slug, sec['title'], sec.get('abbrev'), i,
-                  1 if sec.get('hide_title') else 0))
-
-        # Processar artigos
-        art_count = 0
-        for idx, art_raw in enumerate(articles_raw):
-            art = normalize_article(art_raw, slug)
-
-            # Gerar ID se ausente
-            art_id = art['id'] or f'{slug}-{idx+1:03d}'
-
-            # Seção: buscar ou criar
-            section_id = None
-            if art['section']:
-                cur.execute(
-                    'SELECT id FROM sections WHERE seminar_slug = ? AND title = ?',
-                    (slug, art['section'])
-                )
-                row = cur.fetchone()
-                if row:
-                    section_id = row[0]
-                else:
-                    cur.execute(
-                        'INSERT INTO sections (seminar_slug, title, seq) VALUES (?, ?, ?)',
-                        (slug, art['section'], stats['sections'])
-                    )
-                    section_id = cur.lastrowid
-                    stats['sections'] += 1
-
-            # Inserir artigo
-            try:
-                cur.execute('''
-                    INSERT INTO articles
-                    (id, seminar_slug, section_id, title, subtitle, locale,
-                     pages, pages_count, file, abstract, abstract_en, abstract_es,
-                     keywords, keywords_en, keywords_es, references_, ojs_id, doi)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    art_id, slug, section_id, art['title'], art['subtitle'],
-                    art['locale'], art['pages'], art['pages_count'], art['file'],
-                    art['abstract'], art['abstract_en'], art['abstract_es'],
-                    art['keywords'], art['keywords_en'], art['keywords_es'],
-                    art['references_'], art['ojs_id'], art['doi'],
-                ))
-            except sqlite3.IntegrityError as e:
-                print(f'\n  ERRO artigo {art_id}: {e}')
-                stats['skipped'] += 1
-                continue
-
-            art_count += 1
-
-            # Autores
-            for seq, author in enumerate(art['authors']):
-                gn = (author.get('givenname') or '').strip()
-                fn = (author.get('familyname') or '').strip()
-                if not gn or not fn:
-                    continue
-
-                author_id = get_or_create_author(cur, gn, fn)
-                update_author_contact(
-                    cur, author_id,
-                    author.get('email'),
-                    author.get('orcid')
-                )
-
-                try:
-                    cur.execute('''
-                        INSERT OR IGNORE INTO article_author
-                        (article_id, author_id, seq, primary_contact,
-                         affiliation, bio, country)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        art_id, author_id, seq,
-                        1 if author.get('primary_contact') else 0,
-                        author.get('affiliation'),
-                        author.get('bio'),
-                        author.get('country', 'BR'),
-                    ))
-                    stats['article_author'] += 1
-                except sqlite3.IntegrityError:
-                    pass  # mesmo autor duplicado no artigo
-
-        stats['articles'] += art_count
-        print(f'{art_count} importados')
-
+    parse_total = sum(prepared['parse_seconds'] for prepared in files)
+    insert_total = 0.0
+    resolver = AuthorResolver(cur)
+    sync_totals = dict.fromkeys(('novos', 'alterados', 'apagados', 'inalterados', 'registrados'), 0)
+    article_ids = {r[0] for r in cur.execute('SELECT id FROM articles')}
+    for prepared in files:
+        slug = prepared['seminar']['slug']
+        print(f"{slug:12s} — {prepared['count']} artigos ... ", end='', flush=True)
+        t0 = time.monotonic()
+
+        if args.sync:
+            counts = sync_seminar(cur, prepared, resolver, article_ids, stats)
+            for key, n in counts.items():
+                sync_totals[key] += n
+            summary = (f"+{counts['novos']} ~{counts['alterados']} -{counts['apagados']} "
+                       f"={counts['inalterados']}")
+            if counts['registrados']:
+                summary += f" ({counts['registrados']} hashes registrados)"
+        else:
+            art_count = insert_seminar(cur, prepared, resolver, article_ids, stats)
+            stats['articles'] += art_count
+            summary = f'{art_count} importados'
+
+        insert_seconds = time.monotonic() - t0
+        insert_total += insert_seconds
+        print(f"{summary} (leitura {prepared['parse_seconds']:.2f}s, "
+              f"inserção {insert_seconds:.2f}s)")
+
+    removed_seminars = {}
+    orphans_removed, orphans_kept = 0, []
+    if args.sync and files:
+        # Seminários no banco (no escopo do --only) sem YAML correspondente
+        in_yaml = {prepared['seminar']['slug'] for prepared in files}
+        in_db = [r[0] for r in cur.execute('SELECT slug FROM seminars ORDER BY slug')]
+        for slug in in_db:
+            if slug not in in_yaml and (not args.only or slug in args.only):
+                n = remove_seminar(cur, slug, article_ids)
+                if n is not None:
+                    removed_seminars[slug] = n
+    if args.sync:
+        orphans_removed, orphans_kept = prune_orphan_authors(cur)
+
+    if full_reimport:
+        t0 = time.monotonic()
+        anais_db.rebuild_fts(conn)
+        print(f'Índice de busca reconstruído em {time.monotonic() - t0:.2f}s')
     conn.commit()
+    elapsed = time.monotonic() - t_start
 
     # Contar autores
     cur.execute('SELECT COUNT(*) FROM authors')
@@ -389,11 +655,28 @@ def main():
     print(f'\n{"="*50}')
     print(f'Seminários:      {stats["seminars"]}')
     print(f'Seções:          {stats["sections"]}')
-    print(f'Artigos:         {stats["articles"]}')
+    if args.sync:
+        print(f"Artigos:         {sync_totals['novos']} novos, {sync_totals['alterados']} alterados, "
+              f"{sync_totals['apagados']} apagados, {sync_totals['inalterados']} inalterados")
+        if sync_totals['registrados']:
+            print(f"Hashes novos:    {sync_totals['registrados']} (artigos sem hash, dados mantidos)")
+    else:
+        print(f'Artigos:         {stats["articles"]}')
+    for slug, n in removed_seminars.items():
+        print(f'Seminário apagado (fora dos YAMLs): {slug} ({n} artigos)')
     print(f'Autores únicos:  {stats["authors"]}')
+    if orphans_removed:
+        print(f'Autores sem artigos apagados: {orphans_removed}')
+    if orphans_kept:
+        print(f'Autores sem artigos mantidos (ORCID/variantes/exclusões): {len(orphans_kept)}')
+        for author_id, name in orphans_kept[:20]:
+            print(f'  {author_id}: {name}')
     print(f'Vínculos autor:  {stats["article_author"]}')
     if stats['skipped']:
         print(f'Artigos pulados: {stats["skipped"]}')
+    loader = 'libyaml (C)' if SafeLoader.__module__ == 'yaml.cyaml' else 'Python puro'
+    print(f'Tempo: leitura {parse_total:.1f}s ({loader}, {args.workers} processo(s)), '
+          f'inserção {insert_total:.1f}s, total {elapsed:.1f}s')
 
     # Top autores recorrentes
     print(f'\nTop 10 autores por nº de artigos:')
@@ -413,6 +696,17 @@ def main():
     print(f'\nAutores com email: {with_email}/{stats["authors"]}')
     print(f'Autores com ORCID: {with_orcid}/{stats["authors"]}')
 
+    # Depósitos no Zenodo cujo artigo saiu dos YAMLs (o ledger não tem FK)
+    orphans = cur.execute('''
+        SELECT z.article_id, z.base_url FROM zenodo_ledger z
+        LEFT JOIN articles a ON a.id = z.article_id
+        WHERE a.id IS NULL ORDER BY z.article_id
+    ''').fetchall()
+    if orphans:
+        print(f'\nAVISO: {len(orphans)} registro(s) do zenodo_ledger sem artigo no banco:')
+        for art_id, base_url in orphans[:20]:
+            print(f'  {art_id} ({base_url})')
+
     conn.close()
     print(f'\nBanco atualizado: {os.path.abspath(DB_PATH)}')
 
@@ -1,115 +1,12 @@
 #!/usr/bin/env python3
-"""Cria o banco anais.db com o schema completo."""
+"""Cria o banco anais.db com o schema completo (migrações de anais_db.py)."""
 
-import sqlite3
 import os
 import sys
 
-DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'anais.db')
-
-SCHEMA = """
-PRAGMA foreign_keys = ON;
-PRAGMA journal_mode = WAL;
-
-CREATE TABLE IF NOT EXISTS seminars (
-    slug TEXT PRIMARY KEY,
-    title TEXT NOT NULL,
-    subtitle TEXT,
-    year INTEGER NOT NULL,
-    volume INTEGER,
-    number INTEGER,
-    date_published TEXT,
-    isbn TEXT,
-    doi TEXT,
-    description TEXT,
-    location TEXT,
-    publisher TEXT,
-    source TEXT,
-    editors TEXT,
-    volume_pdf TEXT,
-    related_urls TEXT
-);
-
-CREATE TABLE IF NOT EXISTS sections (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    seminar_slug TEXT NOT NULL REFERENCES seminars(slug),
-    title TEXT NOT NULL,
-    abbrev TEXT,
-    seq INTEGER DEFAULT 0,
-    hide_title INTEGER DEFAULT 0,
-    UNIQUE(seminar_slug, title)
-);
-
-CREATE TABLE IF NOT EXISTS articles (
-    id TEXT PRIMARY KEY,
-    seminar_slug TEXT NOT NULL REFERENCES seminars(slug),
-    section_id INTEGER REFERENCES sections(id),
-    title TEXT NOT NULL,
-    subtitle TEXT,
-    title_en TEXT,
-    subtitle_en TEXT,
-    locale TEXT DEFAULT 'pt-BR',
-    pages TEXT,
-    pages_count INTEGER,
-    file TEXT,
-    abstract TEXT,
-    abstract_en TEXT,
-    abstract_es TEXT,
-    keywords TEXT,
-    keywords_en TEXT,
-    keywords_es TEXT,
-    references_ TEXT,
-    ojs_id TEXT,
-    doi TEXT,
-    document_type TEXT DEFAULT 'artigo'
-);
-
-CREATE TABLE IF NOT EXISTS authors (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    givenname TEXT NOT NULL,
-    familyname TEXT NOT NULL,
-    email TEXT,
-    orcid TEXT,
-    orcid_checked_at TEXT,
-    orcid_pipeline_version TEXT,
-    UNIQUE(givenname, familyname)
-);
+import anais_db
 
-CREATE TABLE IF NOT EXISTS author_variants (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    author_id INTEGER NOT NULL REFERENCES authors(id),
-    givenname TEXT NOT NULL,
-    familyname TEXT NOT NULL,
-    source TEXT,
-    UNIQUE(givenname, familyname)
-);
-
-CREATE TABLE IF NOT EXISTS article_author (
-    article_id TEXT NOT NULL REFERENCES articles(id),
-    author_id INTEGER NOT NULL REFERENCES authors(id),
-    seq INTEGER DEFAULT 0,
-    primary_contact INTEGER DEFAULT 0,
-    affiliation TEXT,
-    bio TEXT,
-    country TEXT DEFAULT 'BR',
-    PRIMARY KEY (article_id, author_id)
-);
-
-CREATE TABLE IF NOT EXISTS orcid_exclusions (
-    author_id INTEGER NOT NULL REFERENCES authors(id),
-    orcid TEXT NOT NULL,
-    reason TEXT,
-    PRIMARY KEY (author_id, orcid)
-);
-
-CREATE INDEX IF NOT EXISTS idx_articles_seminar ON articles(seminar_slug);
-CREATE INDEX IF NOT EXISTS idx_articles_section ON articles(section_id);
-CREATE INDEX IF NOT EXISTS idx_sections_seminar ON sections(seminar_slug);
-CREATE INDEX IF NOT EXISTS idx_article_author_author ON article_author(author_id);
-CREATE INDEX IF NOT EXISTS idx_article_author_article ON article_author(article_id);
-CREATE INDEX IF NOT EXISTS idx_author_variants_author ON author_variants(author_id);
-CREATE INDEX IF NOT EXISTS idx_authors_familyname ON authors(familyname);
-"""
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'anais.db')
 
 
 def main():
@@ -119,13 +16,10 @@ def main():
         print('Apague manualmente para recriar.')
         sys.exit(1)
 
-    conn = sqlite3.connect(db_path)
-    conn.executescript(SCHEMA)
-    conn.close()
-    print(f'Banco criado: {db_path}')
+    conn = anais_db.connect(db_path)
+    print(f'Banco criado: {db_path} (schema versão {anais_db.schema_version(conn)})')
 
     # Verificar tabelas
-    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
     tables = [r[0] for r in cur.fetchall()]
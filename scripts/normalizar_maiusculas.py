@@ -14,9 +14,10 @@ Uso:
 
 import argparse
 import os
-import sqlite3
 import sys
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -73,7 +74,7 @@ def main():
           f'{s["movimentos"]} movimentos, {s["toponimicos"]} toponímicos, '
           f'{s["expressoes"]} expressões\n')
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
 
     if args.slug:
         slugs = [args.slug]
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""Cliente HTTP compartilhado para o OJS (usado por import_ojs.py e import_batches.py).
+
+Mantém um pool de sessões autenticadas (login + CSRF feitos uma vez por
+sessão), reaproveita conexões keep-alive e refaz o login automaticamente
+quando o servidor responde 401/403 ou rejeita o CSRF token. Cada requisição
+é cronometrada; `client.print_metrics()` mostra o resumo no fim do script.
+
+Uso:
+    from ojs_client import ENVS, OJSClient
+
+    client = OJSClient.from_env(ENVS['test'])
+    issues = client.load_all_issues()
+    count = client.count_issue_articles(issues[0]['id'])
+    client.print_metrics()
+
+Sessão fresca (cookies limpos + novo login) continua disponível para as
+operações pesadas de importação, onde o servidor aplica rate limiting:
+
+    client.renew()
+    ok, msg, temp_id = client.upload_and_import(filepath)
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import anais_db
+
+ENVS = {
+    'test': {
+        'url': 'https://docomomo.ojs.com.br/index.php/ojs',
+        'username': os.environ.get('OJS_TEST_USER', 'editor'),
+        'password': os.environ.get('OJS_TEST_PASS', ''),
+    },
+    'prod': {
+        'url': 'https://publicacoes.docomomobrasil.com/anais',
+        'username': os.environ.get('OJS_PROD_USER', 'dmacedo'),
+        'password': os.environ.get('OJS_PROD_PASS', ''),
+    },
+}
+
+NATIVE_PLUGIN = '/management/importexport/plugin/NativeImportExportPlugin'
+JSON_HEADERS = {'Accept': 'application/json'}
+
+# Respostas que indicam sessão expirada ou CSRF inválido
+AUTH_STATUS = (401, 403)
+CSRF_FAILURE_MARKERS = ('csrfTokenFailure', 'form.csrfInvalid')
+
+
+class OJSSession:
+    """Uma sessão autenticada do pool: requests.Session + CSRF token."""
+
+    def __init__(self, http):
+        self.http = http
+        self.csrf = None
+        self.logins = 0
+
+
+class RequestMetrics:
+    """Acumula tempo e status das requisições, agrupadas por rota."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = defaultdict(lambda: {'n': 0, 'total': 0.0, 'max': 0.0, 'errors': 0})
+        self.logins = 0
+        self.relogins = 0
+
+    def record(self, label, elapsed, ok=True):
+        with self._lock:
+            c = self.calls[label]
+            c['n'] += 1
+            c['total'] += elapsed
+            c['max'] = max(c['max'], elapsed)
+            if not ok:
+                c['errors'] += 1
+
+    def summary(self):
+        """Retorna linhas de texto com o resumo por rota (mais lentas primeiro)."""
+        lines = [f'Logins: {self.logins} (re-logins automáticos: {self.relogins})']
+        rows = sorted(self.calls.items(), key=lambda kv: -kv[1]['total'])
+        for label, c in rows:
+            avg = c['total'] / c['n'] if c['n'] else 0
+            err = f', {c["errors"]} erros' if c['errors'] else ''
+            lines.append(f'  {label}: {c["n"]}x, total {c["total"]:.1f}s, '
+                         f'média {avg:.2f}s, máx {c["max"]:.2f}s{err}')
+        return lines
+
+
+class MultipartFileStream:
+    """Corpo multipart/form-data que lê o arquivo do disco em blocos.
+
+    requests monta `files=` inteiro em memória; este objeto tem __len__
+    (Content-Length conhecido) e __iter__ (um novo gerador a cada envio,
+    então o re-login automático pode reenviar o corpo). Os campos são
+    serializados no momento do envio, o que permite trocar o csrfToken.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, fields, file_field, filepath, content_type):
+        self.fields = dict(fields)
+        self.file_field = file_field
+        self.filepath = filepath
+        self.file_content_type = content_type
+        self.file_size = os.path.getsize(filepath)
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+
+    def _head(self):
+        parts = [
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'
+            for k, v in self.fields.items()
+        ]
+        parts.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{self.file_field}"; '
+            f'filename="{os.path.basename(self.filepath)}"\r\n'
+            f'Content-Type: {self.file_content_type}\r\n\r\n'
+        )
+        return ''.join(parts).encode('utf-8')
+
+    def _tail(self):
+        return f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+
+    def __len__(self):
+        return len(self._head()) + self.file_size + len(self._tail())
+
+    def __iter__(self):
+        yield self._head()
+        with open(self.filepath, 'rb') as f:
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        yield self._tail()
+
+
+def issue_slug(issue):
+    """Extrai o slug do seminário da publishedUrl de uma issue (None se não houver)."""
+    url = issue.get('publishedUrl', '') or ''
+    slug = url.rstrip('/').split('/')[-1] if url else None
+    if slug and slug not in ('ojs', 'anais'):
+        return slug
+    return None
+
+
+def _route_label(method, path):
+    """Normaliza o path para agrupar métricas (IDs numéricos → {id})."""
+    path = re.sub(r'/\d+', '/{id}', path.split('?', 1)[0])
+    return f'{method.upper()} {path}'
+
+
+class OJSClient:
+    """Cliente OJS com pool de sessões autenticadas e re-login automático."""
+
+    def __init__(self, base_url, username, password, pool_size=1, pool_maxsize=4):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size
+        self.pool_maxsize = pool_maxsize
+        self.metrics = RequestMetrics()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env, **kwargs):
+        return cls(env['url'], env['username'], env['password'], **kwargs)
+
+    # --- Pool de sessões ---
+
+    def _new_session(self):
+        http = requests.Session()
+        # Uma conexão keep-alive reaproveitada por todas as chamadas da sessão
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        http.mount('https://', adapter)
+        http.mount('http://', adapter)
+        return OJSSession(http)
+
+    def login(self, sess):
+        """Faz login na sessão (cookies limpos) e obtém o CSRF token."""
+        sess.http.cookies.clear()
+        t0 = time.monotonic()
+        resp = sess.http.post(
+            f'{self.base_url}/login/signIn',
+            data={'username': self.username, 'password': self.password},
+            allow_redirects=True, timeout=30,
+        )
+        self.metrics.record('POST /login/signIn', time.monotonic() - t0,
+                            resp.status_code == 200)
+        if resp.status_code != 200:
+            raise RuntimeError(f'Login falhou: HTTP {resp.status_code}')
+        t0 = time.monotonic()
+        resp = sess.http.get(f'{self.base_url}{NATIVE_PLUGIN}', timeout=30)
+        match = re.search(r'"csrfToken":"([^"]+)"', resp.text)
+        self.metrics.record(f'GET {NATIVE_PLUGIN}', time.monotonic() - t0, bool(match))
+        if not match:
+            raise RuntimeError('Não obteve CSRF token')
+        sess.csrf = match.group(1)
+        sess.logins += 1
+        self.metrics.logins += 1
+        return sess
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.pool_size
+            if create:
+                self._created += 1
+        if create:
+            return self._new_session()
+        return self._idle.get()
+
+    @contextmanager
+    def session(self, fresh=False):
+        """Empresta uma sessão autenticada do pool.
+
+        fresh=True limpa os cookies e refaz o login antes de usar (equivale
+        ao antigo fresh_session(), mas mantendo a conexão keep-alive).
+        """
+        sess = self._acquire()
+        try:
+            if fresh or sess.csrf is None:
+                self.login(sess)
+            yield sess
+        finally:
+            self._idle.put(sess)
+
+    def renew(self):
+        """Refaz o login da próxima sessão do pool. Retorna o novo CSRF token."""
+        with self.session(fresh=True) as sess:
+            return sess.csrf
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().http.close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+    def print_metrics(self):
+        print('\n--- Requisições OJS ---')
+        for line in self.metrics.summary():
+            print(line)
+
+    # --- Requisições ---
+
+    @staticmethod
+    def _needs_relogin(resp):
+        if resp.status_code in AUTH_STATUS:
+            return True
+        # OJS redireciona para a página de login quando a sessão expira
+        if resp.history and '/login' in resp.url:
+            return True
+        if resp.status_code >= 400:
+            return any(m in resp.text for m in CSRF_FAILURE_MARKERS)
+        return False
+
+    def request(self, method, path, session=None, csrf=None, **kwargs):
+        """Executa uma requisição autenticada, com re-login automático.
+
+        path: relativo a base_url (ex: '/api/v1/issues').
+        csrf: onde injetar o token da sessão — 'data', 'params' ou 'header'.
+              O token é reinjetado após um re-login, então nunca fica obsoleto
+              (também em corpos MultipartFileStream).
+        session: sessão já emprestada (para operações que precisam da mesma
+                 sessão em várias etapas, como upload → import).
+        """
+        if session is None:
+            with self.session() as sess:
+                return self.request(method, path, session=sess, csrf=csrf, **kwargs)
+
+        label = _route_label(method, path)
+        kwargs.setdefault('timeout', 30)
+        for attempt in (1, 2):
+            call = dict(kwargs)
+            if csrf == 'data' and isinstance(call.get('data'), MultipartFileStream):
+                call['data'].fields['csrfToken'] = session.csrf
+            elif csrf == 'data':
+                call['data'] = {**call.get('data', {}), 'csrfToken': session.csrf}
+            elif csrf == 'params':
+                call['params'] = {**call.get('params', {}), 'csrfToken': session.csrf}
+            elif csrf == 'header':
+                call['headers'] = {**call.get('headers', {}), 'X-Csrf-Token': session.csrf}
+            t0 = time.monotonic()
+            try:
+                resp = session.http.request(method, f'{self.base_url}{path}', **call)
+            except Exception:
+                self.metrics.record(label, time.monotonic() - t0, ok=False)
+                raise
+            self.metrics.record(label, time.monotonic() - t0, resp.status_code < 400)
+            if attempt == 1 and self._needs_relogin(resp):
+                self.metrics.relogins += 1
+                self.login(session)
+                continue
+            return resp
+        return resp
+
+    def get_json(self, path, **kwargs):
+        """GET na API REST; retorna o JSON ou None se status != 200."""
+        resp = self.request('GET', path, headers=JSON_HEADERS, **kwargs)
+        if resp.status_code != 200:
+            return None
+        return resp.json()
+
+    # --- Operações ---
+
+    def upload_and_import(self, filepath):
+        """Upload + import de um XML. Retorna (sucesso, mensagem, temp_id)."""
+        with self.session() as sess:
+            # 1. Upload (corpo relido do disco a cada envio: o re-login
+            # automático reenvia, e um handle já lido iria vazio)
+            body = MultipartFileStream({}, 'uploadedFile', filepath, 'text/xml')
+            resp = self.request(
+                'POST', f'{NATIVE_PLUGIN}/uploadImportXML', session=sess, csrf='data',
+                data=body,
+                headers={'X-Requested-With': 'XMLHttpRequest', 'Content-Type': body.content_type},
+                timeout=120,
+            )
+            if resp.status_code != 200:
+                return False, f'upload HTTP {resp.status_code}', None
+            match = re.search(r'"temporaryFileId":"?(\d+)', resp.text)
+            if not match:
+                return False, f'sem temporaryFileId: {resp.text[:200]}', None
+            temp_id = match.group(1)
+
+            # 2. importBounce
+            self.request(
+                'POST', f'{NATIVE_PLUGIN}/importBounce', session=sess, csrf='data',
+                data={'temporaryFileId': temp_id},
+            )
+
+            # 3. Executar import (pode demorar)
+            try:
+                resp = self.request(
+                    'GET', f'{NATIVE_PLUGIN}/import', session=sess, csrf='params',
+                    params={'temporaryFileId': temp_id},
+                    timeout=600,
+                )
+                text = resp.text
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                return False, 'timeout/conexão perdida na execução', temp_id
+
+        if not text:
+            return False, 'resposta vazia', temp_id
+        if 'xito' in text:
+            return True, 'OK', temp_id
+        errors = re.findall(r'<li>([^<]+)</li>', text)
+        if errors:
+            return False, '; '.join(e.strip()[:120] for e in errors[:5]), temp_id
+        return False, f'resposta desconhecida: {text[:200]}', temp_id
+
+    def load_all_issues(self):
+        """Carrega TODAS as issues. Retorna lista de {id, slug}."""
+        issues = []
+        offset = 0
+        while True:
+            try:
+                data = self.get_json('/api/v1/issues',
+                                     params={'count': 50, 'offset': offset})
+            except Exception:
+                break
+            if data is None:
+                break
+            items = data.get('items', [])
+            if not items:
+                break
+            for iss in items:
+                slug = issue_slug(iss)
+                if slug:
+                    issues.append({'id': iss['id'], 'slug': slug})
+            if offset + len(items) >= data.get('itemsMax', 0):
+                break
+            offset += 50
+        return issues
+
+    def count_issue_articles(self, issue_id):
+        """Conta artigos de uma issue. Retorna -1 se erro."""
+        try:
+            data = self.get_json('/api/v1/submissions',
+                                 params={'issueIds': issue_id, 'count': 1})
+        except Exception:
+            return -1
+        if data is None:
+            return -1
+        return data.get('itemsMax', 0)
+
+    def get_issue_submission_ids(self, issue_id):
+        """Retorna lista de submission IDs de uma issue."""
+        ids = []
+        offset = 0
+        while True:
+            try:
+                data = self.get_json(
+                    '/api/v1/submissions',
+                    params={'issueIds': issue_id, 'count': 100, 'offset': offset},
+                )
+            except Exception:
+                break
+            if data is None:
+                break
+            items = data.get('items', [])
+            if not items:
+                break
+            ids.extend(item['id'] for item in items)
+            if len(ids) >= data.get('itemsMax', 0):
+                break
+            offset += 100
+        return ids
+
+    def delete_submission(self, sub_id):
+        """Despublica e deleta um submission."""
+        try:
+            data = self.get_json(f'/api/v1/submissions/{sub_id}', timeout=15)
+            if data is None:
+                return False
+            pub_id = data.get('currentPublicationId')
+            if pub_id:
+                self.request(
+                    'PUT', f'/api/v1/submissions/{sub_id}/publications/{pub_id}/unpublish',
+                    csrf='header', headers=JSON_HEADERS, timeout=15,
+                )
+            resp = self.request(
+                'DELETE', f'/api/v1/submissions/{sub_id}',
+                csrf='header', headers=JSON_HEADERS, timeout=15,
+            )
+            return resp.status_code == 200
+        except Exception:
+            return False
+
+    def delete_issue(self, issue_id):
+        """Deleta uma issue (deve estar sem artigos)."""
+        try:
+            resp = self.request(
+                'POST', '/$$$call$$$/grid/issues/back-issue-grid/delete-issue',
+                csrf='data', data={'issueId': issue_id},
+            )
+            return resp.status_code == 200
+        except Exception:
+            return False
+
+    def wipe_issue(self, issue_id, slug=''):
+        """Apaga todos os artigos de uma issue e depois a issue em si."""
+        sub_ids = self.get_issue_submission_ids(issue_id)
+        if sub_ids:
+            print(f'    apagando {len(sub_ids)} artigos da issue {issue_id} ({slug})...')
+            for sub_id in sub_ids:
+                self.delete_submission(sub_id)
+                time.sleep(1)
+        if self.delete_issue(issue_id):
+            print(f'    issue {issue_id} ({slug}) apagada')
+            return True
+        else:
+            print(f'    AVISO: não conseguiu apagar issue {issue_id} ({slug})')
+            return False
+
+
+def get_expected_counts(db_path):
+    """Lê contagem esperada de artigos por seminário."""
+    conn = anais_db.connect_readonly(db_path)
+    rows = conn.execute(
+        "SELECT seminar_slug, COUNT(*) FROM articles "
+        "WHERE seminar_slug NOT LIKE 'sdbr%' GROUP BY seminar_slug"
+    ).fetchall()
+    conn.close()
+    return dict(rows)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Índice local de issues e submissions do OJS, com cache em disco.
+
+Substitui o padrão load_all_issues() + count_issue_articles() por issue:
+o índice lista issues e submissions em páginas buscadas em paralelo, guarda
+tudo em .ojs_cache/index_{host}.json e, nas execuções seguintes, só busca o
+que mudou:
+
+- issues: revalidadas com If-None-Match (ETag) na primeira página;
+- submissions: páginas ordenadas por lastModified (mais recentes primeiro)
+  até alcançar o timestamp da última atualização. Se o total do servidor
+  não bater com o índice (deleções), refaz a listagem completa.
+
+Uso:
+    from ojs_client import ENVS, OJSClient, get_expected_counts
+    from ojs_index import OJSIndex, diff_report, print_diff_report
+
+    client = OJSClient.from_env(ENVS['test'], pool_size=4)
+    index = OJSIndex(client)
+    index.refresh()
+    print_diff_report(diff_report(index, get_expected_counts(db_path)))
+
+Uso direto (relatório esperado × servidor):
+    python3 scripts/ojs_index.py --env test
+    python3 scripts/ojs_index.py --env test --full    # ignora o cache
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from ojs_client import ENVS, JSON_HEADERS, OJSClient, get_expected_counts, issue_slug
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, '.ojs_cache')
+
+PAGE_SIZE = 100
+WORKERS = 4
+
+
+class OJSIndex:
+    """Issues e submissions do servidor, indexadas localmente."""
+
+    def __init__(self, client, cache_path=None, workers=WORKERS):
+        self.client = client
+        self.workers = workers
+        if cache_path is None:
+            host = urlparse(client.base_url).netloc.replace(':', '_')
+            cache_path = os.path.join(CACHE_DIR, f'index_{host}.json')
+        self.cache_path = cache_path
+        self.data = self._empty()
+        self.stats = {'requests': 0, 'mode': None, 'seconds': 0.0}
+        self.load()
+
+    def _empty(self):
+        return {
+            'base_url': self.client.base_url,
+            'updated_at': None,
+            'issues': {'etag': None, 'items': []},
+            'submissions': {'since': None, 'items': {}},
+        }
+
+    # --- Cache ---
+
+    def load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        with open(self.cache_path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('base_url') == self.client.base_url:
+            self.data = data
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = self.cache_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp, self.cache_path)
+
+    def invalidate(self):
+        self.data = self._empty()
+
+    # --- Busca paginada ---
+
+    def _get_page(self, path, params, offset, etag=None):
+        headers = dict(JSON_HEADERS)
+        if etag:
+            headers['If-None-Match'] = etag
+        resp = self.client.request(
+            'GET', path, headers=headers,
+            params={**params, 'count': PAGE_SIZE, 'offset': offset},
+        )
+        self.stats['requests'] += 1
+        if resp.status_code == 304:
+            return None, resp.headers.get('ETag')
+        if resp.status_code != 200:
+            raise RuntimeError(f'GET {path} offset={offset}: HTTP {resp.status_code}')
+        return resp.json(), resp.headers.get('ETag')
+
+    def _fetch_all(self, path, params, first=None):
+        """Busca todas as páginas: a primeira define itemsMax, o resto em paralelo."""
+        if first is None:
+            first, _ = self._get_page(path, params, 0)
+        items = list(first.get('items', []))
+        total = first.get('itemsMax', len(items))
+        offsets = range(PAGE_SIZE, total, PAGE_SIZE)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pages = pool.map(lambda off: self._get_page(path, params, off)[0], offsets)
+                for page in pages:
+                    items.extend(page.get('items', []))
+        return items, total
+
+    # --- Atualização ---
+
+    def refresh(self, full=False):
+        """Atualiza o índice (incremental, a menos que full=True). Salva o cache."""
+        t0 = time.monotonic()
+        if full:
+            self.invalidate()
+        started = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._refresh_issues()
+        self.stats['mode'] = self._refresh_submissions()
+        self.data['updated_at'] = started
+        self.save()
+        self.stats['seconds'] = time.monotonic() - t0
+        return self
+
+    def _refresh_issues(self):
+        cached = self.data['issues']
+        params = {}
+        first, etag = self._get_page('/api/v1/issues', params, 0, etag=cached['etag'])
+        if first is None:
+            return  # 304: lista de issues inalterada
+        items, _ = self._fetch_all('/api/v1/issues', params, first)
+        cached['items'] = [
+            {'id': iss['id'], 'slug': issue_slug(iss)}
+            for iss in items if issue_slug(iss)
+        ]
+        cached['etag'] = etag
+
+    def _refresh_submissions(self):
+        subs = self.data['submissions']
+        path = '/api/v1/submissions'
+        params = {'orderBy': 'lastModified', 'orderDirection': 'DESC'}
+
+        if subs['since']:
+            # Incremental: páginas mais recentes até alcançar o último timestamp
+            offset = 0
+            total = None
+            while True:
+                page, _ = self._get_page(path, params, offset)
+                total = page.get('itemsMax', 0)
+                page_items = page.get('items', [])
+                older = False
+                for item in page_items:
+                    if _last_modified(item) <= subs['since']:
+                        older = True
+                        break
+                    self._store_submission(item)
+                offset += PAGE_SIZE
+                if older or not page_items or offset >= total:
+                    break
+            if total == len(subs['items']):
+                self._update_since()
+                return 'incremental'
+
+        # Completo: sem cache ou houve deleções
+        items, _ = self._fetch_all(path, params)
+        subs['items'] = {}
+        for item in items:
+            self._store_submission(item)
+        self._update_since()
+        return 'completo'
+
+    def _store_submission(self, item):
+        issue_ids = {p.get('issueId') for p in item.get('publications', []) or []}
+        if item.get('issueId'):
+            issue_ids.add(item['issueId'])
+        issue_ids.discard(None)
+        self.data['submissions']['items'][str(item['id'])] = {
+            'issue_ids': sorted(issue_ids),
+            'last_modified': _last_modified(item),
+        }
+
+    def _update_since(self):
+        subs = self.data['submissions']
+        stamps = [s['last_modified'] for s in subs['items'].values() if s['last_modified']]
+        subs['since'] = max(stamps) if stamps else None
+
+    # --- Consultas ---
+
+    def issues_by_slug(self):
+        """{slug: [issue_id, ...]} (ids em ordem crescente)."""
+        by_slug = defaultdict(list)
+        for iss in self.data['issues']['items']:
+            by_slug[iss['slug']].append(iss['id'])
+        return {slug: sorted(ids) for slug, ids in by_slug.items()}
+
+    def counts_by_issue(self):
+        """{issue_id: nº de submissions}, como count_issue_articles().
+
+        Issues sem nenhuma submission indexada ficam de fora: vazias ou com
+        issueId ausente da listagem — só a contagem por issue distingue.
+        """
+        counts = defaultdict(int)
+        for sub in self.data['submissions']['items'].values():
+            for issue_id in sub['issue_ids']:
+                counts[issue_id] += 1
+        return dict(counts)
+
+    def slug_counts(self, slug):
+        """Lista [(issue_id, count), ...] das issues de um slug."""
+        counts = self.counts_by_issue()
+        return [(iid, counts.get(iid, 0)) for iid in self.issues_by_slug().get(slug, [])]
+
+
+def _last_modified(item):
+    return item.get('lastModified') or item.get('dateLastActivity') or ''
+
+
+def diff_report(index, expected):
+    """Compara contagens esperadas (banco) com o servidor, por slug.
+
+    Retorna lista de dicts {slug, expected, issues: [(id, count)], status}.
+    Status: OK, PARCIAL, VAZIA, DUPLICADA, FALTA (sem issue), EXTRA (não esperado).
+    """
+    counts = index.counts_by_issue()
+    by_slug = index.issues_by_slug()
+    rows = []
+    for slug in sorted(set(expected) | set(by_slug)):
+        exp = expected.get(slug)
+        issues = [(iid, counts.get(iid, 0)) for iid in by_slug.get(slug, [])]
+        if not issues:
+            status = 'FALTA'
+        elif exp is None:
+            status = 'EXTRA'
+        elif len(issues) > 1:
+            status = 'DUPLICADA'
+        elif issues[0][1] >= exp:
+            status = 'OK'
+        elif issues[0][1] == 0:
+            status = 'VAZIA'
+        else:
+            status = 'PARCIAL'
+        rows.append({'slug': slug, 'expected': exp, 'issues': issues, 'status': status})
+    return rows
+
+
+def print_diff_report(rows):
+    """Imprime o relatório esperado × servidor e o resumo por status."""
+    print(f'{"slug":<10} {"esperado":>8} {"servidor":>8}  {"status":<9} issues')
+    for r in rows:
+        server = sum(c for _, c in r['issues'])
+        exp = r['expected'] if r['expected'] is not None else '-'
+        ids = ', '.join(f'{iid} ({c})' for iid, c in r['issues'])
+        print(f'{r["slug"]:<10} {exp:>8} {server:>8}  {r["status"]:<9} {ids}')
+
+    totals = defaultdict(int)
+    for r in rows:
+        totals[r['status']] += 1
+    print('\n--- Resumo ---')
+    for status in ('OK', 'PARCIAL', 'VAZIA', 'DUPLICADA', 'FALTA', 'EXTRA'):
+        if totals[status]:
+            print(f'{status}: {totals[status]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índice local OJS: esperado × servidor')
+    parser.add_argument('--env', choices=['test', 'prod'], default='test')
+    parser.add_argument('--full', action='store_true', help='Ignora o cache e relista tudo')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'Requisições paralelas (default: {WORKERS})')
+    args = parser.parse_args()
+
+    env = ENVS[args.env]
+    db_path = os.path.join(BASE_DIR, 'anais.db')
+    if not os.path.exists(db_path):
+        print(f'Banco não encontrado: {db_path}')
+        sys.exit(1)
+    expected = get_expected_counts(db_path)
+
+    client = OJSClient.from_env(env, pool_size=args.workers)
+    index = OJSIndex(client, workers=args.workers).refresh(full=args.full)
+    st = index.stats
+    print(f'Índice: {len(index.data["issues"]["items"])} issues, '
+          f'{len(index.data["submissions"]["items"])} submissions '
+          f'({st["mode"]}, {st["requests"]} requisições, {st["seconds"]:.1f}s)\n')
+    print_diff_report(diff_report(index, expected))
+    client.print_metrics()
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Busca textual ranqueada no anais.db (tabela FTS5 articles_fts).
+
+A tabela é criada pela migração 6 de anais_db.py e mantida por triggers em
+articles: título, subtítulo, resumos (pt/en/es), palavras-chave (pt/en/es)
+e referências, sem distinção de acentos e maiúsculas ("habitacao" acha
+"Habitação"). O ranking é o bm25 do FTS5, com pesos por coluna (WEIGHTS).
+
+Consulta:
+    termos soltos      todos precisam aparecer (AND), em qualquer campo
+    prefixo*           casa qualquer termo que comece com o prefixo
+    --phrase           os termos como frase exata
+    --raw              sintaxe FTS5 completa (OR, NOT, NEAR, "frase", coluna:)
+
+Uso:
+    python3 scripts/search_articles.py habitação social
+    python3 scripts/search_articles.py --field title --slug sdbr12 brutal*
+    python3 scripts/search_articles.py --phrase minha casa minha vida
+    python3 scripts/search_articles.py --raw 'niemeyer NOT brasilia'
+    python3 scripts/search_articles.py --similar sdbr05-041
+    python3 scripts/search_articles.py --rebuild
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import anais_db
+from text_terms import tokenize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'anais.db')
+
+# Peso de cada coluna no bm25, na ordem de anais_db.FTS_COLUMNS
+WEIGHTS = {
+    'title': 10.0,
+    'subtitle': 5.0,
+    'abstract': 3.0,
+    'abstract_en': 3.0,
+    'abstract_es': 3.0,
+    'keywords': 5.0,
+    'keywords_en': 5.0,
+    'keywords_es': 5.0,
+    'references_': 1.0,
+}
+
+# --field → colunas FTS
+FIELDS = {
+    'title': ('title', 'subtitle'),
+    'abstract': ('abstract', 'abstract_en', 'abstract_es'),
+    'keywords': ('keywords', 'keywords_en', 'keywords_es'),
+    'refs': ('references_',),
+}
+
+SNIPPET_TOKENS = 12
+SIMILAR_TERMS = 12
+
+
+def quote_terms(text):
+    """Termos do usuário como strings FTS5 (sem operadores); 'x*' vira prefixo."""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def similar_query(conn, article_id):
+    """Consulta OR com os termos do título/subtítulo e palavras-chave do artigo.
+
+    Procura fora das referências, onde citar a mesma obra não indica artigo
+    parecido.
+    """
+    row = conn.execute('SELECT title, subtitle, keywords FROM articles WHERE id = ?',
+                       (article_id,)).fetchone()
+    if row is None:
+        return None
+    terms = []
+    for term in tokenize(' '.join(value or '' for value in row)):
+        if len(term) > 2 and term not in terms:
+            terms.append(term)
+    columns = ' '.join(FIELDS['title'] + FIELDS['abstract'] + FIELDS['keywords'])
+    return f"{{{columns}}} : (" + ' OR '.join(f'"{term}"' for term in terms[:SIMILAR_TERMS]) + ')'
+
+
+def search(conn, query, field=None, slug=None, limit=20, exclude=None):
+    """Artigos que casam com query (sintaxe FTS5), do mais ao menos relevante.
+
+    Retorna [(id, título, trecho, score)]; score é o bm25 (menor = melhor).
+    """
+    if field:
+        query = f"{{{' '.join(FIELDS[field])}}} : ({query})"
+    weights = ', '.join(str(WEIGHTS[col]) for col in anais_db.FTS_COLUMNS)
+    # Coluna -1: o snippet() escolhe a coluna com mais termos encontrados
+    sql = f'''
+        SELECT a.id, a.title,
+               snippet({anais_db.FTS_TABLE}, -1, '[', ']', '…', {SNIPPET_TOKENS}),
+               bm25({anais_db.FTS_TABLE}, {weights}) AS score
+        FROM {anais_db.FTS_TABLE} f
+        JOIN articles a ON a.rowid = f.rowid
+        WHERE {anais_db.FTS_TABLE} MATCH ?
+    '''
+    params = [query]
+    if slug:
+        sql += ' AND a.seminar_slug = ?'
+        params.append(slug)
+    if exclude:
+        sql += ' AND a.id != ?'
+        params.append(exclude)
+    sql += ' ORDER BY score LIMIT ?'
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Busca textual ranqueada nos artigos do anais.db')
+    parser.add_argument('terms', nargs='*', help='Termos da busca')
+    parser.add_argument('--limit', type=int, default=20, help='Máximo de resultados (default: 20)')
+    parser.add_argument('--field', choices=sorted(FIELDS), help='Buscar só neste campo')
+    parser.add_argument('--slug', help='Apenas artigos deste seminário')
+    parser.add_argument('--phrase', action='store_true', help='Termos como frase exata')
+    parser.add_argument('--raw', action='store_true', help='Consulta em sintaxe FTS5, sem tratamento')
+    parser.add_argument('--similar', metavar='ID',
+                        help='Artigos com título/palavras-chave parecidos com os deste (revisão de duplicatas)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Reconstrói o índice (e triggers ausentes) a partir de articles')
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f'Banco não encontrado: {DB_PATH}')
+        sys.exit(1)
+
+    if args.rebuild:
+        conn = anais_db.connect(DB_PATH)
+        t0 = time.monotonic()
+        anais_db.rebuild_fts(conn)
+        conn.commit()
+        conn.close()
+        print(f'Índice de busca reconstruído em {time.monotonic() - t0:.2f}s')
+        return
+
+    conn = anais_db.connect_readonly(DB_PATH)
+    missing = anais_db.missing_fts(conn)
+    if missing:
+        print(f"AVISO: busca textual incompleta ({', '.join(missing)}); o índice pode estar "
+              f"desatualizado — rode com --rebuild")
+        if anais_db.FTS_TABLE in missing:
+            sys.exit(1)
+    text = ' '.join(args.terms)
+    if args.similar:
+        query = similar_query(conn, args.similar)
+        if query is None:
+            print(f'Artigo não encontrado: {args.similar}')
+            sys.exit(1)
+    elif not text:
+        parser.error('informe os termos da busca (ou --similar ID / --rebuild)')
+    elif args.raw:
+        query = text
+    elif args.phrase:
+        query = '"{}"'.format(text.replace('"', ''))
+    else:
+        query = quote_terms(text)
+
+    t0 = time.monotonic()
+    try:
+        rows = search(conn, query, field=args.field, slug=args.slug,
+                      limit=args.limit, exclude=args.similar)
+    except sqlite3.OperationalError as e:
+        print(f'Consulta inválida ({query}): {e}')
+        sys.exit(1)
+    elapsed_ms = (time.monotonic() - t0) * 1000
+    conn.close()
+
+    for art_id, title, snippet, score in rows:
+        print(f'{art_id:14s} {-score:6.1f}  {title}')
+        if snippet and snippet != title:
+            print(f"{'':22s}{' '.join(snippet.split())}")
+    print(f'\n{len(rows)} resultado(s) em {elapsed_ms:.1f} ms  [{query}]')
+
+
+if __name__ == '__main__':
+    main()
@@ -29,9 +29,10 @@ import argparse
 import json
 import os
 import re
-import sqlite3
 import sys
 
+import anais_db
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'anais.db')
 
@@ -507,7 +508,7 @@ def main():
         print("Erro: especifique --dry-run ou --apply", file=sys.stderr)
         sys.exit(1)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = anais_db.connect(DB_PATH)
     cur = conn.cursor()
 
     where_clauses = ["references_ IS NOT NULL", "references_ != ''", "references_ != '[]'"]
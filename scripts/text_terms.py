@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Termos normalizados de texto livre, compartilhados pelas buscas.
+
+Usado pelo índice estático do site (build_search_index.py), pela busca
+--similar (search_articles.py) e pelos shingles de check_duplicates.py:
+minúsculas, sem acento ("Habitação" → habitacao), sem stopwords pt/en/es
+e sem termos de 1 caractere.
+"""
+
+import re
+import unicodedata
+
+STOPWORDS = set('''
+a ao aos as com como da das de do dos e em entre na nas no nos num numa o os
+ou para pela pelas pelo pelos por que se sem sob sobre um uma umas uns
+the of and in on for to from with by at an is are
+el la los las del y con para por en un una
+'''.split())
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def strip_accents(s):
+    nfkd = unicodedata.normalize('NFKD', s)
+    return ''.join(c for c in nfkd if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Termos indexáveis de um texto (minúsculos, sem acento, sem stopwords)."""
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(strip_accents(text).lower())
+            if len(t) > 1 and t not in STOPWORDS]
@@ -14,18 +14,33 @@ Uso:
     # Dry run (mostra metadados sem enviar)
     python3 scripts/upload_zenodo.py --dry-run --seminar sdnne08
 
+    # Contra a API falsa local (ver scripts/zenodo_fake.py)
+    python3 scripts/upload_zenodo.py --base-url http://127.0.0.1:8765 --token x --seminar sdnne08
+
+Os artigos passam por create → upload PDF → publish → aceitar comunidade em
+paralelo (--workers), sob um limite global de requisições (--rate). Cada
+etapa concluída é gravada na tabela zenodo_ledger (deposition id, bucket,
+DOI); ao rodar de novo, artigos interrompidos retomam da etapa pendente sem
+criar depositions duplicadas. Só os DOIs da produção (ZENODO_URL) vão para
+articles.doi; os do sandbox e da API falsa ficam apenas no ledger.
+
 Requer: requests (pip install requests)
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sqlite3
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 
+import anais_db
+
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'anais.db')
 PDF_BASE = os.path.join(os.path.dirname(__file__), '..')
 
@@ -38,6 +53,11 @@ LOCALE_TO_ISO639 = {
     'en': 'eng',
 }
 
+DEFAULT_WORKERS = 3  # artigos em andamento simultaneamente
+DEFAULT_RATE = 1.5   # requisições por segundo (todas as threads)
+UPLOAD_RETRIES = 3   # tentativas por arquivo (erro HTTP ou checksum divergente)
+CHUNK_SIZE = 1024 * 1024
+
 # Community identifier (must exist on the target Zenodo instance)
 COMMUNITY_ID = 'docomomobr'
 
@@ -53,7 +73,7 @@ SLUG_TO_AMBITO = {
 
 
 def get_db():
-    db = sqlite3.connect(DB_PATH)
+    db = anais_db.connect(DB_PATH)
     db.row_factory = sqlite3.Row
     return db
 
@@ -211,109 +231,316 @@ def build_metadata(article, authors, seminar_slug):
     return metadata
 
 
-def _accept_community_request(session, base_url, token, record_id):
-    """Auto-accept pending community-inclusion request for a record."""
-    headers = {'Authorization': f'Bearer {token}'}
-    r = session.get(
-        f'{base_url}/api/requests/',
-        headers=headers,
-        params={'sort': 'newest', 'size': 50, 'q': 'type:community-inclusion AND status:submitted'},
-    )
-    if r.status_code != 200:
-        return
-    for req in r.json().get('hits', {}).get('hits', []):
-        topic = req.get('topic', {})
-        if topic.get('record') == str(record_id):
-            accept_url = req.get('links', {}).get('actions', {}).get('accept')
-            if accept_url:
-                r2 = session.post(accept_url, headers={**headers, 'Content-Type': 'application/json'}, json={})
-                if r2.status_code == 200:
-                    print(f"  Community: aceito")
-                else:
-                    print(f"  Community: erro ao aceitar ({r2.status_code})")
-            return
-    print(f"  Community: request não encontrado")
-
-
-def upload_article(session, base_url, token, article, authors, seminar_slug, dry_run=False):
-    """Upload a single article to Zenodo. Returns (doi, deposition_id) or (None, None)."""
-    article_id = article['id']
-    metadata = build_metadata(article, authors, seminar_slug)
+class ZenodoError(RuntimeError):
+    """Resposta inesperada da API de depósito."""
 
-    if dry_run:
-        print(f"\n{'='*60}")
-        print(f"[DRY RUN] {article_id}: {metadata['title'][:80]}")
-        print(f"  Creators: {', '.join(c['name'] for c in metadata['creators'])}")
-        print(f"  Language: {metadata['language']}")
-        print(f"  Keywords: {metadata.get('keywords', [])}")
-        if 'contributors' in metadata:
-            print(f"  Editors: {', '.join(c['name'] for c in metadata['contributors'])}")
-        pdf = find_pdf(article)
-        print(f"  PDF: {pdf or 'NÃO ENCONTRADO'}")
-        return None, None
 
-    headers = {'Authorization': f'Bearer {token}'}
+class MD5Reader:
+    """Envolve um arquivo aberto: entrega blocos ao requests e acumula o MD5.
 
-    # 1. Create empty deposition
-    r = session.post(
-        f'{base_url}/api/deposit/depositions',
-        headers={**headers, 'Content-Type': 'application/json'},
-        json={},
-    )
-    if r.status_code != 201:
-        print(f"  ERRO ao criar deposition: {r.status_code} {r.text[:200]}")
-        return None, None
+    Tem __len__ (Content-Length conhecido) e read() limitado a CHUNK_SIZE,
+    então nunca há mais que um bloco do PDF em memória.
+    """
 
-    depo = r.json()
-    depo_id = depo['id']
-    bucket_url = depo['links']['bucket']
+    def __init__(self, f, size):
+        self._f = f
+        self._size = size
+        self._md5 = hashlib.md5()
 
-    # 2. Upload PDF (obrigatório — artigos sem PDF devem ser filtrados antes)
-    pdf_path = find_pdf(article)
-    if not pdf_path:
-        print(f"  ERRO: PDF não encontrado para {article_id}")
-        return None, None
-    else:
+    def __len__(self):
+        return self._size
+
+    def read(self, n=-1):
+        if n is None or n < 0 or n > CHUNK_SIZE:
+            n = CHUNK_SIZE
+        chunk = self._f.read(n)
+        self._md5.update(chunk)
+        return chunk
+
+    def hexdigest(self):
+        return self._md5.hexdigest()
+
+
+def md5_file(path):
+    """MD5 de um arquivo, lido em blocos."""
+    h = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_md5(entry):
+    """MD5 de um arquivo como a API o descreve ('md5:...' no bucket, hex na deposition)."""
+    checksum = entry.get('checksum') or ''
+    return checksum.split(':', 1)[1] if checksum.startswith('md5:') else checksum or None
+
+
+def uploaded_file_matches(files, pdf_path):
+    """True se a deposition já tem este PDF (mesmo nome, tamanho e MD5)."""
+    filename = os.path.basename(pdf_path)
+    size = os.path.getsize(pdf_path)
+    for entry in files or []:
+        if (entry.get('key') or entry.get('filename')) != filename:
+            continue
+        if (entry.get('size') or entry.get('filesize')) != size:
+            return False
+        return _file_md5(entry) == md5_file(pdf_path)
+    return False
+
+
+class RateLimiter:
+    """Intervalo mínimo entre requisições, compartilhado entre threads."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DepositAPI:
+    """Chamadas à API de depósito do Zenodo (uma requests.Session por thread)."""
+
+    def __init__(self, base_url, token, rate=DEFAULT_RATE):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.limiter = RateLimiter(rate)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def call(self, method, url, expect, **kwargs):
+        if not url.startswith('http'):
+            url = f'{self.base_url}{url}'
+        headers = {**self.headers, **kwargs.pop('headers', {})}
+        self.limiter.wait()
+        r = self.session.request(method, url, headers=headers, timeout=kwargs.pop('timeout', 120),
+                                 **kwargs)
+        if r.status_code not in expect:
+            raise ZenodoError(f'{method} {url}: {r.status_code} {r.text[:200]}')
+        return r.json() if r.content else {}
+
+    def create(self, metadata):
+        return self.call('POST', '/api/deposit/depositions', (201,),
+                         headers={'Content-Type': 'application/json'},
+                         json={'metadata': metadata})
+
+    def get(self, depo_id):
+        return self.call('GET', f'/api/deposit/depositions/{depo_id}', (200,))
+
+    def find_draft(self, title):
+        """Procura um rascunho com o título dado (recuperação após falha no create)."""
+        page = 1
+        while True:
+            drafts = self.call('GET', '/api/deposit/depositions', (200,),
+                               params={'status': 'draft', 'size': 100, 'page': page})
+            for depo in drafts:
+                if depo.get('metadata', {}).get('title') == title:
+                    return depo
+            if len(drafts) < 100:
+                return None
+            page += 1
+
+    def upload(self, bucket_url, pdf_path, retries=UPLOAD_RETRIES):
+        """PUT do arquivo no bucket, em streaming, conferindo o MD5 devolvido.
+
+        Só este arquivo é reenviado em caso de erro ou checksum divergente.
+        """
         filename = os.path.basename(pdf_path)
-        with open(pdf_path, 'rb') as f:
-            r = session.put(
-                f'{bucket_url}/{filename}',
-                headers=headers,
-                data=f,
-            )
-        if r.status_code not in (200, 201):
-            print(f"  ERRO upload PDF: {r.status_code} {r.text[:200]}")
-            return None, None
-
-    # 3. Set metadata
-    r = session.put(
-        f'{base_url}/api/deposit/depositions/{depo_id}',
-        headers={**headers, 'Content-Type': 'application/json'},
-        json={'metadata': metadata},
-    )
-    if r.status_code != 200:
-        print(f"  ERRO ao definir metadados: {r.status_code} {r.text[:300]}")
-        return None, None
+        size = os.path.getsize(pdf_path)
+        error = None
+        for attempt in range(1, retries + 1):
+            with open(pdf_path, 'rb') as f:
+                reader = MD5Reader(f, size)
+                try:
+                    result = self.call('PUT', f'{bucket_url}/{filename}', (200, 201),
+                                       data=reader, timeout=600)
+                except (ZenodoError, requests.RequestException) as e:
+                    error = e
+                    continue
+            local_md5 = reader.hexdigest()
+            remote_md5 = _file_md5(result)
+            if remote_md5 == local_md5 and result.get('size', size) == size:
+                return result
+            error = ZenodoError(f'{filename}: checksum divergente (local {local_md5}, '
+                                f'Zenodo {remote_md5}), tentativa {attempt}/{retries}')
+        raise error
+
+    def publish(self, depo_id):
+        return self.call('POST', f'/api/deposit/depositions/{depo_id}/actions/publish', (202,))
+
+    def accept_community_request(self, record_id):
+        """Auto-accept pending community-inclusion request for a record.
+
+        Returns True if accepted, False if the request was not found.
+        """
+        data = self.call('GET', '/api/requests/', (200,), params={
+            'sort': 'newest', 'size': 50,
+            'q': 'type:community-inclusion AND status:submitted',
+        })
+        for req in data.get('hits', {}).get('hits', []):
+            if req.get('topic', {}).get('record') == str(record_id):
+                accept_url = req.get('links', {}).get('actions', {}).get('accept')
+                if accept_url:
+                    self.call('POST', accept_url, (200,),
+                              headers={'Content-Type': 'application/json'}, json={})
+                    return True
+        return False
+
+
+# Ordem das etapas registradas no ledger
+STAGES = ('creating', 'created', 'uploaded', 'published', 'accepted')
+
+
+class Ledger:
+    """Progresso por artigo na tabela zenodo_ledger (um registro por instância Zenodo).
+
+    Cada etapa concluída é gravada (com commit) antes da próxima, então uma
+    execução interrompida retoma do ponto em que parou.
+    """
 
-    # 4. Publish
-    r = session.post(
-        f'{base_url}/api/deposit/depositions/{depo_id}/actions/publish',
-        headers=headers,
-    )
-    if r.status_code != 202:
-        print(f"  ERRO ao publicar: {r.status_code} {r.text[:300]}")
-        return None, None
+    def __init__(self, db_path, base_url):
+        self.base_url = base_url
+        # DOIs de sandbox/API falsa (10.5072/...) não podem chegar a articles.doi,
+        # que o --skip-existing e os exportadores tratam como publicado
+        self.production = base_url.rstrip('/') == ZENODO_URL
+        # zenodo_ledger vem das migrações (anais_db.py)
+        self.conn = anais_db.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+    def get(self, article_id):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT * FROM zenodo_ledger WHERE base_url = ? AND article_id = ?',
+                (self.base_url, article_id)).fetchone()
+        return dict(row) if row else {}
+
+    def set(self, article_id, **fields):
+        fields.setdefault('error', None)
+        fields['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO zenodo_ledger (base_url, article_id, stage) VALUES (?, ?, ?)',
+                (self.base_url, article_id, fields.get('stage', 'creating')))
+            cols = ', '.join(f'{k} = ?' for k in fields)
+            self.conn.execute(
+                f'UPDATE zenodo_ledger SET {cols} WHERE base_url = ? AND article_id = ?',
+                (*fields.values(), self.base_url, article_id))
+            if fields.get('doi') and self.production:
+                self.conn.execute('UPDATE articles SET doi = ? WHERE id = ?',
+                                  (fields['doi'], article_id))
+            self.conn.commit()
+
+    def fail(self, article_id, error):
+        with self._lock:
+            self.conn.execute(
+                'UPDATE zenodo_ledger SET error = ?, updated_at = ? '
+                'WHERE base_url = ? AND article_id = ?',
+                (str(error)[:500], time.strftime('%Y-%m-%d %H:%M:%S'),
+                 self.base_url, article_id))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def _published_fields(result):
+    return {
+        'doi': result.get('doi', result.get('metadata', {}).get('doi')),
+        'record_id': result.get('record_id', result.get('id')),
+    }
 
-    result = r.json()
-    doi = result.get('doi', result.get('metadata', {}).get('doi'))
-    record_id = result.get('record_id', result.get('id'))
-    print(f"  DOI: {doi}")
 
-    # 5. Auto-accept community inclusion request (owner of community)
-    if record_id:
-        _accept_community_request(session, base_url, token, record_id)
+def print_dry_run(article, metadata):
+    print(f"\n{'='*60}")
+    print(f"[DRY RUN] {article['id']}: {metadata['title'][:80]}")
+    print(f"  Creators: {', '.join(c['name'] for c in metadata['creators'])}")
+    print(f"  Language: {metadata['language']}")
+    print(f"  Keywords: {metadata.get('keywords', [])}")
+    if 'contributors' in metadata:
+        print(f"  Editors: {', '.join(c['name'] for c in metadata['contributors'])}")
+    pdf = find_pdf(article)
+    print(f"  PDF: {pdf or 'NÃO ENCONTRADO'}")
+
+
+def upload_article(api, ledger, article, authors, seminar_slug):
+    """Leva um artigo até a última etapa, retomando do ledger. Retorna o DOI.
+
+    Etapas: create (com metadados) → upload PDF (streaming, MD5 conferido)
+    → publish → aceitar na comunidade.
+    Uma deposition só é criada se o ledger não tiver uma; se a execução anterior
+    caiu durante o create, o rascunho é procurado pelo título antes de criar outro.
+    """
+    article_id = article['id']
+    metadata = build_metadata(article, authors, seminar_slug)
+    entry = ledger.get(article_id)
+    stage = entry.get('stage')
+    depo = {}
+
+    def log(msg):
+        print(f'  {article_id}: {msg}', flush=True)
+
+    # 1. Create (com metadados — o título permite achar o rascunho após uma queda)
+    if stage in (None, 'creating'):
+        depo = api.find_draft(metadata['title']) if stage == 'creating' else None
+        if depo:
+            log(f'rascunho {depo["id"]} recuperado')
+        else:
+            ledger.set(article_id, stage='creating')
+            depo = api.create(metadata)
+        entry = {'deposition_id': depo['id'], 'bucket_url': depo['links']['bucket']}
+        ledger.set(article_id, stage='created', **entry)
+        stage = 'created'
+    elif stage in ('created', 'uploaded'):
+        # A execução anterior pode ter publicado sem registrar
+        depo = api.get(entry['deposition_id'])
+        if depo.get('submitted'):
+            ledger.set(article_id, stage='published', **_published_fields(depo))
+            stage = 'published'
+            entry = ledger.get(article_id)
 
-    return doi, depo_id
+    # 2. Upload PDF (obrigatório — artigos sem PDF devem ser filtrados antes)
+    if stage == 'created':
+        pdf_path = find_pdf(article)
+        if not pdf_path:
+            raise ZenodoError(f'PDF não encontrado para {article_id}')
+        if uploaded_file_matches(depo.get('files'), pdf_path):
+            log('PDF já está no bucket (MD5 confere)')
+        else:
+            api.upload(entry['bucket_url'], pdf_path)
+        ledger.set(article_id, stage='uploaded')
+        stage = 'uploaded'
+
+    # 3. Publish
+    if stage == 'uploaded':
+        result = api.publish(entry['deposition_id'])
+        ledger.set(article_id, stage='published', **_published_fields(result))
+        stage = 'published'
+        entry = ledger.get(article_id)
+        log(f"DOI {entry['doi']}")
+
+    # 4. Auto-accept community inclusion request (owner of community)
+    if stage == 'published':
+        if entry.get('record_id') and api.accept_community_request(entry['record_id']):
+            log('community: aceito')
+        else:
+            log('community: request não encontrado')
+        ledger.set(article_id, stage='accepted')
+
+    return ledger.get(article_id).get('doi')
 
 
 def find_volume_pdf(seminar_slug):
@@ -342,7 +569,7 @@ def find_volume_pdf(seminar_slug):
     return None
 
 
-def upload_volume(session, base_url, token, seminar_slug, dry_run=False):
+def upload_volume(api, seminar_slug, dry_run=False):
     """Upload the complete volume PDF as a Zenodo proceedings record."""
     db = get_db()
     sem = db.execute('SELECT * FROM seminars WHERE slug = ?', (seminar_slug,)).fetchone()
@@ -409,55 +636,26 @@ def upload_volume(session, base_url, token, seminar_slug, dry_run=False):
         print(f"  PDF não encontrado: {sem['volume_pdf']}")
         return None, None
 
-    headers = {'Authorization': f'Bearer {token}'}
-
-    # 1. Create deposition
-    r = session.post(
-        f'{base_url}/api/deposit/depositions',
-        headers={**headers, 'Content-Type': 'application/json'},
-        json={},
-    )
-    if r.status_code != 201:
-        print(f"  ERRO ao criar deposition: {r.status_code}")
-        return None, None
-    depo = r.json()
-    depo_id = depo['id']
-    bucket_url = depo['links']['bucket']
+    try:
+        # 1. Create deposition (com metadados)
+        depo = api.create(metadata)
+        depo_id = depo['id']
 
-    # 2. Upload PDF
-    filename = os.path.basename(pdf_path)
-    size_mb = os.path.getsize(pdf_path) / 1024 / 1024
-    print(f"  Uploading {filename} ({size_mb:.1f} MB)...")
-    with open(pdf_path, 'rb') as f:
-        r = session.put(
-            f'{bucket_url}/{filename}',
-            headers=headers,
-            data=f,
-        )
-    if r.status_code not in (200, 201):
-        print(f"  ERRO upload: {r.status_code}")
-        return None, None
-
-    # 3. Set metadata
-    r = session.put(
-        f'{base_url}/api/deposit/depositions/{depo_id}',
-        headers={**headers, 'Content-Type': 'application/json'},
-        json={'metadata': metadata},
-    )
-    if r.status_code != 200:
-        print(f"  ERRO metadados: {r.status_code} {r.text[:200]}")
-        return None, None
-
-    # 4. Publish
-    r = session.post(
-        f'{base_url}/api/deposit/depositions/{depo_id}/actions/publish',
-        headers=headers,
-    )
-    if r.status_code != 202:
-        print(f"  ERRO publicar: {r.status_code}")
+        # 2. Upload PDF (streaming, MD5 conferido; só o arquivo é reenviado)
+        filename = os.path.basename(pdf_path)
+        size_mb = os.path.getsize(pdf_path) / 1024 / 1024
+        print(f"  Uploading {filename} ({size_mb:.1f} MB)...")
+        t0 = time.monotonic()
+        uploaded = api.upload(depo['links']['bucket'], pdf_path)
+        elapsed = time.monotonic() - t0
+        print(f"  MD5 OK ({_file_md5(uploaded)}), {size_mb / elapsed if elapsed else 0:.1f} MB/s")
+
+        # 3. Publish
+        result = api.publish(depo_id)
+    except (ZenodoError, requests.RequestException) as e:
+        print(f"  ERRO: {e}")
         return None, None
 
-    result = r.json()
     doi = result.get('doi', result.get('metadata', {}).get('doi'))
     print(f"  DOI: {doi}")
     return doi, depo_id
@@ -474,9 +672,15 @@ def main():
                         help='Pular artigos que já têm DOI (padrão: sim)')
     parser.add_argument('--upload-volume', action='store_true',
                         help='Upload do PDF da edição completa (em vez de artigos individuais)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Artigos processados em paralelo (padrão: {DEFAULT_WORKERS})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Limite de requisições por segundo (padrão: {DEFAULT_RATE})')
+    parser.add_argument('--base-url',
+                        help='URL da API (ex: http://127.0.0.1:8765 para o zenodo_fake.py)')
     args = parser.parse_args()
 
-    base_url = SANDBOX_URL if args.sandbox else ZENODO_URL
+    base_url = args.base_url or (SANDBOX_URL if args.sandbox else ZENODO_URL)
     env_var = 'ZENODO_SANDBOX_TOKEN' if args.sandbox else 'ZENODO_TOKEN'
     token = args.token or os.environ.get(env_var)
 
@@ -486,8 +690,8 @@ def main():
 
     # Modo volume: upload da edição completa
     if args.upload_volume:
-        session = requests.Session()
-        doi, depo_id = upload_volume(session, base_url, token, args.seminar, args.dry_run)
+        api = DepositAPI(base_url, token, args.rate)
+        doi, depo_id = upload_volume(api, args.seminar, args.dry_run)
         if doi:
             print(f"\nVolume publicado: DOI {doi}")
         return
@@ -505,12 +709,9 @@ def main():
     print(f"Artigos: {len(articles)}")
     print()
 
-    session = requests.Session()
-    uploaded = 0
+    ledger = None if args.dry_run else Ledger(DB_PATH, base_url)
     skipped = 0
-    errors = 0
-    current = 0
-    results = []
+    jobs = []
 
     for art in articles:
         article_id = art['id']
@@ -521,7 +722,13 @@ def main():
             skipped += 1
             continue
 
-        if args.skip_existing and art['doi'] and not args.dry_run:
+        # Depositions em andamento no ledger são sempre retomadas
+        stage = ledger.get(article_id).get('stage') if ledger else None
+        if stage == 'accepted':
+            print(f"[SKIP] {article_id}: já publicado (ledger)")
+            skipped += 1
+            continue
+        if args.skip_existing and art['doi'] and not args.dry_run and not stage:
             print(f"[SKIP] {article_id}: já tem DOI {art['doi']}")
             skipped += 1
             continue
@@ -532,28 +739,51 @@ def main():
             skipped += 1
             continue
 
-        current += 1
-        print(f"[{current}/{len(articles)}] {article_id}: {art['title'][:60]}...")
-
-        doi, depo_id = upload_article(session, base_url, token, art, authors, args.seminar, args.dry_run)
-
         if args.dry_run:
+            print_dry_run(art, build_metadata(art, authors, args.seminar))
             continue
+        if stage:
+            print(f"[RESUME] {article_id}: etapa '{stage}'")
+        jobs.append((art, authors))
 
-        if doi:
-            # Save DOI to database
-            db.execute('UPDATE articles SET doi = ? WHERE id = ?', (doi, article_id))
-            db.commit()
-            uploaded += 1
-            results.append({'id': article_id, 'doi': doi, 'deposition_id': depo_id})
-        else:
-            errors += 1
+    db.close()
+    if args.dry_run:
+        return
 
-        # Rate limiting
-        time.sleep(1.5)
+    print(f"\n{len(jobs)} artigos para enviar ({args.workers} em paralelo, "
+          f"{args.rate} req/s)\n")
+    api = DepositAPI(base_url, token, rate=args.rate)
+    uploaded = 0
+    errors = 0
+    results = []
+    t0 = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(upload_article, api, ledger, art, authors, args.seminar): art['id']
+            for art, authors in jobs
+        }
+        for n, future in enumerate(as_completed(futures), 1):
+            article_id = futures[future]
+            try:
+                doi = future.result()
+            except Exception as e:
+                ledger.fail(article_id, e)
+                print(f"[{n}/{len(jobs)}] {article_id}: ERRO {e}")
+                errors += 1
+                continue
+            entry = ledger.get(article_id)
+            print(f"[{n}/{len(jobs)}] {article_id}: OK ({doi})")
+            uploaded += 1
+            results.append({'id': article_id, 'doi': doi,
+                            'deposition_id': entry.get('deposition_id')})
 
+    ledger.close()
     print(f"\n{'='*60}")
-    print(f"Resultado: {uploaded} enviados, {skipped} pulados, {errors} erros")
+    print(f"Resultado: {uploaded} enviados, {skipped} pulados, {errors} erros "
+          f"({time.monotonic() - t0:.0f}s)")
+    if errors:
+        print("Rode novamente para retomar as etapas pendentes (ledger zenodo_ledger).")
 
     if results:
         # Save results log
@@ -562,8 +792,5 @@ def main():
             json.dump(results, f, indent=2, ensure_ascii=False)
         print(f"Log salvo em: {log_path}")
 
-    db.close()
-
-
 if __name__ == '__main__':
     main()
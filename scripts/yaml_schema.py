@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Adaptador dos YAMLs de seminário para registros canônicos, validados
+contra schema/seminario.yaml e schema/artigo.yaml.
+
+Os YAMLs de seminário existem em três formatos:
+1. {issue: {...}, articles: [...]}  — maioria
+2. {slug, evento, publicacao, artigos: [...]}  — sdnne02, sdnne05
+3. {slug, title, year, articles: [...]}  — sdsul06-08 (sem wrapper issue)
+
+adapt() converte qualquer um deles num registro único: seminário, seções e
+artigos (com autores), com os nomes de campo do banco. Os nomes em
+português do schema (titulo, resumo, palavras_chave...) valem como
+sinônimos.
+
+validate() confere esse registro contra os schemas. Os validadores são
+montados uma vez por processo a partir dos exemplos: o tipo de cada campo é
+o tipo do valor de exemplo (null = livre) e os obrigatórios vêm da linha
+"Campos obrigatórios:" do cabeçalho. Todos os problemas do arquivo saem
+numa passada: erros (campo obrigatório ausente, tipo errado, id repetido)
+impedem a importação; avisos (formato de ORCID, locale, país, e-mail) só
+são mostrados.
+"""
+
+import datetime
+import functools
+import os
+import re
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCHEMA_DIR = os.path.join(BASE, 'schema')
+
+# Campo canônico -> nomes aceitos no YAML (vale o primeiro não nulo)
+SEMINAR_FIELDS = {
+    'slug': ('slug',),
+    'title': ('title', 'titulo'),
+    'subtitle': ('subtitle', 'subtitulo'),
+    'year': ('year', 'ano'),
+    'volume': ('volume',),
+    'number': ('number', 'numero'),
+    'date_published': ('date_published', 'data_publicacao'),
+    'isbn': ('isbn',),
+    'doi': ('doi',),
+    'description': ('description', 'descricao'),
+    'location': ('location',),
+    'publisher': ('publisher',),
+    'source': ('source',),
+    'editors': ('editors', 'editores'),
+    'volume_pdf': ('volume_pdf',),
+    'related_urls': ('related_urls',),
+}
+
+SECTION_FIELDS = {
+    'title': ('title', 'titulo'),
+    'abbrev': ('abbrev',),
+    'hide_title': ('hide_title',),
+}
+
+ARTICLE_FIELDS = {
+    'id': ('id',),
+    'seminar': ('seminar', 'seminario'),
+    'title': ('title', 'titulo'),
+    'subtitle': ('subtitle', 'subtitulo'),
+    'section': ('section', 'secao'),
+    'locale': ('locale',),
+    'pages': ('pages', 'paginas'),
+    'pages_count': ('pages_count', 'paginas_total'),
+    'file': ('file', 'arquivo_pdf'),
+    'abstract': ('abstract', 'resumo'),
+    'abstract_en': ('abstract_en', 'resumo_en'),
+    'abstract_es': ('abstract_es', 'resumo_es'),
+    'keywords': ('keywords', 'palavras_chave'),
+    'keywords_en': ('keywords_en', 'palavras_chave_en'),
+    'keywords_es': ('keywords_es', 'palavras_chave_es'),
+    'references': ('references', 'referencias'),
+    'ojs_id': ('ojs_id',),
+    'doi': ('doi',),
+    'authors': ('authors', 'autores'),
+}
+
+AUTHOR_FIELDS = {name: (name,) for name in (
+    'givenname', 'familyname', 'email', 'affiliation', 'country', 'orcid', 'bio', 'primary_contact')}
+
+# Obrigatórios que o schema não declara: sem eles a importação descartaria
+# a seção/o autor
+SECTION_REQUIRED = ('title',)
+AUTHOR_REQUIRED = ('givenname', 'familyname')
+
+# Formatos (regex, descrição): divergência vira aviso, não erro
+SEMINAR_FORMATS = {
+    'date_published': (r'\d{4}-\d{2}-\d{2}', 'AAAA-MM-DD'),
+}
+ARTICLE_FORMATS = {
+    'locale': (r'[a-z]{2,3}(-[A-Z]{2})?', 'BCP-47, ex.: pt-BR'),
+}
+AUTHOR_FORMATS = {
+    'orcid': (r'\d{4}-\d{4}-\d{4}-\d{3}[\dX]', '0000-0000-0000-0000'),
+    'country': (r'[A-Z]{2}', 'ISO 3166, ex.: BR'),
+    'email': (r'[^@\s]+@[^@\s]+\.[^@\s]+', 'usuario@dominio'),
+}
+
+TYPE_NAMES = {
+    str: 'texto', int: 'inteiro', float: 'número', bool: 'booleano',
+    list: 'lista', dict: 'mapa', datetime.date: 'data',
+}
+
+
+def load_yaml(path):
+    """yaml.safe_load com o loader C, se disponível."""
+    with open(path) as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+# --- Adaptação dos formatos ---
+
+def _pick(data, fields, defaults=None):
+    """{campo canônico: primeiro sinônimo não nulo em data}."""
+    record = {}
+    for field, names in fields.items():
+        value = None
+        for name in names:
+            value = data.get(name)
+            if value is not None:
+                break
+        record[field] = value
+    for field, value in (defaults or {}).items():
+        if record[field] is None:
+            record[field] = value
+    return record
+
+
+def adapt_seminar(data):
+    """Metadados do seminário, independente do formato."""
+    # Formato 2: sdnne02/05 com evento/publicacao
+    if 'evento' in data and 'issue' not in data:
+        ev = data.get('evento') or {}
+        pub = data.get('publicacao') or {}
+        return {
+            'slug': data.get('slug'),
+            'title': ev.get('titulo'),
+            'subtitle': ev.get('tema'),
+            'year': ev.get('data'),
+            'volume': data.get('volume'),
+            'number': data.get('number'),
+            'date_published': f"{ev['data']}-01-01" if ev.get('data') else None,
+            'isbn': pub.get('isbn'),
+            'doi': None,
+            'description': pub.get('ficha_catalografica'),
+            'location': ev.get('local'),
+            'publisher': None,
+            'source': ((data.get('fontes') or {}).get('docomomobrasil') or {}).get('url'),
+            'editors': ev.get('organizacao') or [],
+            'volume_pdf': data.get('volume_pdf'),
+            'related_urls': data.get('related_urls') or [],
+        }
+    # Formato 1 ({issue: ...}) e 3 (campos no topo)
+    issue = data['issue'] if isinstance(data.get('issue'), dict) else data
+    return _pick(issue, SEMINAR_FIELDS, {'editors': [], 'related_urls': []})
+
+
+def adapt_sections(data):
+    """Seções pré-definidas: no topo (sdsul06-08) ou em issue.sections (sdrj02-03)."""
+    sections = data.get('sections')
+    if not sections and isinstance(data.get('issue'), dict):
+        sections = data['issue'].get('sections')
+    return [_pick(sec, SECTION_FIELDS) if isinstance(sec, dict) else sec
+            for sec in sections or []]
+
+
+def adapt_article(art, slug, idx):
+    """Artigo com os campos canônicos; id gerado ({slug}-NNN) se ausente."""
+    if not isinstance(art, dict):
+        return art
+    record = _pick(art, ARTICLE_FIELDS, {'seminar': slug})
+    if 'locale' not in art:
+        record['locale'] = 'pt-BR'
+    if record['id'] is None and slug:
+        record['id'] = f'{slug}-{idx + 1:03d}'
+    record['pages'] = str(record['pages']) if record['pages'] else None
+    return record
+
+
+def adapt(data):
+    """Converte um YAML carregado em {'seminar', 'sections', 'articles'}.
+
+    Retorna None se o documento não tem artigos (schemas, metadados etc.).
+    """
+    if not isinstance(data, dict):
+        return None
+    articles = data.get('articles', data.get('artigos'))
+    if not articles:
+        return None
+    seminar = adapt_seminar(data)
+    slug = seminar.get('slug')
+    return {
+        'seminar': seminar,
+        'sections': adapt_sections(data),
+        'articles': [adapt_article(art, slug, idx) for idx, art in enumerate(articles)],
+    }
+
+
+# --- Validadores compilados dos schemas ---
+
+def _expected_type(example):
+    """Tipos aceitos para um campo cujo exemplo no schema é `example`."""
+    if isinstance(example, bool):
+        return (bool,)
+    if isinstance(example, int):
+        return (int,)
+    if isinstance(example, float):
+        return (int, float)
+    if isinstance(example, datetime.date):
+        return (datetime.date, str)  # data_publicacao: 2023-11-15 ou "2023-11-15"
+    for kind in (str, list, dict):
+        if isinstance(example, kind):
+            return (kind,)
+    return None
+
+
+def _type_name(types):
+    return ' ou '.join(TYPE_NAMES.get(t, t.__name__) for t in types)
+
+
+def _matches(value, types):
+    if isinstance(value, bool) and bool not in types:
+        return False
+    return isinstance(value, types)
+
+
+def required_fields(path):
+    """Campos da linha "# Campos obrigatórios: a, b, c" do cabeçalho do schema."""
+    with open(path) as f:
+        m = re.search(r'^#\s*Campos obrigatórios:\s*(.+)$', f.read(), re.M)
+    return [name.strip() for name in m.group(1).split(',')] if m else []
+
+
+class RecordValidator:
+    """Validador de um tipo de registro, compilado de um exemplo do schema.
+
+    fields: {campo canônico: sinônimos}; campos do exemplo sem equivalente
+    canônico (texto, imagens, estatísticas...) não são conferidos. Em
+    listas de valores simples o tipo dos itens também é conferido.
+    """
+
+    def __init__(self, example, fields, required=(), formats=None):
+        aliases = {name: field for field, names in fields.items() for name in names}
+        self.required = tuple(aliases.get(name, name) for name in required)
+        self.checks = []
+        for key, value in example.items():
+            field = aliases.get(key)
+            types = _expected_type(value)
+            if field is None or types is None:
+                continue
+            item_types = None
+            if isinstance(value, list) and value and not isinstance(value[0], (list, dict)):
+                item_types = _expected_type(value[0])
+            self.checks.append((field, types, item_types))
+        self.formats = [(field, re.compile(pattern), desc)
+                        for field, (pattern, desc) in (formats or {}).items()]
+
+    def validate(self, record, where, errors, warnings):
+        for field in self.required:
+            if record.get(field) in (None, ''):
+                errors.append(f'{where}: campo obrigatório {field!r} ausente')
+        for field, types, item_types in self.checks:
+            value = record.get(field)
+            if value is None:
+                continue
+            if not _matches(value, types):
+                errors.append(f'{where}: {field!r} deveria ser {_type_name(types)}, '
+                              f'é {TYPE_NAMES.get(type(value), type(value).__name__)}')
+            elif item_types:
+                for i, item in enumerate(value):
+                    if not _matches(item, item_types):
+                        errors.append(f'{where}: {field}[{i}] deveria ser {_type_name(item_types)}')
+        for field, pattern, desc in self.formats:
+            value = record.get(field)
+            if isinstance(value, str) and not pattern.fullmatch(value):
+                warnings.append(f'{where}: {field} {value!r} fora do formato ({desc})')
+
+
+@functools.lru_cache(maxsize=None)
+def validators():
+    """Validadores dos schemas, montados uma vez por processo."""
+    seminar_path = os.path.join(SCHEMA_DIR, 'seminario.yaml')
+    article_path = os.path.join(SCHEMA_DIR, 'artigo.yaml')
+    seminar = load_yaml(seminar_path)
+    article = load_yaml(article_path)
+    return {
+        'seminar': RecordValidator(seminar, SEMINAR_FIELDS, required_fields(seminar_path),
+                                   SEMINAR_FORMATS),
+        'section': RecordValidator(seminar['secoes'][0], SECTION_FIELDS, SECTION_REQUIRED),
+        'article': RecordValidator(article, ARTICLE_FIELDS, required_fields(article_path),
+                                   ARTICLE_FORMATS),
+        'author': RecordValidator(article['autores'][0], AUTHOR_FIELDS, AUTHOR_REQUIRED,
+                                  AUTHOR_FORMATS),
+    }
+
+
+def validate(adapted):
+    """Confere um registro de adapt(). Retorna (erros, avisos), todos de uma vez."""
+    v = validators()
+    errors, warnings = [], []
+    v['seminar'].validate(adapted['seminar'], 'seminário', errors, warnings)
+
+    for i, sec in enumerate(adapted['sections']):
+        if isinstance(sec, dict):
+            v['section'].validate(sec, f'seção {i + 1}', errors, warnings)
+        else:
+            errors.append(f'seção {i + 1}: deveria ser mapa, é {type(sec).__name__}')
+
+    seen = set()
+    for idx, art in enumerate(adapted['articles']):
+        if not isinstance(art, dict):
+            errors.append(f'artigo nº {idx + 1}: deveria ser mapa, é {type(art).__name__}')
+            continue
+        where = f"artigo {art['id'] or f'nº {idx + 1}'}"
+        v['article'].validate(art, where, errors, warnings)
+        if art['id'] is not None:
+            if art['id'] in seen:
+                errors.append(f'{where}: id repetido no arquivo')
+            seen.add(art['id'])
+        if isinstance(art['authors'], list):
+            for j, author in enumerate(art['authors']):
+                if isinstance(author, dict):
+                    v['author'].validate(author, f'{where}, autor {j + 1}', errors, warnings)
+                else:
+                    errors.append(f'{where}, autor {j + 1}: deveria ser mapa, é {type(author).__name__}')
+    return errors, warnings
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""API de depósito do Zenodo falsa, em memória, para testar upload_zenodo.py.
+
+Implementa só o que o uploader usa: criar/listar/consultar depositions,
+PUT de arquivos no bucket, publish e aceite de community-inclusion.
+Com --fail-rate, uma fração das requisições responde 503, para exercitar
+a retomada pelo ledger.
+
+Uso:
+    python3 scripts/zenodo_fake.py --port 8765 [--fail-rate 0.1]
+    python3 scripts/upload_zenodo.py --base-url http://127.0.0.1:8765 --token x --seminar sdnne08
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeZenodo:
+    """Estado do servidor falso (depositions, arquivos, requests de comunidade)."""
+
+    def __init__(self, fail_rate=0.0):
+        self.lock = threading.Lock()
+        self.fail_rate = fail_rate
+        self.depositions = {}
+        self.next_id = 1000
+        self.requests = 0
+
+    def new_deposition(self, base, metadata):
+        with self.lock:
+            self.next_id += 1
+            depo_id = self.next_id
+            depo = {
+                'id': depo_id,
+                'metadata': metadata,
+                'submitted': False,
+                'state': 'unsubmitted',
+                'files': [],
+                'links': {'bucket': f'{base}/api/files/bucket-{depo_id}'},
+            }
+            self.depositions[depo_id] = depo
+            return depo
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b''
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return self.rfile.read(length) if length else b''
+
+        def _fail(self):
+            with state.lock:
+                state.requests += 1
+            if state.fail_rate and random.random() < state.fail_rate:
+                self._send(503, {'message': 'fake: indisponível'})
+                return True
+            return False
+
+        def _base(self):
+            return f'http://{self.headers["Host"]}'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if self._fail():
+                return
+            if url.path == '/api/deposit/depositions':
+                status = query.get('status', [None])[0]
+                size = int(query.get('size', ['10'])[0])
+                page = int(query.get('page', ['1'])[0])
+                items = [d for d in state.depositions.values()
+                         if status != 'draft' or not d['submitted']]
+                return self._send(200, items[(page - 1) * size:page * size])
+            m = re.fullmatch(r'/api/deposit/depositions/(\d+)', url.path)
+            if m and int(m[1]) in state.depositions:
+                return self._send(200, state.depositions[int(m[1])])
+            if url.path == '/api/requests/':
+                hits = [
+                    {'topic': {'record': str(d['record_id'])},
+                     'links': {'actions': {'accept': f'{self._base()}/api/requests/{d["id"]}/accept'}}}
+                    for d in state.depositions.values()
+                    if d['submitted'] and not d.get('accepted')
+                ]
+                return self._send(200, {'hits': {'hits': hits}})
+            self._send(404, {'message': 'not found'})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self._body()
+            if self._fail():
+                return
+            if url.path == '/api/deposit/depositions':
+                metadata = json.loads(body or b'{}').get('metadata', {})
+                return self._send(201, state.new_deposition(self._base(), metadata))
+            m = re.fullmatch(r'/api/deposit/depositions/(\d+)/actions/publish', url.path)
+            if m and int(m[1]) in state.depositions:
+                depo = state.depositions[int(m[1])]
+                if not depo['files']:
+                    return self._send(400, {'message': 'missing files'})
+                depo.update(submitted=True, state='done', record_id=depo['id'],
+                            doi=f'10.5072/zenodo.{depo["id"]}')
+                return self._send(202, depo)
+            m = re.fullmatch(r'/api/requests/(\d+)/accept', url.path)
+            if m and int(m[1]) in state.depositions:
+                state.depositions[int(m[1])]['accepted'] = True
+                return self._send(200, {})
+            self._send(404, {'message': 'not found'})
+
+        def do_PUT(self):
+            url = urlparse(self.path)
+            body = self._body()
+            if self._fail():
+                return
+            m = re.fullmatch(r'/api/files/bucket-(\d+)/(.+)', url.path)
+            if m and int(m[1]) in state.depositions:
+                depo = state.depositions[int(m[1])]
+                entry = {
+                    'key': m[2],
+                    'size': len(body),
+                    'checksum': f'md5:{hashlib.md5(body).hexdigest()}',
+                }
+                depo['files'] = [f for f in depo['files'] if f['key'] != m[2]] + [entry]
+                return self._send(201, entry)
+            m = re.fullmatch(r'/api/deposit/depositions/(\d+)', url.path)
+            if m and int(m[1]) in state.depositions:
+                state.depositions[int(m[1])]['metadata'] = json.loads(body).get('metadata', {})
+                return self._send(200, state.depositions[int(m[1])])
+            self._send(404, {'message': 'not found'})
+
+    return Handler
+
+
+def serve(port=0, fail_rate=0.0):
+    """Inicia o servidor numa thread. Retorna (server, state)."""
+    state = FakeZenodo(fail_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API de depósito Zenodo falsa (local)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help='Fração de requisições que respondem 503 (0-1)')
+    args = parser.parse_args()
+
+    state = FakeZenodo(args.fail_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state))
+    print(f'Zenodo falso em http://127.0.0.1:{args.port} (Ctrl+C para sair)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f'\n{state.requests} requisições, {len(state.depositions)} depositions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+/* Leitor do índice de busca estático (gerado por scripts/build_search_index.py).
+   Baixa o manifest uma vez e, por consulta, só os fragmentos dos termos.
+
+   Uso:
+     BuscaAnais.search("habitação social").then(function(results) { ... });
+     // results: [{score, id, title, url, seminar, year}, ...] */
+(function() {
+  var BASE = '/busca/';
+  var files = {};
+  var manifest = null;
+  var prefixes = [];
+  var stopwords = {};
+
+  function load(name) {
+    if (!files[name]) {
+      files[name] = fetch(BASE + name).then(function(r) {
+        if (!r.ok) throw new Error(name + ': HTTP ' + r.status);
+        return r.json();
+      });
+    }
+    return files[name];
+  }
+
+  function init() {
+    if (manifest) return Promise.resolve(manifest);
+    return load('manifest.json').then(function(m) {
+      manifest = m;
+      prefixes = Object.keys(m.shards).sort(function(a, b) { return b.length - a.length; });
+      m.stopwords.forEach(function(w) { stopwords[w] = true; });
+      return m;
+    });
+  }
+
+  // Mesma normalização do Python: minúsculas, sem acentos, sem stopwords
+  function tokenize(text) {
+    var folded = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+    return (folded.match(/[a-z0-9]+/g) || []).filter(function(t) {
+      return t.length > 1 && !stopwords[t];
+    });
+  }
+
+  function shardFor(term) {
+    for (var i = 0; i < prefixes.length; i++) {
+      if (term.indexOf(prefixes[i]) === 0) return manifest.shards[prefixes[i]];
+    }
+    return null;
+  }
+
+  function postings(term) {
+    var name = shardFor(term);
+    if (!name) return Promise.resolve({});
+    return load(name).then(function(shard) {
+      var encoded = shard[term] || [], docs = {}, doc = 0;
+      for (var i = 0; i < encoded.length; i += 2) {
+        doc += encoded[i];
+        docs[doc] = encoded[i + 1];
+      }
+      return docs;
+    });
+  }
+
+  function search(query, limit) {
+    limit = limit || 10;
+    return init().then(function() {
+      var terms = tokenize(query).filter(function(t, i, all) { return all.indexOf(t) === i; });
+      if (!terms.length) return [];
+      return Promise.all(terms.map(postings)).then(function(lists) {
+        var scores = lists[0];
+        lists.slice(1).forEach(function(docs) {
+          var next = {};
+          Object.keys(scores).forEach(function(d) {
+            if (d in docs) next[d] = scores[d] + docs[d];
+          });
+          scores = next;
+        });
+        var ranked = Object.keys(scores).map(Number).sort(function(a, b) {
+          return (scores[b] - scores[a]) || (a - b);
+        }).slice(0, limit);
+        var per = manifest.docs_per_block;
+        return Promise.all(ranked.map(function(doc) {
+          return load(manifest.doc_blocks[Math.floor(doc / per)]).then(function(block) {
+            var d = block[doc % per];
+            return { score: scores[doc], id: d[0], title: d[1], url: d[2], seminar: d[3], year: d[4] };
+          });
+        }));
+      });
+    });
+  }
+
+  window.BuscaAnais = { search: search, tokenize: tokenize };
+})();